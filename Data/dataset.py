@@ -0,0 +1,177 @@
+import os
+import hashlib
+import pandas as pd
+
+# --- Server-side Dataset Registry ---
+# The dashboard keeps ONE normalized copy of the job table inside the server process.
+# Pages read it from here instead of rebuilding a DataFrame from the browser store,
+# and the browser store only carries a small token (version + row count).
+
+_REGISTRY = {
+    'df': None,
+    'version': None,
+    'shared_path': None,  # Set when the table is attached from a shared Arrow file (multi-process serving)
+}
+
+DATASET_CONFIG = {
+    # Arrow IPC file written by the serving master (see root_file/gunicorn.conf.py) and memory-mapped by workers
+    'shared_path': os.getenv('DATASET_SHARED_PATH', ''),
+}
+
+
+def _normalize(df):
+    """
+    Applies the type conversions every page used to repeat per request.
+    """
+    df = df.copy()
+
+    if 'Created_At' in df.columns:
+        df['Created_At'] = pd.to_datetime(df['Created_At'], errors='coerce')
+
+    for col in ['Total_Applications', 'Total_Views']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    return df
+
+
+def _fingerprint(df):
+    """
+    Content hash of the table. Two loads of the same rows get the same version,
+    so cached results survive a reload that changed nothing.
+    """
+    digest = hashlib.sha1()
+    digest.update(",".join(map(str, df.columns)).encode())
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    except TypeError:
+        # Unhashable cell values (lists, dicts...) -> fall back to the printed form
+        digest.update(df.to_csv(index=False).encode())
+    return digest.hexdigest()[:12]
+
+
+def publish_dataset(df):
+    """
+    Normalizes the loaded table, registers it as the active dataset and returns its version.
+    """
+    df = _normalize(df)
+    version = _fingerprint(df)
+
+    _REGISTRY['df'] = df
+    _REGISTRY['version'] = version
+
+    print(f"📦 Dataset published: {len(df)} rows (version {version})")
+    return version
+
+
+def get_dataset():
+    """
+    Returns the active dataset, or None if nothing was loaded.
+    The result is a shallow copy, so pages can add/replace columns without touching the shared table.
+    """
+    df = _REGISTRY['df']
+    if df is None:
+        return None
+    return df.copy(deep=False)
+
+
+def dataset_version():
+    return _REGISTRY['version']
+
+
+def dataset_token():
+    """
+    Small payload for the 'global-data-store' (instead of the full table as records).
+    """
+    if _REGISTRY['df'] is None:
+        return None
+    return {'version': _REGISTRY['version'], 'rows': len(_REGISTRY['df'])}
+
+
+# --- Shared Dataset (multi-process serving) ---
+# One loader writes the normalized table to an uncompressed Arrow IPC file. Every worker memory-maps it:
+# numeric / date columns become numpy views on the mapped pages and text columns stay Arrow strings
+# (pandas 'string[pyarrow]'), so the OS page cache holds ONE copy of the data whatever the worker count.
+
+def arrow_schema(df):
+    """
+    Arrow schema of a table from its dtypes alone: object columns are text. Pins the types of a table written in
+    parts (engine/export.py), whatever values each part happens to hold.
+    """
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    for col in df.columns[df.dtypes == object]:
+        schema = schema.set(schema.get_field_index(col), pa.field(col, pa.string()))
+    return schema
+
+
+def arrow_table(df, schema=None):
+    """
+    The table as Arrow (optionally with a fixed schema), mixed-type object columns converted to text.
+    """
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns (e.g. ids stored as str and int) -> text
+        df = df.copy(deep=False)
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def export_shared(path=None):
+    """
+    Writes the active dataset to a shared Arrow file (atomically) and returns its path.
+    """
+    import pyarrow as pa
+
+    df = _REGISTRY['df']
+    path = path or DATASET_CONFIG['shared_path']
+    if df is None or not path:
+        return None
+
+    table = arrow_table(df)
+    metadata = {**(table.schema.metadata or {}), b'version': _REGISTRY['version'].encode()}
+    table = table.replace_schema_metadata(metadata)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    print(f"💾 Shared dataset written: {path} ({os.path.getsize(path) / 2 ** 20:.1f} MB)")
+    return path
+
+
+def release_dataset():
+    """
+    Forgets the active dataset (the serving master drops its copy once the shared file is written).
+    """
+    _REGISTRY['df'] = None
+    _REGISTRY['version'] = None
+
+
+def attach_shared(path=None):
+    """
+    Memory-maps a shared Arrow file as the active dataset (zero-copy). Returns its version, or None if missing.
+    """
+    import pyarrow as pa
+
+    path = path or DATASET_CONFIG['shared_path']
+    if not path or not os.path.exists(path):
+        return None
+
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    strings = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}
+    df = table.to_pandas(split_blocks=True, types_mapper=strings.get)
+
+    _REGISTRY['df'] = df
+    _REGISTRY['version'] = (table.schema.metadata or {}).get(b'version', b'').decode() or _fingerprint(df)
+    _REGISTRY['shared_path'] = path
+
+    print(f"📎 Shared dataset attached: {len(df)} rows (version {_REGISTRY['version']})")
+    return _REGISTRY['version']
@@ -12,6 +12,37 @@ LOCAL_DB_CONFIG = {
 }
 
 
+# --- RENAME COLUMNS ---
+# Mapping raw SQL column names to Analysis-Friendly names
+COLUMN_MAPPING = {
+    'record_id': 'Unique_Row_ID',  # The new Auto-Increment ID
+    'id': 'Original_Source_ID',  # The ID from the remote DB (may have duplicates)
+    'source_table': 'Data_Source_Month',  # e.g., '2025_01'
+
+    'adTitle': 'Job_Title',
+    'category': 'Job_Category',
+    'companyName': 'Company',
+    'companyEmail': 'Company_Email',
+    'adStatus': 'Ad_Status',
+
+    'totalViewCount': 'Total_Views',
+    'totalApplied': 'Total_Applications',
+    'outboundClicks': 'Outbound_Clicks',
+
+    'userID': 'User_ID',
+    'customerID': 'Customer_ID',
+    'productID': 'Product_ID',
+    'subscriptionID': 'Subscription_ID',
+
+    'timeCreatedAtUTC': 'Created_At',
+    'adRunTimeStart': 'Run_Start_Date',
+    'adRunTimeEnd': 'Run_End_Date',
+    'detailViewLink': 'Job_URL',
+    'Country':'Country',
+    'traffic_source':'Traffic_Source',
+}
+
+
 def load_data(local_config=LOCAL_DB_CONFIG):
     """
     Connects to the local MySQL database, fetches data from the combined 2025 table,
@@ -39,38 +70,8 @@ def load_data(local_config=LOCAL_DB_CONFIG):
             print(f"⚠️ Table '{table_name}' is empty.")
             return df
 
-        # --- RENAME COLUMNS ---
-        # Mapping raw SQL column names to Analysis-Friendly names
-        column_mapping = {
-            'record_id': 'Unique_Row_ID',  # The new Auto-Increment ID
-            'id': 'Original_Source_ID',  # The ID from the remote DB (may have duplicates)
-            'source_table': 'Data_Source_Month',  # e.g., '2025_01'
-
-            'adTitle': 'Job_Title',
-            'category': 'Job_Category',
-            'companyName': 'Company',
-            'companyEmail': 'Company_Email',
-            'adStatus': 'Ad_Status',
-
-            'totalViewCount': 'Total_Views',
-            'totalApplied': 'Total_Applications',
-            'outboundClicks': 'Outbound_Clicks',
-
-            'userID': 'User_ID',
-            'customerID': 'Customer_ID',
-            'productID': 'Product_ID',
-            'subscriptionID': 'Subscription_ID',
-
-            'timeCreatedAtUTC': 'Created_At',
-            'adRunTimeStart': 'Run_Start_Date',
-            'adRunTimeEnd': 'Run_End_Date',
-            'detailViewLink': 'Job_URL',
-            'Country':'Country',
-            'traffic_source':'Traffic_Source',
-        }
-
         # Apply the renaming
-        df.rename(columns=column_mapping, inplace=True)
+        df.rename(columns=COLUMN_MAPPING, inplace=True)
 
         # Optional: Convert date columns to datetime objects immediately
         if 'Created_At' in df.columns:
@@ -0,0 +1,313 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import datetime
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+
+# 1. PATH CONFIGURATION
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import numpy as np
+
+from benchmarks.dash_client import DashSession, FlaskTransport
+from benchmarks.regression import add_arguments, config_from, gate
+from benchmarks.synthetic import SCALES, COUNTRIES, CATEGORIES, TRAFFIC_SOURCES, make_dataset, scale_rows
+
+# --- Callback Benchmarks ---
+# Runs the real dashboard (root_file/app.py, every page and callback) on synthetic data and replays a fixed
+# matrix of filter inputs on each page through Dash's own /_dash-update-component route:
+#
+#   python benchmarks/bench_callbacks.py --scales 10k 100k 1m --repeat 5 --out benchmarks/results.json
+#   python benchmarks/bench_callbacks.py --scales 100k --compare benchmarks/baseline.json  (benchmarks/regression.py)
+#
+# Every scale runs in a fresh process (the dataset is served from a shared Arrow file, as under gunicorn).
+# Per page and callback: cold latency (caches cleared), warm latency (cache hits), response payload size and
+# peak Python allocation (tracemalloc, cold). Per page and compute stage: cold latency (the server's
+# Server-Timing spans). Per scale: the process's peak RSS.
+
+DATA_DIR = os.path.join(tempfile.gettempdir(), 'job-portal-bench')
+
+# Filter cells, applied to each page's own controls (a page skips cells it has no control for)
+FILTER_MATRIX = [
+    ('all', {}),
+    ('month', {'months': [3]}),
+    ('date_range', {'start_date': '2025-03-01', 'end_date': '2025-05-31'}),
+    ('country', {'countries': COUNTRIES[:1]}),
+    ('countries_category', {'countries': COUNTRIES[:2], 'categories': CATEGORIES[:1]}),
+    ('company', {'companies': None}),  # The company with the most jobs, looked up per dataset
+    ('source', {'sources': TRAFFIC_SOURCES[:1]}),
+]
+
+
+# --- 2. DATA ---
+
+def dataset_file(scale, seed=0, data_dir=DATA_DIR):
+    """
+    Shared Arrow file of a synthetic scale, generated once and reused by later runs.
+    """
+    from Data.dataset import publish_dataset, export_shared
+
+    rows = scale_rows(scale)
+    path = os.path.join(data_dir, f"synthetic_{rows}_{seed}.arrow")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        start = time.perf_counter()
+        publish_dataset(make_dataset(rows, seed=seed, strings='pyarrow'))
+        export_shared(path)
+        print(f"🧪 Synthetic {scale}: {rows:,} rows in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+# --- 3. MEASUREMENT (inside the per-scale process) ---
+
+class TracedTransport(FlaskTransport):
+    """
+    Test-client transport that also records each request's peak Python allocation (bytes above the start).
+    """
+
+    def __init__(self, server):
+        super().__init__(server)
+        self.peaks = []
+
+    def post(self, path, body):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = super().post(path, body)
+        self.peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        return result
+
+
+def clear_caches():
+    from engine.cache import get_cache
+    from engine.selection import clear_row_cache
+    from engine.tables import clear_tables
+
+    get_cache().clear()
+    clear_row_cache()
+    clear_tables()
+
+
+def _percentiles(samples):
+    ms = np.asarray(samples) * 1000
+    return {'p50': round(float(np.percentile(ms, 50)), 3), 'p95': round(float(np.percentile(ms, 95)), 3),
+            'p99': round(float(np.percentile(ms, 99)), 3), 'mean': round(float(ms.mean()), 3), 'n': len(ms)}
+
+
+def _resolve(filters, top_company):
+    return {kind: [top_company] if kind == 'companies' and value is None else value
+            for kind, value in filters.items()}
+
+
+def bench_page(dashboard, route, page, repeat, top_company):
+    """
+    {callback: samples + sizes} and {cell: totals} for one page.
+    """
+    names = {output: getattr(spec.get('callback'), '__name__', output)
+             for output, spec in dashboard.app.callback_map.items()}
+    session = DashSession(FlaskTransport(dashboard.server), names).start()
+    session.navigate(route, page)
+    traced = DashSession(TracedTransport(dashboard.server), names).start()
+    traced.navigate(route, page)
+
+    callbacks, cells, stages = {}, {}, {}
+    for cell, filters in FILTER_MATRIX:
+        filters = _resolve(filters, top_company)
+        if filters and not set(filters) & set(session.filter_ids()):
+            continue
+
+        # Cold: every cache emptied first. Warm: back to "no filter" and again (the cell's stages are cached).
+        # The unfiltered cell is a page load.
+        runs = []
+        for run in ['cold'] + ['warm'] * repeat:
+            if run == 'cold':
+                clear_caches()
+            elif filters:
+                session.apply_filters({})
+            mark = len(session.log)
+            session.apply_filters(filters) if filters else session.reload()
+            runs.append((run, session.log[mark:]))
+        session.apply_filters({})
+
+        clear_caches()
+        tracemalloc.start()
+        mark, first_peak = len(traced.log), len(traced.transport.peaks)
+        traced.apply_filters(filters) if filters else traced.reload()
+        tracemalloc.stop()
+        peaks = traced.transport.peaks[first_peak:]
+        traced.apply_filters({})
+
+        for run, records in runs:
+            for record in records:
+                entry = callbacks.setdefault(record['callback'], {'cold': [], 'warm': [], 'bytes': [], 'errors': 0,
+                                                                  'peak_alloc': []})
+                entry[run].append(record['seconds'])
+                entry['bytes'].append(record['bytes'])
+                entry['errors'] += record['status'] not in (200, 204)
+                if run == 'cold':  # Warm runs are cache hits: the stages don't run
+                    for name, ms in record['spans'].items():
+                        if name.startswith('stage.'):
+                            stages.setdefault(name[len('stage.'):], []).append(ms)
+        for record, peak in zip(traced.log[mark:], peaks):
+            callbacks[record['callback']]['peak_alloc'].append(peak)
+
+        cold = runs[0][1]
+        warm = [sum(r['seconds'] for r in records) for run, records in runs[1:]]
+        cells[cell] = {'requests': len(cold), 'cold_ms': round(sum(r['seconds'] for r in cold) * 1000, 3),
+                       'warm_ms': round(float(np.median(warm)) * 1000, 3) if warm else None,
+                       'bytes': sum(r['bytes'] for r in cold)}
+
+    return {
+        'callbacks': {
+            name: {'cold': _percentiles(entry['cold']) if entry['cold'] else None,
+                   'warm': _percentiles(entry['warm']) if entry['warm'] else None,
+                   'cold_samples_ms': [round(s * 1000, 3) for s in entry['cold']],
+                   'warm_samples_ms': [round(s * 1000, 3) for s in entry['warm']],
+                   'bytes': {'max': max(entry['bytes']), 'mean': round(float(np.mean(entry['bytes'])))},
+                   'peak_alloc_bytes': max(entry['peak_alloc'], default=0),
+                   'errors': entry['errors']}
+            for name, entry in callbacks.items()
+        },
+        'stages': {name: {'cold': _percentiles(np.asarray(samples) / 1000), 'cold_samples_ms': samples}
+                   for name, samples in stages.items()},
+        'cells': cells,
+    }
+
+
+def run_scale(path, repeat, pages=None):
+    """
+    Benchmarks every page of the real app on the shared file at `path` (call in a fresh process).
+    """
+    os.environ['DATASET_SHARED_PATH'] = path
+    start = time.perf_counter()
+    from root_file import app as dashboard
+    from Data.dataset import get_dataset, dataset_version
+    startup = time.perf_counter() - start
+
+    df = get_dataset()
+    top_company = str(df['Company'].value_counts().index[0])
+    results = {}
+    for route, module in dashboard.page_modules.items():
+        page = getattr(module, 'PAGE', route.strip('/'))
+        if pages and page not in pages:
+            continue
+        start = time.perf_counter()
+        results[page] = bench_page(dashboard, route, page, repeat, top_company)
+        results[page]['seconds'] = round(time.perf_counter() - start, 3)
+
+    return {
+        'rows': len(df),
+        'version': dataset_version(),
+        'startup_seconds': round(startup, 3),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'pages': results,
+    }
+
+
+# --- 4. DRIVER ---
+
+def environment():
+    import dash
+    import pandas as pd
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=parent_dir, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'dash': dash.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run_scales(scales, repeat=5, pages=None, seed=0, data_dir=DATA_DIR, verbose=False):
+    """
+    {'meta', 'settings', 'scales': {scale: run_scale(...)}} - one subprocess per scale.
+    """
+    report = {'meta': environment(),
+              'settings': {'repeat': repeat, 'seed': seed, 'matrix': [cell for cell, _ in FILTER_MATRIX]},
+              'scales': {}}
+    for scale in scales:
+        path = dataset_file(scale, seed, data_dir)
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+            out = f.name
+        command = [sys.executable, os.path.abspath(__file__), '--worker', path, '--repeat', str(repeat),
+                   '--out', out] + (['--pages', *pages] if pages else [])
+        print(f"⏱️ Benchmarking {scale}...")
+        start = time.perf_counter()
+        done = subprocess.run(command, cwd=parent_dir, stdout=None if verbose else subprocess.DEVNULL)
+        try:
+            if done.returncode != 0:
+                print(f"❌ {scale}: benchmark process exited with {done.returncode}")
+                continue
+            with open(out, encoding='utf-8') as f:
+                report['scales'][scale] = json.load(f)
+        finally:
+            os.unlink(out)
+        result = report['scales'][scale]
+        print(f"✅ {scale}: {len(result['pages'])} pages in {time.perf_counter() - start:.1f}s "
+              f"(peak RSS {result['peak_rss_mb']:.0f} MB)")
+    return report
+
+
+def print_summary(report):
+    for scale, result in report['scales'].items():
+        print(f"\n{scale} ({result['rows']:,} rows, peak RSS {result['peak_rss_mb']:.0f} MB)")
+        print(f"  {'page':<28}{'cold p50 ms':>12}{'cold p95 ms':>12}{'warm p50 ms':>12}{'max KB':>10}")
+        for page, stats in result['pages'].items():
+            cold = [s for cb in stats['callbacks'].values() for s in cb['cold_samples_ms']]
+            warm = [s for cb in stats['callbacks'].values() for s in cb['warm_samples_ms']]
+            size = max((cb['bytes']['max'] for cb in stats['callbacks'].values()), default=0)
+            print(f"  {page:<28}{np.percentile(cold, 50) if cold else 0:>12.1f}"
+                  f"{np.percentile(cold, 95) if cold else 0:>12.1f}"
+                  f"{np.percentile(warm, 50) if warm else 0:>12.1f}{size / 1024:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency / memory / payload benchmarks of every page callback.")
+    parser.add_argument('--scales', nargs='+', default=['10k', '100k', '1m'],
+                        help=f"Dataset sizes ({', '.join(SCALES)} or a row count)")
+    parser.add_argument('--repeat', type=int, default=5, help="Warm runs per filter cell")
+    parser.add_argument('--pages', nargs='*', help="Pages to benchmark (compute PAGE names); default: all")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Where generated datasets are kept")
+    parser.add_argument('--out', default=os.path.join('benchmarks', 'results.json'), help="JSON results file")
+    parser.add_argument('--verbose', action='store_true', help="Show the app's own output")
+    parser.add_argument('--compare', metavar='BASELINE', help="Then check the results against a baseline JSON")
+    add_arguments(parser)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)  # Shared dataset path: run one scale in-process
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = run_scale(args.worker, args.repeat, args.pages)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return 0
+
+    report = run_scales(args.scales, args.repeat, args.pages, args.seed, args.data_dir, args.verbose)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print_summary(report)
+    print(f"\n💾 {args.out}")
+    if args.compare:
+        return gate(args.compare, report, config_from(args), args.show_all)
+    return 0 if report['scales'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
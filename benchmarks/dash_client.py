@@ -0,0 +1,332 @@
+import re
+import json
+import time
+import http.client
+from urllib.parse import urlsplit
+
+# --- Dash Session Replayer ---
+# Plays the part of the browser's Dash renderer: reads /_dash-dependencies and /_dash-layout, keeps the
+# props of every component on screen, and fires the callbacks a property change triggers (in dependency
+# order, chained through their outputs) as POSTs to /_dash-update-component. Each request is logged with
+# its latency, status and response size. Works on a Flask test client (in-process) or over HTTP.
+
+UPDATE_ROUTE = '/_dash-update-component'
+
+# Filter controls of the pages, by id suffix: filter kind -> (id suffix, property)
+FILTER_INPUTS = {
+    'start_date': ('date-picker', 'start_date'),
+    'end_date': ('date-picker', 'end_date'),
+    'months': ('month-dropdown', 'value'),
+    'categories': ('category-dropdown', 'value'),
+    'companies': ('company-dropdown', 'value'),
+    'countries': ('country-dropdown', 'value'),
+    'sources': ('traffic-dropdown', 'value'),
+}
+
+
+# --- 1. TRANSPORTS ---
+
+class FlaskTransport:
+    """
+    Requests through app.server.test_client() - no sockets, same Flask hooks as a real request.
+    """
+
+    def __init__(self, server):
+        self.client = server.test_client()
+
+    def get(self, path):
+        return self.client.get(path).get_json()
+
+    def post(self, path, body):
+        response = self.client.post(path, json=body)
+        return response.status_code, response.get_data(), response.headers.get('Server-Timing', '')
+
+
+class HttpTransport:
+    """
+    Keep-alive HTTP connection to a running server (one per simulated user).
+    """
+
+    def __init__(self, base_url, timeout=120):
+        parts = urlsplit(base_url)
+        self.prefix = parts.path.rstrip('/')
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+    def _request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            return response.status, response.read(), response.getheader('Server-Timing', '')
+        except (http.client.HTTPException, OSError):
+            self.connection.close()  # Reconnects on the next request
+            raise
+
+    def get(self, path):
+        status, data, _ = self._request('GET', path)
+        return json.loads(data) if status == 200 else None
+
+    def post(self, path, body):
+        """
+        (status, body bytes, Server-Timing header) - the same for every transport.
+        """
+        return self._request('POST', path, json.dumps(body))
+
+    def close(self):
+        self.connection.close()
+
+
+# --- 2. DEPENDENCIES + LAYOUT ---
+
+def parse_outputs(spec):
+    """
+    '..a.children...b.figure..' / 'a.children' -> [('a', 'children'), ('b', 'figure')]
+    """
+    multi = spec.startswith('..')
+    items = spec[2:-2].split('...') if multi else [spec]
+    outputs = []
+    for item in items:
+        component_id, _, prop = item.rpartition('.')
+        outputs.append((component_id, prop.split('@')[0]))
+    return outputs, multi
+
+
+def parse_server_timing(value):
+    """
+    'stage.kpis;dur=12.5, render;dur=3.0' -> {'stage.kpis': 12.5, 'render': 3.0} (milliseconds)
+    """
+    spans = {}
+    for item in (value or '').split(','):
+        name, _, params = item.strip().partition(';')
+        match = re.search(r'dur=([0-9.]+)', params)
+        if name and match:
+            spans[name] = float(match.group(1))
+    return spans
+
+
+def collect_props(node, found=None):
+    """
+    {component id: {prop: value}} for every component with an id in a layout (as JSON).
+    """
+    found = {} if found is None else found
+    if isinstance(node, list):
+        for child in node:
+            collect_props(child, found)
+    elif isinstance(node, dict):
+        props = node.get('props')
+        if isinstance(props, dict) and 'type' in node:
+            if isinstance(props.get('id'), str):
+                found[props['id']] = {k: v for k, v in props.items() if k != 'children'}
+            for value in props.values():
+                collect_props(value, found)
+    return found
+
+
+def collect_links(node, found=None):
+    """
+    Internal hrefs of a layout's links, in order (the sidebar's pages).
+    """
+    found = [] if found is None else found
+    if isinstance(node, list):
+        for child in node:
+            collect_links(child, found)
+    elif isinstance(node, dict) and isinstance(node.get('props'), dict):
+        href = node['props'].get('href')
+        if isinstance(href, str) and href.startswith('/') and href not in found:
+            found.append(href)
+        for value in node['props'].values():
+            collect_links(value, found)
+    return found
+
+
+class DashSession:
+    """
+    One simulated browser tab. `log` gets a record per callback request:
+    {'page', 'callback', 'seconds', 'status', 'bytes', 'at' (time.monotonic() when sent),
+     'spans' (the server's Server-Timing spans, ms)}.
+    """
+
+    def __init__(self, transport, names=None, page='app', content_id='page-content'):
+        self.transport = transport
+        self.names = names or {}  # output spec -> callback name (defaults to the first output)
+        self.page = page  # Attributed to the requests fired from now on
+        self.content_id = content_id  # Container the router fills with the page layout
+        self.log = []
+        self.deps = []
+        self.props = {}  # id -> {prop: value}, components currently on screen
+        self._outer = set()  # Ids outside the routed page content
+        self._content = None  # Layout of the routed page
+        self.links = []  # Pages linked from the app's own layout (sidebar)
+
+    def start(self):
+        for dep in self.transport.get('/_dash-dependencies'):
+            if dep.get('clientside_function'):
+                continue
+            outputs, multi = parse_outputs(dep['output'])
+            self.deps.append({
+                'spec': dep['output'], 'outputs': outputs, 'multi': multi,
+                'inputs': [(i['id'], i['property']) for i in dep['inputs']],
+                'state': [(s['id'], s['property']) for s in dep.get('state', [])],
+                'initial': not dep.get('prevent_initial_call'),
+            })
+        layout = self.transport.get('/_dash-layout')
+        self.links = collect_links(layout)
+        self.props = collect_props(layout)
+        self._outer = set(self.props)
+        self._fire(self._initial(set(self.props)), [])
+        return self
+
+    def _mount(self, layout):
+        """
+        Puts a page layout (JSON) on screen in place of the previous one. Returns its component ids.
+        """
+        self._content = layout
+        found = collect_props(layout)
+        self.props = {k: v for k, v in self.props.items() if k in self._outer} | found
+        return set(found)
+
+    def _present(self, dep):
+        return all(component_id in self.props for component_id, _ in dep['inputs'])
+
+    def _initial(self, new_ids):
+        """
+        Callbacks Dash calls when components appear: an input or output among the new ids.
+        """
+        return [dep for dep in self.deps if dep['initial'] and self._present(dep)
+                and any(c in new_ids for c, _ in dep['inputs'] + dep['outputs'])]
+
+    # --- 3. CALLBACK REQUESTS ---
+
+    def _value(self, key):
+        return self.props.get(key[0], {}).get(key[1])
+
+    def call(self, dep, changed):
+        """
+        POSTs one callback. Returns {(id, prop): value} of its outputs ({} for no_update / errors).
+        """
+        wire = [{'id': c, 'property': p} for c, p in dep['outputs']]
+        body = {
+            'output': dep['spec'],
+            'outputs': wire if dep['multi'] else wire[0],
+            'inputs': [{'id': c, 'property': p, 'value': self._value((c, p))} for c, p in dep['inputs']],
+            'state': [{'id': c, 'property': p, 'value': self._value((c, p))} for c, p in dep['state']],
+            'changedPropIds': [f"{c}.{p}" for c, p in changed if (c, p) in dep['inputs']],
+        }
+        at, start = time.monotonic(), time.perf_counter()
+        try:
+            status, data, timing = self.transport.post(UPDATE_ROUTE, body)
+        except (http.client.HTTPException, OSError):
+            status, data, timing = 0, b'', ''
+        seconds = time.perf_counter() - start
+
+        first = dep['outputs'][0]
+        self.log.append({'page': self.page, 'callback': self.names.get(dep['spec'], f"{first[0]}.{first[1]}"),
+                         'seconds': seconds, 'status': status, 'bytes': len(data), 'at': at,
+                         'spans': parse_server_timing(timing)})
+        if status != 200:
+            return {}
+        response = json.loads(data).get('response', {})
+        return {(c, p): response[c][p] for c, p in dep['outputs'] if p in response.get(c, {})}
+
+    def _fire(self, pending, changed):
+        """
+        Runs `pending` callbacks wave by wave: a callback waits while another pending one still produces
+        one of its inputs; outputs that changed trigger the callbacks listening to them.
+        """
+        pending = list(pending)
+        while pending:
+            produced = {key for dep in pending for key in dep['outputs']}
+            wave = [dep for dep in pending
+                    if not any(key in produced and key not in dep['outputs'] for key in dep['inputs'])] or pending
+            pending = [dep for dep in pending if dep not in wave]
+            updates = {}
+            for dep in wave:
+                updates.update(self.call(dep, changed))
+
+            changed, new_ids = [], set()
+            for (component_id, prop), value in updates.items():
+                if self._value((component_id, prop)) == value and component_id in self.props:
+                    continue
+                self.props.setdefault(component_id, {})[prop] = value
+                changed.append((component_id, prop))
+                if component_id == self.content_id and prop == 'children':  # Routed page replaced
+                    new_ids |= self._mount(value)
+
+            callers = {id(dep) for dep in wave}
+            triggered = [dep for dep in self.deps if self._present(dep) and id(dep) not in callers
+                         and any(key in changed for key in dep['inputs'])]
+            for dep in triggered + self._initial(new_ids):
+                if dep not in pending:
+                    pending.append(dep)
+
+    # --- 4. USER ACTIONS ---
+
+    def change(self, values):
+        """
+        Sets {(id, prop): value} at once (like one user edit) and runs every callback that follows.
+        """
+        changed = []
+        for (component_id, prop), value in values.items():
+            if component_id in self.props:
+                self.props[component_id][prop] = value
+                changed.append((component_id, prop))
+        triggered = [dep for dep in self.deps if self._present(dep) and any(key in changed for key in dep['inputs'])]
+        self._fire(triggered, changed)
+
+    def navigate(self, pathname, page=None):
+        self.page = page or pathname.strip('/') or 'app'
+        self.change({('url', 'pathname'): pathname})
+
+    def reload(self):
+        """
+        Shows the current page again with its controls reset (a fresh page load without the router round trip).
+        """
+        if self._content is not None:
+            self._fire(self._initial(self._mount(self._content)), [])
+
+    def filter_ids(self):
+        """
+        {filter kind: (id, prop)} of the filter controls on the current page.
+        """
+        found = {}
+        for kind, (suffix, prop) in FILTER_INPUTS.items():
+            for component_id in self.props:
+                if component_id.endswith(f"-{suffix}") and component_id not in self._outer:
+                    found[kind] = (component_id, prop)
+        return found
+
+    def options(self, kind):
+        """
+        Values offered by a filter dropdown of the current page (what a user can pick from).
+        """
+        key = self.filter_ids().get(kind)
+        options = self.props.get(key[0], {}).get('options') if key else None
+        return [o['value'] if isinstance(o, dict) else o for o in options or []]
+
+    def apply_filters(self, filters):
+        """
+        {filter kind: value} -> one change of the page's controls. Kinds the page doesn't offer are skipped;
+        every other control of the page is reset.
+        """
+        ids = self.filter_ids()
+        self.change({key: filters.get(kind) for kind, key in ids.items()})
+        return [kind for kind in filters if kind in ids]
+
+    def set_filters(self, filters):
+        """
+        {filter kind: value} -> one change of those controls only (the others keep their values).
+        """
+        ids = self.filter_ids()
+        self.change({ids[kind]: value for kind, value in filters.items() if kind in ids})
+        return [kind for kind in filters if kind in ids]
+
+    def toggle(self, kind, value):
+        """
+        Adds `value` to a multi-select filter of the current page, or removes it when already selected.
+        """
+        key = self.filter_ids().get(kind)
+        if key is None:
+            return False
+        current = list(self._value(key) or [])
+        self.change({key: [v for v in current if v != value] if value in current else current + [value]})
+        return True
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+
+# 1. PATH CONFIGURATION
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import numpy as np
+
+from benchmarks.bench_callbacks import DATA_DIR, dataset_file, environment
+from benchmarks.dash_client import DashSession, HttpTransport
+
+# --- Load Test ---
+# Starts the dashboard on a synthetic dataset (or targets a running server with --url) and lets N simulated
+# analysts use it at once: each opens the app, goes to a sidebar page, changes the date range, toggles
+# months / categories / companies / countries / sources, moves on to another page... Every callback request
+# goes through /_dash-update-component exactly as the browser sends it.
+#
+#   python benchmarks/load_test.py --scale 100k --users 1 4 16 --duration 30
+#   python benchmarks/load_test.py --mode gunicorn --workers 4 --users 16
+#   python benchmarks/load_test.py --env CACHE_ENABLED=0 --users 8        (compare caching strategies)
+#   python benchmarks/load_test.py --url http://127.0.0.1:8050 --users 8  (server already running)
+#
+# Reported per concurrency level and page: requests/s, p50 / p95 / p99 latency and error rate
+# (503 "busy" answers from admission control are errors, counted separately too).
+
+LOAD_CONFIG = {
+    'start_date': '2025-01-01',  # Date range the simulated users pick from (the synthetic data's year)
+    'days': 365,
+    'actions_per_page': (2, 6),  # Filter changes before moving to another page
+    'ready_timeout': 300,  # Seconds the server gets to load the data and answer
+}
+
+MULTI_FILTERS = ['months', 'categories', 'companies', 'countries', 'sources']
+
+
+# --- 2. SERVER ---
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, path, port, workers=2, threads=4, env=None):
+    """
+    Serves root_file/app.py on 127.0.0.1:port over the shared dataset file. Returns (process, log path).
+    mode 'threaded': one process, Werkzeug's threaded server. mode 'gunicorn': pre-fork workers x threads.
+    """
+    env = {**os.environ, **(env or {}), 'DATASET_SHARED_PATH': path}
+    if mode == 'gunicorn':
+        if shutil.which('gunicorn') is None:
+            raise RuntimeError("gunicorn is not installed (pip install gunicorn)")
+        command = ['gunicorn', '--workers', str(workers), '--threads', str(threads), '--timeout', '120',
+                   '--bind', f"127.0.0.1:{port}", 'root_file.app:server']
+    else:
+        command = [sys.executable, os.path.abspath(__file__), '--serve', str(port)]
+
+    log = tempfile.NamedTemporaryFile(prefix='job-portal-load-', suffix='.log', delete=False)
+    process = subprocess.Popen(command, cwd=parent_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return process, log.name
+
+
+def wait_ready(url, process=None, timeout=LOAD_CONFIG['ready_timeout']):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            return False
+        try:
+            transport = HttpTransport(url, timeout=5)
+            ready = transport.get('/_dash-dependencies') is not None
+            transport.close()
+            if ready:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# --- 3. SIMULATED USERS ---
+
+def random_action(session, rng):
+    """
+    One filter change a user would make on the current page.
+    """
+    ids = session.filter_ids()
+    choices = (['dates'] if 'start_date' in ids else []) + [k for k in MULTI_FILTERS if session.options(k)]
+    if not choices:
+        return
+    choice = choices[rng.integers(len(choices))]
+    if choice == 'dates':
+        if rng.random() < 0.2:
+            session.set_filters({'start_date': None, 'end_date': None})
+            return
+        start = np.datetime64(LOAD_CONFIG['start_date']) + int(rng.integers(0, LOAD_CONFIG['days'] - 7))
+        end = start + int(rng.integers(7, 91))
+        session.set_filters({'start_date': str(start), 'end_date': str(end)})
+    else:
+        options = session.options(choice)[:20]  # Users pick among the first options shown
+        session.toggle(choice, options[rng.integers(len(options))])
+
+
+def run_user(url, seed, deadline, think, records, errors):
+    """
+    One analyst: opens the app, then visits random sidebar pages and changes filters until the deadline.
+    """
+    rng = np.random.default_rng(seed)
+    transport = HttpTransport(url)
+    try:
+        session = DashSession(transport).start()
+        while time.monotonic() < deadline:
+            session.navigate(session.links[rng.integers(len(session.links))])
+            for _ in range(rng.integers(*LOAD_CONFIG['actions_per_page'])):
+                if time.monotonic() >= deadline:
+                    break
+                if think:
+                    time.sleep(rng.exponential(think))
+                random_action(session, rng)
+        records.extend(session.log)
+    except Exception as e:  # A broken session is reported, the other users go on
+        errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        transport.close()
+
+
+def run_level(url, users, duration, warmup=0.0, think=0.0, seed=0):
+    """
+    `users` concurrent analysts for warmup + duration seconds; only the last `duration` seconds are counted.
+    """
+    records, errors = [], []
+    start = time.monotonic()
+    deadline = start + warmup + duration
+    threads = [threading.Thread(target=run_user, args=(url, seed + i, deadline, think, records, errors), daemon=True)
+               for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counted = [r for r in records if r['at'] - start >= warmup]
+    elapsed = max(time.monotonic() - start - warmup, 1e-9)
+    return summarize(counted, elapsed) | {'users': users, 'session_errors': errors}
+
+
+def _stats(records, elapsed):
+    ms = np.array([r['seconds'] for r in records]) * 1000
+    failed = sum(r['status'] not in (200, 204) for r in records)
+    return {
+        'requests': len(records),
+        'throughput_rps': round(len(records) / elapsed, 2),
+        'p50_ms': round(float(np.percentile(ms, 50)), 2) if len(ms) else None,
+        'p95_ms': round(float(np.percentile(ms, 95)), 2) if len(ms) else None,
+        'p99_ms': round(float(np.percentile(ms, 99)), 2) if len(ms) else None,
+        'error_rate': round(failed / len(records), 4) if records else 0.0,
+        'busy': sum(r['status'] == 503 for r in records),
+    }
+
+
+def summarize(records, elapsed):
+    pages = sorted({r['page'] for r in records})
+    return {'seconds': round(elapsed, 2), 'total': _stats(records, elapsed),
+            'pages': {page: _stats([r for r in records if r['page'] == page], elapsed) for page in pages}}
+
+
+def print_level(result):
+    total = result['total']
+    print(f"\n{result['users']} users: {total['requests']} requests, {total['throughput_rps']} req/s, "
+          f"p50 {total['p50_ms']} ms, p95 {total['p95_ms']} ms, p99 {total['p99_ms']} ms, "
+          f"errors {total['error_rate']:.2%}")
+    print(f"  {'page':<26}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for page, stats in result['pages'].items():
+        print(f"  {page:<26}{stats['throughput_rps']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+              f"{stats['p99_ms']:>10}{stats['error_rate']:>9.2%}")
+    for error in result['session_errors'][:5]:
+        print(f"  ⚠️ Session failed: {error}")
+
+
+# --- 4. DRIVER ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent user sessions against the Dash callback route.")
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 4, 16], help="Concurrency levels, run in turn")
+    parser.add_argument('--duration', type=float, default=30, help="Measured seconds per level")
+    parser.add_argument('--warmup', type=float, default=5, help="Seconds per level before measuring")
+    parser.add_argument('--think', type=float, default=0, help="Mean pause (s) between a user's actions")
+    parser.add_argument('--scale', default='100k', help="Synthetic dataset size (10k, 100k, 1m, 5m or rows)")
+    parser.add_argument('--mode', choices=['threaded', 'gunicorn'], default='threaded', help="How to serve")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument('--threads', type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument('--env', nargs='*', default=[], help="KEY=VALUE settings for the server (e.g. CACHE_ENABLED=0)")
+    parser.add_argument('--url', help="Test a server that is already running instead of starting one")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--out', default=os.path.join('benchmarks', 'load_results.json'), help="JSON results file")
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)  # Port: run the threaded server in-process
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        from root_file.app import server
+        server.run(host='127.0.0.1', port=args.serve, threaded=True)
+        return 0
+
+    process = None
+    url = args.url
+    if url is None:
+        env = dict(item.split('=', 1) for item in args.env)
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        try:
+            process, log_path = start_server(args.mode, dataset_file(args.scale, args.seed, args.data_dir), port,
+                                             args.workers, args.threads, env)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"🚀 Starting the app ({args.mode}, {args.scale}) on {url} - log: {log_path}")
+
+    try:
+        if not wait_ready(url, process):
+            print(f"❌ Server at {url} did not come up")
+            return 1
+        report = {'meta': environment() | {'url': url},
+                  'settings': {k: v for k, v in vars(args).items() if k not in ('serve', 'data_dir', 'out')},
+                  'levels': []}
+        for users in args.users:
+            print(f"⏱️ {users} users for {args.warmup:g}s warmup + {args.duration:g}s...")
+            result = run_level(url, users, args.duration, args.warmup, args.think, args.seed)
+            report['levels'].append(result)
+            print_level(result)
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"\n💾 {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+import os
+import sys
+import json
+import math
+import argparse
+
+# 1. PATH CONFIGURATION
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import numpy as np
+import pandas as pd
+
+# --- Regression Gate ---
+# Compares a benchmark report (bench_callbacks.py JSON) with a stored baseline of the same machine:
+#
+#   python benchmarks/bench_callbacks.py --scales 100k --out benchmarks/baseline.json     (once, on main)
+#   python benchmarks/bench_callbacks.py --scales 100k --compare benchmarks/baseline.json (on a branch)
+#   python benchmarks/regression.py benchmarks/baseline.json benchmarks/results.json      (two saved reports)
+#
+# Latency samples are noisy, so a callback or stage counts as slower only when both hold: its samples are
+# shifted up by a one-sided Mann-Whitney U test (p < alpha; no assumption of normal timings, a few outliers
+# don't move it) AND its median grew by more than the threshold (and by more than min_latency_ms, so
+# sub-millisecond jitter is never a regression). Memory and payload are single numbers per callback: they
+# regress when they grow by more than their threshold. Exit status 1 when anything regressed.
+
+REGRESSION_CONFIG = {
+    'alpha': 0.05,  # Significance of the "slower" test
+    'latency_threshold': 0.25,  # Relative growth of the median latency
+    'min_latency_ms': 1.0,
+    'memory_threshold': 0.25,  # Relative growth of peak allocation / peak RSS
+    'min_memory_bytes': 2 ** 20,
+    'payload_threshold': 0.25,  # Relative growth of the largest response
+}
+
+# Run settings that must match for the numbers to be comparable
+_SETTINGS = ['repeat', 'seed', 'matrix']
+_META = ['python', 'pandas', 'numpy', 'dash', 'platform', 'cpus']
+
+
+# --- 2. STATISTICS ---
+
+def mann_whitney_greater(baseline, current):
+    """
+    One-sided Mann-Whitney U test: p-value of "current samples tend to be larger than baseline samples".
+    Normal approximation with tie and continuity corrections (fine from ~5 samples per side).
+    """
+    a, b = np.asarray(baseline, dtype=float), np.asarray(current, dtype=float)
+    n_a, n_b = len(a), len(b)
+    if not n_a or not n_b:
+        return 1.0
+    ranks = pd.Series(np.concatenate([a, b])).rank(method='average').to_numpy()
+    u = ranks[n_a:].sum() - n_b * (n_b + 1) / 2
+    n = n_a + n_b
+    ties = np.unique(ranks, return_counts=True)[1]
+    variance = n_a * n_b / 12 * ((n + 1) - (ties ** 3 - ties).sum() / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return 1.0
+    z = (u - n_a * n_b / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare_latency(baseline, current, config=REGRESSION_CONFIG):
+    """
+    Two lists of latencies (ms) -> {'base', 'current' (medians), 'change', 'p', 'regressed'}.
+    """
+    if not baseline or not current:
+        return None
+    base, now = float(np.median(baseline)), float(np.median(current))
+    p = mann_whitney_greater(baseline, current)
+    change = (now - base) / base if base > 0 else 0.0
+    regressed = (p < config['alpha'] and change > config['latency_threshold']
+                 and now - base > config['min_latency_ms'])
+    return {'base': base, 'current': now, 'change': change, 'p': p, 'regressed': regressed}
+
+
+def compare_value(base, now, threshold, minimum=0):
+    """
+    One number per side (memory, payload) -> same shape as compare_latency, without a p-value.
+    """
+    if base is None or now is None:
+        return None
+    change = (now - base) / base if base > 0 else 0.0
+    return {'base': base, 'current': now, 'change': change, 'p': None,
+            'regressed': change > threshold and now - base > minimum}
+
+
+# --- 3. REPORT COMPARISON ---
+
+def _pooled(entries, key):
+    return [s for entry in entries for s in entry.get(key, [])]
+
+
+def compare_page(base, current, config=REGRESSION_CONFIG):
+    """
+    Rows {'item', 'metric', ...compare result} for one page: the page as a whole (all its callbacks'
+    samples pooled), then each callback and compute stage.
+    """
+    rows = []
+
+    def add(item, metric, result):
+        if result is not None:
+            rows.append({'item': item, 'metric': metric, **result})
+
+    base_cbs, cur_cbs = base.get('callbacks', {}), current.get('callbacks', {})
+    for run in ('cold', 'warm'):
+        add('(page)', run, compare_latency(_pooled(base_cbs.values(), f"{run}_samples_ms"),
+                                           _pooled(cur_cbs.values(), f"{run}_samples_ms"), config))
+    for name in sorted(set(base_cbs) & set(cur_cbs)):
+        b, c = base_cbs[name], cur_cbs[name]
+        for run in ('cold', 'warm'):
+            add(name, run, compare_latency(b[f"{run}_samples_ms"], c[f"{run}_samples_ms"], config))
+        add(name, 'peak_alloc', compare_value(b.get('peak_alloc_bytes'), c.get('peak_alloc_bytes'),
+                                              config['memory_threshold'], config['min_memory_bytes']))
+        add(name, 'bytes', compare_value(b['bytes']['max'], c['bytes']['max'], config['payload_threshold']))
+        if c.get('errors', 0) > b.get('errors', 0):
+            rows.append({'item': name, 'metric': 'errors', 'base': b.get('errors', 0), 'current': c['errors'],
+                         'change': None, 'p': None, 'regressed': True})
+
+    base_stages, cur_stages = base.get('stages', {}), current.get('stages', {})
+    for name in sorted(set(base_stages) & set(cur_stages)):
+        add(f"stage.{name}", 'cold', compare_latency(base_stages[name]['cold_samples_ms'],
+                                                     cur_stages[name]['cold_samples_ms'], config))
+    return rows
+
+
+def compare_reports(baseline, current, config=REGRESSION_CONFIG):
+    """
+    {'warnings': [...], 'scales': {scale: {'peak_rss': row, 'pages': {page: rows}}}} over the scales and
+    pages both reports have.
+    """
+    warnings = []
+    for key in _SETTINGS:
+        if baseline.get('settings', {}).get(key) != current.get('settings', {}).get(key):
+            warnings.append(f"settings.{key} differs: {baseline['settings'].get(key)} vs "
+                            f"{current['settings'].get(key)}")
+    for key in _META:
+        if baseline.get('meta', {}).get(key) != current.get('meta', {}).get(key):
+            warnings.append(f"{key} differs: {baseline['meta'].get(key)} vs {current['meta'].get(key)}")
+
+    scales = {}
+    for scale in [s for s in current.get('scales', {}) if s in baseline.get('scales', {})]:
+        b, c = baseline['scales'][scale], current['scales'][scale]
+        if b.get('rows') != c.get('rows'):
+            warnings.append(f"{scale}: {b.get('rows')} vs {c.get('rows')} rows")
+        rss = compare_value(b.get('peak_rss_mb', 0) * 2 ** 20, c.get('peak_rss_mb', 0) * 2 ** 20,
+                            config['memory_threshold'], config['min_memory_bytes'])
+        pages = {page: compare_page(b['pages'][page], c['pages'][page], config)
+                 for page in c['pages'] if page in b['pages']}
+        missing = sorted(set(b['pages']) - set(c['pages']))
+        if missing:
+            warnings.append(f"{scale}: pages not in the new report: {', '.join(missing)}")
+        scales[scale] = {'peak_rss': {'item': '(process)', 'metric': 'peak_rss', **rss}, 'pages': pages}
+    if not scales:
+        warnings.append("No scale in common - nothing compared")
+    return {'warnings': warnings, 'scales': scales}
+
+
+def regressions(comparison):
+    """
+    [(scale, page, row)] of everything that regressed.
+    """
+    found = []
+    for scale, result in comparison['scales'].items():
+        if result['peak_rss']['regressed']:
+            found.append((scale, None, result['peak_rss']))
+        for page, rows in result['pages'].items():
+            found.extend((scale, page, row) for row in rows if row['regressed'])
+    return found
+
+
+# --- 4. OUTPUT ---
+
+def _format(metric, value):
+    if value is None:
+        return '-'
+    if metric in ('peak_alloc', 'peak_rss', 'bytes'):
+        return f"{value / 2 ** 20:.1f} MB" if value >= 2 ** 20 else f"{value / 1024:.1f} KB"
+    if metric == 'errors':
+        return str(value)
+    return f"{value:.1f} ms"
+
+
+def print_comparison(comparison, verbose=False):
+    """
+    Per-page diff table: the page totals, plus every row that regressed (all rows with verbose).
+    """
+    for warning in comparison['warnings']:
+        print(f"⚠️ {warning}")
+    header = f"  {'page / item':<44}{'metric':<11}{'baseline':>11}{'current':>11}{'change':>9}{'p':>8}  "
+    for scale, result in comparison['scales'].items():
+        rss = result['peak_rss']
+        print(f"\n{scale}: peak RSS {_format('peak_rss', rss['base'])} -> {_format('peak_rss', rss['current'])}"
+              f" ({rss['change']:+.0%}){'  ❌ REGRESSED' if rss['regressed'] else ''}")
+        print(header)
+        for page, rows in result['pages'].items():
+            for row in rows:
+                if not (row['item'] == '(page)' or row['regressed'] or verbose):
+                    continue
+                item = page if row['item'] == '(page)' else f"  {row['item']}"
+                change = '-' if row['change'] is None else f"{row['change']:+.0%}"
+                p = '-' if row['p'] is None else f"{row['p']:.3f}"
+                print(f"  {item[:43]:<44}{row['metric']:<11}{_format(row['metric'], row['base']):>11}"
+                      f"{_format(row['metric'], row['current']):>11}{change:>9}{p:>8}  "
+                      f"{'❌' if row['regressed'] else '✅'}")
+
+    found = regressions(comparison)
+    if found:
+        print(f"\n❌ {len(found)} regression(s)")
+    else:
+        print("\n✅ No regression beyond the thresholds")
+    return found
+
+
+def gate(baseline_path, current, config=REGRESSION_CONFIG, verbose=False):
+    """
+    Compares a report (dict) with the baseline file and prints the table. Returns the exit status (0 / 1).
+    """
+    if not os.path.exists(baseline_path):
+        print(f"❌ Baseline {baseline_path} not found (save one with bench_callbacks.py --out {baseline_path})")
+        return 1
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    comparison = compare_reports(baseline, current, config)
+    found = print_comparison(comparison, verbose)
+    return 1 if found or not comparison['scales'] else 0
+
+
+def add_arguments(parser):
+    """
+    The thresholds as command-line options (shared with bench_callbacks.py --compare).
+    """
+    parser.add_argument('--alpha', type=float, default=REGRESSION_CONFIG['alpha'],
+                        help="Significance level of the latency test")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_CONFIG['latency_threshold'],
+                        help="Relative latency growth that counts (0.25 = +25%%)")
+    parser.add_argument('--memory-threshold', type=float, default=REGRESSION_CONFIG['memory_threshold'],
+                        help="Relative memory growth that counts")
+    parser.add_argument('--payload-threshold', type=float, default=REGRESSION_CONFIG['payload_threshold'],
+                        help="Relative response size growth that counts")
+    parser.add_argument('--show-all', action='store_true', help="List every callback and stage, not only regressions")
+
+
+def config_from(args):
+    return {**REGRESSION_CONFIG, 'alpha': args.alpha, 'latency_threshold': args.threshold,
+            'memory_threshold': args.memory_threshold, 'payload_threshold': args.payload_threshold}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a benchmark report with a stored baseline.")
+    parser.add_argument('baseline', help="Baseline JSON (bench_callbacks.py output)")
+    parser.add_argument('current', help="New JSON to check")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    return gate(args.baseline, current, config_from(args), args.show_all)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
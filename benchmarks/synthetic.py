@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+from Data.get_localsqldata import COLUMN_MAPPING
+
+# --- Synthetic Job Table ---
+# Same columns as load_data() returns (COLUMN_MAPPING), with the skew of the real data: a few countries,
+# companies and traffic sources hold most of the jobs (Zipf-like weights), views are heavy-tailed and
+# applications follow views. Deterministic for a given (rows, seed).
+
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '5m': 5_000_000,
+}
+
+COUNTRIES = ['United States', 'United Kingdom', 'India', 'Germany', 'Canada', 'Australia', 'Pakistan',
+             'United Arab Emirates', 'France', 'Netherlands', 'Nigeria', 'Brazil', 'Philippines', 'Spain',
+             'Singapore', 'South Africa', 'Ireland', 'Poland', 'Mexico', 'Egypt', 'Kenya', 'Japan', 'Italy',
+             'Saudi Arabia', 'Malaysia', 'Sweden', 'Bangladesh', 'Indonesia', 'Turkey', 'New Zealand']
+CATEGORIES = ['IT & Software', 'Sales & Marketing', 'Healthcare', 'Finance & Accounting', 'Engineering',
+              'Customer Service', 'Education', 'Logistics', 'Hospitality', 'Human Resources', 'Design',
+              'Legal', 'Construction', 'Manufacturing', 'Administration']
+TRAFFIC_SOURCES = ['Google', 'Direct', 'LinkedIn', 'Indeed', 'Facebook', 'Email', 'Referral', 'Glassdoor']
+AD_STATUSES = ['active', 'expired', 'paused', 'closed']
+
+_NAME_PARTS = (
+    ['Blue', 'Global', 'Prime', 'North', 'Bright', 'Apex', 'Silver', 'Urban', 'Nova', 'Summit', 'Green', 'Delta',
+     'Pioneer', 'Vertex', 'Atlas', 'Cobalt', 'Harbor', 'Crest', 'Swift', 'Quantum'],
+    ['Data', 'Health', 'Logistics', 'Systems', 'Labs', 'Retail', 'Capital', 'Works', 'Media', 'Energy', 'Foods',
+     'Networks', 'Partners', 'Dynamics', 'Solutions', 'Robotics', 'Travel', 'Studios', 'Analytics', 'Security'],
+    ['Ltd', 'Inc', 'Group', 'LLC', 'GmbH', 'Co', 'Holdings', 'Pvt Ltd', 'PLC', 'Corp'],
+)
+_TITLE_PARTS = (
+    ['Senior', 'Junior', 'Lead', 'Principal', 'Associate', 'Staff', 'Head of', 'Assistant', 'Trainee', ''],
+    ['Software', 'Data', 'Sales', 'Marketing', 'Finance', 'Support', 'Operations', 'Product', 'Project', 'HR',
+     'Warehouse', 'Nursing', 'Design', 'Legal', 'Teaching'],
+    ['Engineer', 'Analyst', 'Manager', 'Specialist', 'Coordinator', 'Consultant', 'Officer', 'Executive',
+     'Developer', 'Representative'],
+)
+
+
+def _zipf_weights(count, exponent):
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _names(rng, parts, count):
+    """
+    `count` distinct "part part part" names (numbered once the combinations run out).
+    """
+    first, second, third = parts
+    combos = len(first) * len(second) * len(third)
+    names = []
+    for i, p in enumerate(rng.permutation(max(count, combos))[:count]):
+        a, b, c = p % len(first), p // len(first) % len(second), p // (len(first) * len(second)) % len(third)
+        name = f"{first[a]} {second[b]} {third[c]}".strip()
+        names.append(name if i < combos else f"{name} {i // combos + 1}")
+    return names
+
+
+def _prefixed(prefix, numbers):
+    """
+    prefix + number as a string column (Arrow-backed when pyarrow is available, much lighter at millions of rows).
+    """
+    try:
+        return prefix + pd.Series(numbers).astype('string[pyarrow]')
+    except ImportError:
+        return prefix + pd.Series(numbers).astype(str)
+
+
+def make_dataset(rows, seed=0, start='2025-01-01', days=365, strings='object'):
+    """
+    DataFrame of `rows` synthetic job ads with the renamed schema of Data/get_localsqldata.load_data().
+    strings='object' matches what read_sql returns; 'pyarrow' stores text columns as Arrow strings (the shared
+    dataset's layout), which keeps 5M rows within a few GB.
+    """
+    rng = np.random.default_rng(seed)
+    companies = np.array(_names(rng, _NAME_PARTS, max(50, min(rows // 25, 20_000))), dtype=object)
+    titles = np.array(_names(rng, _TITLE_PARTS, 1200), dtype=object)
+
+    company_idx = rng.choice(len(companies), rows, p=_zipf_weights(len(companies), 1.1))
+    created = (pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days * 86400, rows), unit='s')).sort_values()
+    run_days = rng.integers(7, 60, rows)
+
+    views = np.floor(rng.lognormal(4.0, 1.2, rows)).astype(np.int64)
+    applications = rng.binomial(views, rng.beta(2, 30, rows))
+    ids = np.arange(1, rows + 1)
+
+    df = pd.DataFrame({
+        'Unique_Row_ID': ids,
+        'Original_Source_ID': rng.integers(1, max(rows // 2, 2), rows),
+        'Data_Source_Month': created.strftime('%Y_%m'),
+        'Job_Title': titles[rng.integers(0, len(titles), rows)],
+        'Job_Category': np.array(CATEGORIES, dtype=object)[
+            rng.choice(len(CATEGORIES), rows, p=_zipf_weights(len(CATEGORIES), 0.8))],
+        'Company': companies[company_idx],
+        'Company_Email': _prefixed('hr@company', company_idx) + '.example.com',
+        'Ad_Status': np.array(AD_STATUSES, dtype=object)[rng.choice(len(AD_STATUSES), rows, p=[0.5, 0.35, 0.1, 0.05])],
+        'Total_Views': views,
+        'Total_Applications': applications,
+        'Outbound_Clicks': rng.binomial(views, 0.02),
+        'User_ID': rng.integers(1, max(rows // 3, 2), rows),
+        'Customer_ID': company_idx + 1,
+        'Product_ID': rng.integers(1, 6, rows),
+        'Subscription_ID': rng.integers(1, max(rows // 10, 2), rows),
+        'Created_At': created,
+        'Run_Start_Date': created.normalize(),
+        'Run_End_Date': created.normalize() + pd.to_timedelta(run_days, unit='D'),
+        'Job_URL': _prefixed('https://jobs.example.com/ad/', ids),
+        'Country': np.array(COUNTRIES, dtype=object)[
+            rng.choice(len(COUNTRIES), rows, p=_zipf_weights(len(COUNTRIES), 1.3))],
+        'Traffic_Source': np.array(TRAFFIC_SOURCES, dtype=object)[
+            rng.choice(len(TRAFFIC_SOURCES), rows, p=_zipf_weights(len(TRAFFIC_SOURCES), 1.2))],
+    })
+    text = df.columns[df.dtypes == object]
+    df[text] = df[text].astype('string[pyarrow]' if strings == 'pyarrow' else object)
+    return df[list(COLUMN_MAPPING.values())]
+
+
+def scale_rows(name):
+    """
+    '100k' -> 100000 (also accepts plain numbers).
+    """
+    return SCALES[name] if name in SCALES else int(float(name))
@@ -0,0 +1,183 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from Data.dataset import get_dataset, dataset_version
+from engine.selection import select_positions
+
+# --- Company Activity Index ---
+# Built once per dataset version: the Company column as integer codes, each row's month (counted from the
+# dataset's first month) and the row positions ordered by (company, posting time). The retention / cohort
+# stages read per-company activity from it instead of grouping all rows by company on every request:
+# the matching rows of a selection are the index order with the other rows skipped, already grouped by
+# company and in time order, so first / last posting, counts and sums are slices and reduceat calls.
+# Active months are bitsets: bit m of word m // 64 = the company posted in month m.
+
+DATE_COLUMN = 'Created_At'
+COMPANY_COLUMN = 'Company'
+
+_INDEX = {'version': None, 'index': None}
+# Held while building: the page's callbacks all fire together on first load, the first one builds
+_LOCK = threading.RLock()
+
+# Set bits per byte value (popcount of the bitsets without numpy >= 2's bitwise_count)
+_BIT_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+# --- 2. INDEX ---
+
+def _times(df):
+    created = pd.to_datetime(df[DATE_COLUMN])
+    if getattr(created.dt, 'tz', None) is not None:
+        created = created.dt.tz_localize(None)
+    return created
+
+
+def _build(df):
+    created = _times(df)
+    codes, companies = pd.factorize(df[COMPANY_COLUMN], sort=True)  # -1 = no company
+    int_type = np.int32 if len(df) < 2 ** 31 else np.int64
+
+    valid = (codes >= 0) & created.notna().to_numpy()
+    months = np.zeros(len(df), dtype=np.int32)
+    first_month = None
+    if valid.any():
+        stamps = created[valid]
+        month_keys = (stamps.dt.year * 12 + stamps.dt.month - 1).to_numpy()
+        start = int(month_keys.min())
+        months[valid] = month_keys - start
+        first_month = pd.Period(year=start // 12, month=start % 12 + 1, freq='M')
+
+    positions = np.flatnonzero(valid).astype(int_type)
+    order = positions[np.lexsort((created.to_numpy()[positions], codes[positions]))]
+    month_count = int(months.max()) + 1 if len(positions) else 0
+    return {
+        'codes': codes.astype(int_type),
+        'companies': np.asarray(companies, dtype=object),
+        'months': months,
+        'order': order,
+        'first_month': first_month,
+        'month_count': month_count,
+        'words': max(1, -(-month_count // 64)),
+        'all': None,  # Activity of every row, computed on first use
+    }
+
+
+def activity_index():
+    """
+    The index of the active dataset (see above), or None when there is no dataset / no Company + date column.
+    """
+    version = dataset_version()
+    with _LOCK:
+        if _INDEX['version'] != version:
+            df = get_dataset()
+            index = None
+            if df is not None and {DATE_COLUMN, COMPANY_COLUMN} <= set(df.columns):
+                index = _build(df)
+            _INDEX.update(version=version, index=index)
+        return _INDEX['index']
+
+
+def clear_activity():
+    with _LOCK:
+        _INDEX.update(version=None, index=None)
+
+
+# --- 3. ACTIVITY PER COMPANY ---
+
+def _column(df, col, rows):
+    if col not in df.columns:
+        return np.zeros(len(rows), dtype=np.int64)
+    values = df[col].to_numpy()[rows]
+    return np.nan_to_num(values.astype(np.float64)) if values.dtype.kind not in 'iub' else values.astype(np.int64)
+
+
+def _activity(index, rows):
+    """
+    Per company with at least one of `rows` (index order): first / last posting, postings, applications,
+    views and active-month bitsets.
+    """
+    df = get_dataset()
+    codes = index['codes'][rows]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(rows) else np.zeros(0, dtype=np.int64)
+    ends = np.r_[starts[1:], len(rows)] - 1 if len(rows) else starts
+
+    times = _times(df).to_numpy()[rows]
+    months = index['months'][rows]
+    bits = np.zeros((len(starts), index['words']), dtype=np.uint64)
+    if len(rows):
+        row_bits = np.left_shift(np.uint64(1), (months % 64).astype(np.uint64))
+        for word in range(index['words']):
+            bits[:, word] = np.bitwise_or.reduceat(np.where(months // 64 == word, row_bits, np.uint64(0)), starts)
+
+    def total(col):
+        values = _column(df, col, rows)
+        return np.add.reduceat(values, starts) if len(rows) else values[:0]
+
+    return {
+        'companies': index['companies'][codes[starts]],
+        'first': times[starts],
+        'last': times[ends],
+        'postings': np.diff(np.r_[starts, len(rows)]),
+        'applications': total('Total_Applications'),
+        'views': total('Total_Views'),
+        'bits': bits,
+        'first_month': index['first_month'],
+        'month_count': index['month_count'],
+    }
+
+
+def company_activity(selection):
+    """
+    Activity per company over the rows matching `selection` (see _activity), or None without an index.
+    Unfiltered, it is computed once per dataset version.
+    """
+    index = activity_index()
+    if index is None:
+        return None
+
+    positions = select_positions(selection)
+    if positions is None:
+        with _LOCK:
+            if index['all'] is None:
+                index['all'] = _activity(index, index['order'])
+            return index['all']
+
+    member = np.zeros(len(index['codes']), dtype=bool)
+    member[positions] = True
+    return _activity(index, index['order'][member[index['order']]])
+
+
+# --- 4. BITSETS ---
+
+def active_months(bits):
+    """
+    Number of set bits (active months) per row of a bitset matrix.
+    """
+    return _BIT_COUNTS[np.ascontiguousarray(bits).view(np.uint8)].reshape(len(bits), -1).sum(axis=1)
+
+
+def month_matrix(bits, month_count):
+    """
+    Bitsets -> boolean matrix (companies x months), column m = active in month m.
+    """
+    flags = np.unpackbits(np.ascontiguousarray(bits.astype('<u8')).view(np.uint8), axis=1, bitorder='little')
+    return flags[:, :month_count].astype(bool)
+
+
+def first_active_month(bits, month_count):
+    """
+    Lowest active month per company (-1 for an empty bitset).
+    """
+    matrix = month_matrix(bits, month_count)
+    return np.where(matrix.any(axis=1), matrix.argmax(axis=1), -1)
+
+
+def month_labels(first_month, month_count):
+    """
+    'YYYY-MM' label of every month of the index.
+    """
+    if first_month is None:
+        return []
+    return [str(first_month + i) for i in range(month_count)]
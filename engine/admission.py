@@ -0,0 +1,175 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import Response
+
+# --- 1. CONFIGURATION ---
+# Stage computations (cache misses) are admitted per page: at most `max_concurrent` run at once, up to `max_queue`
+# more wait at most `queue_timeout` seconds for a slot, anything beyond is rejected at once as "busy" (HTTP 503).
+# Identical computations already in flight are not started twice: later callers wait for the first one's result.
+ADMISSION_CONFIG = {
+    'enabled': os.getenv('ADMISSION_ENABLED', '1') != '0',
+    'max_concurrent': int(os.getenv('ADMISSION_MAX_CONCURRENT', 2)),  # Stage computations per page at once
+    'max_queue': int(os.getenv('ADMISSION_MAX_QUEUE', 8)),  # Computations per page waiting for a slot
+    'queue_timeout': float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 20)),  # Seconds a computation waits for a slot
+    'retry_after': 2,  # Seconds suggested to rejected clients
+    # Per-page overrides, e.g. ADMISSION_PAGE_LIMITS="company_analytics=1,country_category_analytics=1"
+    'page_limits': {
+        page.strip(): int(limit)
+        for page, _, limit in (item.partition('=') for item in os.getenv('ADMISSION_PAGE_LIMITS', '').split(','))
+        if page.strip() and limit.strip()
+    },
+}
+
+_GATES = {}  # page -> slots + counters
+_FLIGHTS = {}  # computation key -> in-flight computation
+_LOCK = threading.RLock()
+_HELD = threading.local()  # Pages whose slot the current thread holds (nested stages don't queue again)
+
+
+class ServerBusy(RuntimeError):
+    def __init__(self, page, reason):
+        super().__init__(f"{page}: {reason}")
+        self.page = page
+        self.reason = reason
+
+
+def _held():
+    if not hasattr(_HELD, 'pages'):
+        _HELD.pages = set()
+    return _HELD.pages
+
+
+def page_limit(page):
+    return ADMISSION_CONFIG['page_limits'].get(page, ADMISSION_CONFIG['max_concurrent'])
+
+
+def _gate(page):
+    with _LOCK:
+        gate = _GATES.get(page)
+        if gate is None:
+            gate = _GATES[page] = {'slots': threading.BoundedSemaphore(max(page_limit(page), 1)), 'running': 0,
+                                   'waiting': 0, 'admitted': 0, 'queued': 0, 'rejected': 0, 'timeouts': 0,
+                                   'coalesced': 0}
+        return gate
+
+
+# --- 2. ADMISSION ---
+
+@contextmanager
+def admit(page):
+    """
+    Holds one of the page's computation slots for the duration of the block.
+    Raises ServerBusy when the wait queue is full or no slot frees up within queue_timeout.
+    """
+    held = _held()
+    if not ADMISSION_CONFIG['enabled'] or page_limit(page) <= 0 or page in held:
+        yield
+        return
+
+    gate = _gate(page)
+    if not gate['slots'].acquire(blocking=False):
+        with _LOCK:
+            if gate['waiting'] >= ADMISSION_CONFIG['max_queue']:
+                gate['rejected'] += 1
+                raise ServerBusy(page, "too many requests waiting")
+            gate['waiting'] += 1
+            gate['queued'] += 1
+        try:
+            acquired = gate['slots'].acquire(timeout=ADMISSION_CONFIG['queue_timeout'])
+        finally:
+            with _LOCK:
+                gate['waiting'] -= 1
+        if not acquired:
+            with _LOCK:
+                gate['timeouts'] += 1
+            raise ServerBusy(page, f"no free slot within {ADMISSION_CONFIG['queue_timeout']:g}s")
+
+    with _LOCK:
+        gate['running'] += 1
+        gate['admitted'] += 1
+    held.add(page)
+    try:
+        yield
+    finally:
+        held.discard(page)
+        with _LOCK:
+            gate['running'] -= 1
+        gate['slots'].release()
+
+
+def admitted(page, func):
+    """
+    func wrapped so each call runs inside admit(page).
+    """
+
+    @wraps(func)
+    def wrapper(*args):
+        with admit(page):
+            return func(*args)
+
+    return wrapper
+
+
+# --- 3. SINGLE FLIGHT ---
+
+def single_flight(page, key, func):
+    """
+    Runs func() once per key at a time: callers arriving while it runs wait and get (leader, value) = (False, its
+    result), or its exception - for at most queue_timeout seconds, then ServerBusy. A thread already computing
+    for `page` runs func() itself instead of waiting (the in-flight leader may be queued behind that very thread's
+    slot).
+    """
+    if page in _held():
+        return True, func()
+
+    with _LOCK:
+        flight = _FLIGHTS.get(key)
+        leader = flight is None
+        if leader:
+            flight = _FLIGHTS[key] = {'done': threading.Event(), 'value': None, 'error': None}
+        else:
+            _gate(page)['coalesced'] += 1
+
+    if not leader:
+        if not flight['done'].wait(timeout=ADMISSION_CONFIG['queue_timeout']):
+            with _LOCK:
+                _gate(page)['timeouts'] += 1
+            raise ServerBusy(page, f"identical computation still running after {ADMISSION_CONFIG['queue_timeout']:g}s")
+        if flight['error'] is not None:
+            raise flight['error']
+        return False, flight['value']
+
+    try:
+        flight['value'] = func()
+        return True, flight['value']
+    except BaseException as e:
+        flight['error'] = e
+        raise
+    finally:
+        with _LOCK:
+            _FLIGHTS.pop(key, None)
+        flight['done'].set()
+
+
+# --- 4. STATS + HTTP ---
+
+def admission_stats():
+    with _LOCK:
+        return {page: {k: v for k, v in gate.items() if k != 'slots'} | {'limit': page_limit(page)}
+                for page, gate in _GATES.items()}
+
+
+def register_busy_handler(server):
+    """
+    ServerBusy raised anywhere in a request (Dash callback, JSON API...) -> 503 + Retry-After.
+    """
+
+    @server.errorhandler(ServerBusy)
+    def _busy(error):
+        body = json.dumps({'error': 'busy', 'page': error.page, 'reason': error.reason})
+        return Response(body, status=503, mimetype='application/json',
+                        headers={'Retry-After': str(ADMISSION_CONFIG['retry_after'])})
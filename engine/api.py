@@ -0,0 +1,171 @@
+import os
+import json
+import math
+import hashlib
+import datetime
+import importlib
+
+import numpy as np
+import pandas as pd
+from flask import request, Response
+
+from Data.dataset import dataset_version, dataset_token
+from engine.selection import make_selection
+from engine.stages import STAGES, COMPUTE_MODULES, run_stage
+
+# --- 1. CONFIGURATION ---
+# Read-only JSON view of the compute stages for scripts and other internal tools:
+#   GET /api/v1                                  -> pages, their stages and filter parameters
+#   GET /api/v1/<page>/<stage>?country=India&... -> the stage result (same cache as the dashboard)
+# Responses carry an ETag derived from (dataset version, page, stage, filters): a matching If-None-Match
+# is answered 304 before anything is computed.
+API_CONFIG = {
+    'enabled': os.getenv('API_ENABLED', '1') != '0',
+    'prefix': os.getenv('API_PREFIX', '/api/v1'),
+}
+
+# Query parameter -> make_selection() argument. List parameters repeat: ?country=India&country=Germany
+PARAMS = {
+    'start_date': ('start_date', 'start_date', False),
+    'end_date': ('end_date', 'end_date', False),
+    'month': ('months', 'months', True),
+    'category': ('categories', 'Job_Category', True),
+    'company': ('companies', 'Company', True),
+    'country': ('countries', 'Country', True),
+    'source': ('sources', 'Traffic_Source', True),
+}
+
+
+class ApiError(ValueError):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- 2. PAGES + SELECTION ---
+
+def _pages():
+    """
+    {page: selection keys of its filter bar}, for every compute module.
+    """
+    modules = [importlib.import_module(name) for name in COMPUTE_MODULES]
+    return {module.PAGE: getattr(module, 'FILTERS', None) for module in modules}
+
+
+def _page_params(filters):
+    return [param for param, (_, key, _) in PARAMS.items() if filters is None or key in filters]
+
+
+def parse_selection(page, args):
+    """
+    Builds the page's selection from query arguments. Parameters the page's filter bar doesn't offer are rejected.
+    """
+    allowed = _page_params(_pages()[page])
+    unknown = sorted(set(args) - set(allowed))
+    if unknown:
+        raise ApiError(400, f"Unsupported parameter(s) for {page}: {', '.join(unknown)} "
+                            f"(allowed: {', '.join(allowed)})")
+
+    kwargs = {}
+    for param, (argument, _, many) in PARAMS.items():
+        values = [v for v in args.getlist(param) if v != ''] if param in args else []
+        if not values:
+            continue
+        if param == 'month':
+            try:
+                values = [int(v) for v in values]
+            except ValueError:
+                values = [0]
+            if not all(1 <= v <= 12 for v in values):
+                raise ApiError(400, "month must be a number between 1 and 12")
+        elif param in ('start_date', 'end_date'):
+            try:
+                values = [datetime.date.fromisoformat(v[:10]).isoformat() for v in values]
+            except ValueError:
+                raise ApiError(400, f"{param} must be a date (YYYY-MM-DD)")
+        kwargs[argument] = values if many else values[-1]
+
+    return make_selection(dataset_token(), **kwargs)
+
+
+def etag_for(page, name, selection):
+    raw = json.dumps([dataset_version(), page, name, selection], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+# --- 3. JSON ENCODING ---
+
+def to_json(value):
+    """
+    Stage results (dicts, tuples, Series, DataFrames, numpy / pandas scalars) as plain JSON values.
+    Series become {index: value}, DataFrames a list of row objects (a named index becomes a column).
+    """
+    if isinstance(value, pd.DataFrame):
+        if value.index.name is not None or isinstance(value.index, pd.MultiIndex):
+            value = value.reset_index()
+        return [{str(k): to_json(v) for k, v in row.items()} for row in value.to_dict('records')]
+    if isinstance(value, pd.Series):
+        return {str(to_json(k)): to_json(v) for k, v in value.items()}
+    if isinstance(value, dict):
+        return {str(to_json(k)): to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [to_json(v) for v in value]
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) or math.isinf(value) else float(value)
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, pd.Period):
+        return str(value)
+    return value
+
+
+def _json_response(payload, status=200):
+    return Response(json.dumps(payload, separators=(',', ':')), status=status, mimetype='application/json')
+
+
+# --- 4. ROUTES ---
+
+def register_api(server):
+    """
+    Adds the read-only routes to the Flask server behind the Dash app.
+    """
+    if not API_CONFIG['enabled']:
+        return
+    prefix = API_CONFIG['prefix'].rstrip('/')
+
+    @server.route(prefix, methods=['GET'])
+    def api_index():
+        pages = _pages()
+        return _json_response({
+            'version': dataset_version(),
+            'pages': {page: {'stages': sorted(name for (p, name) in STAGES if p == page),
+                             'params': _page_params(filters)}
+                      for page, filters in pages.items()},
+        })
+
+    @server.route(f"{prefix}/<page>/<name>", methods=['GET'])
+    def api_stage(page, name):
+        if (page, name) not in STAGES:
+            return _json_response({'error': f"Unknown stage {page}/{name}"}, 404)
+        if dataset_version() is None:
+            return _json_response({'error': "No dataset loaded"}, 503)
+        try:
+            selection = parse_selection(page, request.args)
+        except ApiError as e:
+            return _json_response({'error': str(e)}, e.status)
+
+        etag = etag_for(page, name, selection)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            result = run_stage(page, name, selection)
+            response = _json_response({'page': page, 'stage': name, 'version': selection['version'],
+                                       'filters': {k: v for k, v in selection.items() if k != 'version' and v},
+                                       'data': to_json(result)})
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'  # Clients revalidate; unchanged answers cost a 304
+        return response
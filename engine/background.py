@@ -0,0 +1,94 @@
+import os
+import contextvars
+from functools import wraps
+
+from Data.dataset import dataset_version
+
+# --- 1. CONFIGURATION ---
+# Background mode is opt-in: BACKGROUND_CALLBACKS=1 (needs `pip install dash[diskcache]`).
+# Jobs run in local subprocesses and results are kept in a disk cache - no external broker.
+BACKGROUND_CONFIG = {
+    'enabled': os.getenv('BACKGROUND_CALLBACKS', '0') == '1',
+    'cache_dir': os.getenv('BACKGROUND_CACHE_DIR', os.path.join(os.getcwd(), '.dash-jobs')),
+    'result_ttl': int(os.getenv('BACKGROUND_RESULT_TTL', 3600)),
+    'poll_interval_ms': int(os.getenv('BACKGROUND_POLL_MS', 500)),
+}
+
+_STATE = {'manager': None, 'initialized': False}
+
+# set_progress of the job currently running in this process/thread (None for inline callbacks)
+_PROGRESS = contextvars.ContextVar('background_progress', default=None)
+
+
+# --- 2. MANAGER ---
+
+def get_background_manager():
+    """
+    Returns the shared DiskcacheManager, or None when background mode is off / unavailable.
+    """
+    if _STATE['initialized']:
+        return _STATE['manager']
+    _STATE['initialized'] = True
+
+    if not BACKGROUND_CONFIG['enabled']:
+        return None
+
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+    except ImportError:
+        print("⚠️ BACKGROUND_CALLBACKS=1 but 'dash[diskcache]' is not installed. Running callbacks inline.")
+        return None
+
+    cache = diskcache.Cache(BACKGROUND_CONFIG['cache_dir'])
+    # Results are re-used across users for the same inputs, until the dataset version changes
+    _STATE['manager'] = DiskcacheManager(cache, cache_by=[dataset_version], expire=BACKGROUND_CONFIG['result_ttl'])
+    print(f"🧵 Background callbacks enabled (job cache: {BACKGROUND_CONFIG['cache_dir']})")
+    return _STATE['manager']
+
+
+# --- 3. PROGRESS ---
+
+def report_progress(percent, label=""):
+    """
+    Pushes a progress update to the page's progress bar. No-op when running inline.
+    """
+    set_progress = _PROGRESS.get()
+    if set_progress is not None:
+        set_progress((int(percent), label))
+
+
+# --- 4. REGISTRATION ---
+
+def background_callback(app, outputs, inputs, progress=None, running=None):
+    """
+    Registers `func` as a background job when a manager is available, otherwise as a normal callback.
+
+    - progress: [Output(bar, 'value'), Output(bar, 'label')] fed by report_progress().
+    - running:  Dash `running` spec (e.g. show the progress bar while the job runs).
+    A new request from the same page automatically cancels the job it supersedes.
+    """
+
+    def decorator(func):
+        manager = get_background_manager()
+        if manager is None:
+            return app.callback(outputs, inputs)(func)
+
+        @wraps(func)
+        def job(set_progress, *args):
+            token = _PROGRESS.set(set_progress)
+            try:
+                return func(*args)
+            finally:
+                _PROGRESS.reset(token)
+
+        return app.callback(
+            outputs, inputs,
+            background=True,
+            manager=manager,
+            progress=progress,
+            running=running,
+            interval=BACKGROUND_CONFIG['poll_interval_ms'],
+        )(job)
+
+    return decorator
@@ -0,0 +1,295 @@
+import os
+import re
+import time
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from Data.dataset import dataset_version
+from engine.admission import single_flight
+from engine.metrics import note_cache
+
+# --- 1. CONFIGURATION ---
+# All limits can be overridden from the environment (see .env-example).
+CACHE_CONFIG = {
+    'max_entries': int(os.getenv('CACHE_MAX_ENTRIES', 512)),
+    'ttl_seconds': int(os.getenv('CACHE_TTL_SECONDS', 3600)),
+    'memory_budget_mb': float(os.getenv('CACHE_MEMORY_MB', 256)),
+    'disk_dir': os.getenv('CACHE_DIR') or None,  # Disk tier is off unless a directory is given
+    'disk_budget_mb': float(os.getenv('CACHE_DISK_MB', 1024)),
+    'enabled': os.getenv('CACHE_ENABLED', '1') != '0',
+}
+
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}([T ].*)?$')
+
+# Selection keys holding multi-select filter values: a set, so [B, A] == [A, B]. Any other list keeps its order
+# (a DataTable sort_by, positional callback arguments...).
+SET_INPUTS = {'months', 'Job_Category', 'Company', 'Country', 'Traffic_Source'}
+
+
+# --- 2. INPUT NORMALIZATION ---
+
+def normalize_inputs(value, unordered=False):
+    """
+    Turns callback inputs into a hashable form.
+    - Multi-select filter values (SET_INPUTS keys, sets) are sorted ([B, A] == [A, B]); other lists keep their order.
+    - [] is treated like None.
+    - Date picker strings are cut to the day ('2025-03-01T00:00:00' == '2025-03-01').
+    """
+    if isinstance(value, (list, tuple, set)):
+        items = [normalize_inputs(v) for v in value]
+        if not items:
+            return None
+        return tuple(sorted(items, key=repr)) if unordered or isinstance(value, set) else tuple(items)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), normalize_inputs(v, unordered=k in SET_INPUTS)) for k, v in value.items()))
+    if isinstance(value, str) and _DATE_RE.match(value):
+        return value[:10]
+    return value
+
+
+# --- 3. CACHE ---
+
+class CallbackCache:
+    """
+    Two-tier (memory + optional disk) LRU cache with TTL, size budgets and hit/miss counters.
+    Values are stored pickled, so the byte budget is exact and callers can't mutate cached results.
+    """
+
+    def __init__(self, config=CACHE_CONFIG):
+        self.config = config
+        self._entries = OrderedDict()  # key -> (expires_at, payload)
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'memory_hits': 0, 'disk_hits': 0, 'evictions': 0, 'stores': 0}
+
+    @staticmethod
+    def make_key(page, stage, version, args):
+        raw = repr((page, stage, normalize_inputs(list(args))))
+        return f"{version}-{page}-{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    # --- Dataset Versioning ---
+    def _check_version(self, version):
+        """
+        A new dataset version makes every older entry useless -> drop them all at once.
+        The memory tier is swapped out under the lock; the disk tier's files are deleted after releasing it.
+        """
+        with self._lock:
+            if version == self._version:
+                return
+            self._entries = OrderedDict()
+            self._bytes = 0
+            self._version = version
+        self._purge_disk(keep_prefix=f"{version}-")
+
+    # --- Memory Tier ---
+    def _evict_memory(self):
+        budget = self.config['memory_budget_mb'] * 1024 * 1024
+        while self._entries and (self._bytes > budget or len(self._entries) > self.config['max_entries']):
+            _, (_, payload) = self._entries.popitem(last=False)
+            self._bytes -= len(payload)
+            self.stats['evictions'] += 1
+
+    # --- Disk Tier ---
+    def _disk_path(self, key):
+        return os.path.join(self.config['disk_dir'], f"{key}.pkl")
+
+    def _purge_disk(self, keep_prefix):
+        disk_dir = self.config['disk_dir']
+        if not disk_dir or not os.path.isdir(disk_dir):
+            return
+        for name in os.listdir(disk_dir):
+            if name.endswith('.pkl') and not name.startswith(keep_prefix):
+                try:
+                    os.remove(os.path.join(disk_dir, name))
+                except OSError:
+                    pass
+
+    def _read_disk(self, key):
+        """
+        (payload, time it was written) of a disk entry, or (None, None).
+        """
+        if not self.config['disk_dir']:
+            return None, None
+        path = self._disk_path(key)
+        try:
+            # mtime = when the entry was written (TTL, like the memory tier's absolute expiry), atime = last read (LRU)
+            written = os.path.getmtime(path)
+            if time.time() - written > self.config['ttl_seconds']:
+                os.remove(path)
+                return None, None
+            with open(path, 'rb') as f:
+                payload = f.read()
+            os.utime(path, (time.time(), written))  # Refresh the LRU position only (explicit, even on noatime)
+            return payload, written
+        except OSError:
+            return None, None
+
+    def _write_disk(self, key, payload):
+        disk_dir = self.config['disk_dir']
+        if not disk_dir:
+            return
+        try:
+            os.makedirs(disk_dir, exist_ok=True)
+            tmp_path = f"{self._disk_path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._disk_path(key))
+            self._evict_disk()
+        except OSError as e:
+            print(f"⚠️ Cache disk write failed: {e}")
+
+    def _evict_disk(self):
+        disk_dir = self.config['disk_dir']
+        budget = self.config['disk_budget_mb'] * 1024 * 1024
+        files = []
+        for name in os.listdir(disk_dir):
+            if name.endswith('.pkl'):
+                path = os.path.join(disk_dir, name)
+                try:
+                    stat = os.stat(path)
+                    files.append((stat.st_atime, stat.st_size, path))  # Least recently read first
+                except OSError:
+                    pass
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= budget:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.stats['evictions'] += 1
+            except OSError:
+                pass
+
+    # --- Public API ---
+    def get(self, key, version):
+        """
+        Returns (hit, value).
+        """
+        self._check_version(version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at >= time.time():
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    self.stats['memory_hits'] += 1
+                    return True, pickle.loads(payload)
+                del self._entries[key]
+                self._bytes -= len(payload)
+
+        payload, written = self._read_disk(key)
+        if payload is not None:
+            with self._lock:
+                self.stats['hits'] += 1
+                self.stats['disk_hits'] += 1
+                self._store_memory(key, payload, expires_at=written + self.config['ttl_seconds'])
+            return True, pickle.loads(payload)
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return False, None
+
+    def _store_memory(self, key, payload, expires_at=None):
+        if len(payload) > self.config['memory_budget_mb'] * 1024 * 1024:
+            return  # Too big for RAM -> disk tier only
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+        self._entries[key] = (expires_at or time.time() + self.config['ttl_seconds'], payload)
+        self._bytes += len(payload)
+        self._evict_memory()
+
+    def set(self, key, value, version):
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"⚠️ Cache skipped unpicklable result: {e}")
+            return
+        self._check_version(version)
+        with self._lock:
+            self._store_memory(key, payload)
+            self.stats['stores'] += 1
+        self._write_disk(key, payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        self._purge_disk(keep_prefix="\0")
+
+    def info(self):
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': round(self.stats['hits'] / lookups, 3) if lookups else 0.0,
+                'entries': len(self._entries),
+                'memory_bytes': self._bytes,
+                'version': self._version,
+            }
+
+
+_CACHE = CallbackCache()
+
+
+def get_cache():
+    return _CACHE
+
+
+def cache_stats():
+    return _CACHE.info()
+
+
+# --- 4. DECORATOR ---
+
+def cached_call(page, stage, args, func):
+    """
+    Returns func(*args), served from the cache when the same (page, stage, version, inputs) was seen before.
+    """
+    version = dataset_version()
+    if version is None or not CACHE_CONFIG['enabled']:
+        return func(*args)
+
+    key = _CACHE.make_key(page, stage, version, args)
+    hit, value = _CACHE.get(key, version)
+    note_cache(page, stage, hit)
+    if hit:
+        return value
+
+    def compute():
+        result = func(*args)
+        _CACHE.set(key, result, version)
+        return result
+
+    # Identical misses arriving together share one computation; the others read its result back from the cache
+    # (their own unpickled copy), or share the object when it couldn't be cached
+    leader, value = single_flight(page, key, compute)
+    if not leader:
+        hit, cached = _CACHE.get(key, version)
+        if hit:
+            return cached
+    return value
+
+
+def memoize_callback(page, stage=None):
+    """
+    Memoizes a Dash callback by (page, stage, dataset version, normalized inputs).
+    Place it *under* @app.callback so Dash registers the cached wrapper.
+    """
+
+    def decorator(func):
+        stage_name = stage or func.__name__
+
+        @wraps(func)
+        def wrapper(*args):
+            return cached_call(page, stage_name, args, func)
+
+        return wrapper
+
+    return decorator
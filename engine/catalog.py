@@ -0,0 +1,96 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from dash import Input, Output
+
+from Data.dataset import get_dataset, dataset_version
+
+# --- Dimension Catalog ---
+# Sorted distinct values (+ row counts) of the filter columns and the date range of the dataset,
+# built once per dataset version. Every page's dropdown callback reads its option lists from here
+# instead of scanning the full frame, so opening the app costs one catalog build, not nine. The date range
+# bounds every page's date picker (register_date_bounds).
+
+DATE_COLUMN = 'Created_At'
+
+_CATALOG = {'version': None, 'dimensions': {}, 'options': {}, 'dates': None}
+# Held while building: the pages' dropdown callbacks all fire together when the store is set,
+# the first one builds and the others wait for its result
+_LOCK = threading.RLock()
+
+
+def _current():
+    version = dataset_version()
+    if _CATALOG['version'] != version:
+        _CATALOG.update(version=version, dimensions={}, options={}, dates=None)
+    return _CATALOG
+
+
+def dimension(col):
+    """
+    {'values': sorted distinct values (as str), 'counts': rows per value} of a dataset column,
+    or None if the column is missing.
+    """
+    with _LOCK:
+        catalog = _current()
+        if col not in catalog['dimensions']:
+            df = get_dataset()
+            if df is None or col not in df.columns:
+                return None
+            counts = df[col].dropna().astype(str).value_counts(sort=False)
+            values = counts.index.to_numpy(dtype=str)
+            order = np.argsort(values, kind='stable')
+            catalog['dimensions'][col] = {'values': values[order], 'counts': counts.to_numpy()[order]}
+        return catalog['dimensions'][col]
+
+
+def dimension_options(col):
+    """
+    Dropdown options [{'label', 'value'}] for every value of a column, sorted.
+    """
+    with _LOCK:
+        catalog = _current()
+        if col not in catalog['options']:
+            entry = dimension(col)
+            catalog['options'][col] = [{'label': v, 'value': v} for v in entry['values'].tolist()] if entry else []
+        return catalog['options'][col]
+
+
+def date_range():
+    """
+    (first, last) timestamp of the dataset's date column, or (None, None).
+    """
+    with _LOCK:
+        catalog = _current()
+        if catalog['dates'] is None:
+            df = get_dataset()
+            if df is None or DATE_COLUMN not in df.columns or df.empty:
+                return None, None
+            dates = pd.to_datetime(df[DATE_COLUMN])
+            catalog['dates'] = (dates.min(), dates.max())
+        return catalog['dates']
+
+
+def register_date_bounds(app, picker_id, data_id='global-data-store'):
+    """
+    Limits a dcc.DatePickerRange to the dataset's dates (and opens its calendar on the last month with data).
+    """
+
+    @app.callback(
+        [Output(picker_id, 'min_date_allowed'), Output(picker_id, 'max_date_allowed'),
+         Output(picker_id, 'initial_visible_month')],
+        Input(data_id, 'data')
+    )
+    def update_date_bounds(data):
+        first, last = date_range() if data else (None, None)
+        if first is None or pd.isna(first):
+            return None, None, None
+        return first.strftime('%Y-%m-%d'), last.strftime('%Y-%m-%d'), last.strftime('%Y-%m-%d')
+
+    return update_date_bounds
+
+
+def clear_catalog():
+    with _LOCK:
+        _CATALOG.update(version=None, dimensions={}, options={}, dates=None)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from engine.activity import company_activity, first_active_month, month_labels
+
+# --- Company Cohorts ---
+# A company's cohort is the month of its first posting; its activity is the active-month bitset of the
+# activity index (engine/activity.py). Shifting every bitset right by the company's first month lines the
+# companies up on "months since first posting" (bit k = active k months later). Counting a cohort's
+# companies per bit is then one unpack + reduceat over the companies sorted by cohort - no pivot of the rows.
+
+
+def shift_right(bits, shifts):
+    """
+    Each row of a bitset matrix (companies x 64-bit words) shifted right by its own number of bits.
+    """
+    words = bits.shape[1]
+    quotient, remainder = shifts // 64, (shifts % 64).astype(np.uint64)
+    source = np.arange(words)[None, :] + quotient[:, None]
+
+    def take(cols):
+        inside = cols < words
+        return np.where(inside, np.take_along_axis(bits, np.minimum(cols, words - 1), axis=1), np.uint64(0))
+
+    low = take(source) >> remainder[:, None]
+    # Bits carried down from the next word (a shift by 64 is not defined: no carry when remainder is 0)
+    carry = take(source + 1) << ((np.uint64(64) - remainder) % np.uint64(64))[:, None]
+    return low | np.where(remainder[:, None] > 0, carry, np.uint64(0))
+
+
+def cohort_counts(bits, month_count):
+    """
+    (first month per company, matrix[cohort, months since]) = companies of each cohort active k months
+    after their first posting. Cells past the last month of the data are -1 (not observed yet).
+    """
+    first = first_active_month(bits, month_count)
+    keep = first >= 0
+    bits, first = bits[keep], first[keep]
+
+    aligned = shift_right(bits, first)
+    flags = np.unpackbits(np.ascontiguousarray(aligned.astype('<u8')).view(np.uint8), axis=1, bitorder='little')
+    flags = flags[:, :month_count].astype(np.int32)
+
+    order = np.argsort(first, kind='stable')
+    cohorts, starts = np.unique(first[order], return_index=True)
+    matrix = np.zeros((month_count, month_count), dtype=np.int64)
+    if len(order):
+        matrix[cohorts] = np.add.reduceat(flags[order], starts, axis=0)
+
+    observed = np.arange(month_count)[None, :] < (month_count - np.arange(month_count))[:, None]
+    return first, np.where(observed, matrix, -1)
+
+
+def cohort_matrix(selection):
+    """
+    Cohort triangle of the companies in `selection`: DataFrame with one row per cohort month ('Cohort',
+    'Companies', then the number of them active 0, 1, 2... months after their first posting; NaN = not
+    observed yet), or None without data.
+    """
+    activity = company_activity(selection)
+    if activity is None or not len(activity['companies']):
+        return None
+
+    month_count = activity['month_count']
+    _, matrix = cohort_counts(activity['bits'], month_count)
+    frame = pd.DataFrame(np.where(matrix >= 0, matrix, np.nan), columns=list(range(month_count)))
+    frame.insert(0, 'Companies', matrix[:, 0])
+    frame.insert(0, 'Cohort', month_labels(activity['first_month'], month_count))
+    return frame[frame['Companies'] > 0].reset_index(drop=True)
@@ -0,0 +1,148 @@
+import os
+import tempfile
+from urllib.parse import urlencode
+
+import dash_bootstrap_components as dbc
+from dash import html, Input, Output
+from flask import request, Response
+
+from Data.dataset import get_dataset, dataset_version, arrow_schema, arrow_table
+from engine.api import PARAMS, ApiError, parse_selection
+from engine.selection import select_positions
+
+# --- 1. CONFIGURATION ---
+# "Export" buttons download the rows behind a page view (its filters applied) as CSV or Parquet.
+# Rows are converted and sent chunk by chunk from a generator: an export of a million rows holds one chunk
+# in memory at a time, and other requests get the GIL between chunks.
+EXPORT_CONFIG = {
+    'chunk_rows': int(os.getenv('EXPORT_CHUNK_ROWS', 50000)),  # Rows converted per chunk
+    'prefix': '/export',
+}
+
+FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+_READ_BLOCK = 1 << 20  # Bytes per chunk when streaming a written Parquet file
+
+
+# --- 2. ROW CHUNKS ---
+
+def row_chunks(selection, df=None):
+    """
+    Yields the rows matching `selection` (dataset order, every column) as DataFrames of at most chunk_rows rows.
+    """
+    if df is None:
+        df = get_dataset()  # One snapshot for the whole export, even if the dataset is swapped meanwhile
+    positions = select_positions(selection)
+    total = len(df) if positions is None else len(positions)
+    size = max(EXPORT_CONFIG['chunk_rows'], 1)
+
+    if total == 0:
+        yield df.iloc[:0]
+        return
+    for start in range(0, total, size):
+        stop = min(start + size, total)
+        yield df.iloc[start:stop] if positions is None else df.iloc[positions[start:stop]]
+
+
+def csv_chunks(selection):
+    for i, chunk in enumerate(row_chunks(selection)):
+        yield chunk.to_csv(index=False, header=(i == 0))
+
+
+def parquet_chunks(selection):
+    """
+    Writes the row chunks as row groups of a temporary Parquet file (its footer is only known at the end),
+    then streams the file and deletes it.
+    """
+    import pyarrow.parquet as pq
+
+    handle, path = tempfile.mkstemp(suffix='.parquet', prefix='export-')
+    os.close(handle)
+    try:
+        # One schema for every row group, from the dtypes of the whole table (not from the first chunk's values)
+        df = get_dataset()
+        schema = arrow_schema(df)
+        writer = pq.ParquetWriter(path, schema)
+        try:
+            for chunk in row_chunks(selection, df):
+                writer.write_table(arrow_table(chunk, schema))
+        finally:
+            writer.close()
+
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(_READ_BLOCK)
+                if not block:
+                    break
+                yield block
+    finally:
+        os.unlink(path)
+
+
+# --- 3. ROUTE ---
+
+def selection_query(selection):
+    """
+    Query string of a selection, in the parameters of the export / JSON API routes.
+    """
+    items = []
+    for param, (_, key, many) in PARAMS.items():
+        value = selection.get(key)
+        if value:
+            items.extend((param, v) for v in (value if many else [value]))
+    return urlencode(items)
+
+
+def register_export(server):
+    """
+    GET /export/<page>.csv|.parquet?<filters> (same filter parameters as the JSON API, see engine/api.py).
+    """
+
+    @server.route(f"{EXPORT_CONFIG['prefix']}/<page>.<any(csv, parquet):fmt>", methods=['GET'])
+    def export_rows(page, fmt):
+        if dataset_version() is None:
+            return Response("No dataset loaded", status=503, mimetype='text/plain')
+        try:
+            selection = parse_selection(page, request.args)
+        except KeyError:
+            return Response(f"Unknown page {page}", status=404, mimetype='text/plain')
+        except ApiError as e:
+            return Response(str(e), status=e.status, mimetype='text/plain')
+
+        chunks = csv_chunks(selection) if fmt == 'csv' else parquet_chunks(selection)
+        filename = f"{page}_{selection['version']}.{fmt}"
+        return Response(chunks, mimetype=FORMATS[fmt],
+                        headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+
+# --- 4. PAGE BUTTONS ---
+
+def export_buttons(prefix):
+    """
+    CSV / Parquet download buttons for a page header; their links follow the page's selection.
+    """
+    button = {'size': 'sm', 'color': 'secondary', 'outline': True, 'external_link': True}
+    return html.Div([
+        dbc.Button([html.I(className="fas fa-file-csv me-2"), "CSV"], id=f"{prefix}-export-csv",
+                   className="me-2", **button),
+        dbc.Button([html.I(className="fas fa-file-export me-2"), "Parquet"], id=f"{prefix}-export-parquet",
+                   **button),
+    ], className="d-flex justify-content-end")
+
+
+def register_export_links(app, prefix, selection_id, page):
+    @app.callback(
+        [Output(f"{prefix}-export-csv", 'href'), Output(f"{prefix}-export-parquet", 'href')],
+        Input(selection_id, 'data')
+    )
+    def update_export_links(selection):
+        if not selection:
+            return None, None
+        query = selection_query(selection)
+        base = f"{EXPORT_CONFIG['prefix']}/{page}"
+        return [f"{base}.{fmt}" + (f"?{query}" if query else "") for fmt in FORMATS]
+
+    return update_export_links
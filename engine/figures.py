@@ -0,0 +1,171 @@
+import os
+import base64
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from dash import Patch
+
+# --- 1. CONFIGURATION ---
+FIGURE_CONFIG = {
+    # Time series longer than this are downsampled (LTTB) - roughly the pixel width of a full-width graph
+    'max_points': int(os.getenv('FIGURE_MAX_POINTS', 1000)),
+    # Send numeric arrays as base64 typed arrays ({'dtype', 'bdata'}) instead of JSON number lists
+    'typed_arrays': os.getenv('FIGURE_TYPED_ARRAYS', '1') != '0',
+}
+
+_INT_CODES = ['u1', 'i1', 'u2', 'i2', 'u4', 'i4']
+
+# --- 2. PARTIAL FIGURE UPDATES ---
+# A graph gets its layout, template and trace styling ONCE, as a "skeleton" figure in the page layout.
+# Callbacks then answer with a Patch that only carries the data arrays (and the title for the empty state),
+# so the template / styling is not re-sent and the browser does not rebuild the whole figure.
+
+NO_DATA_TITLE = "No Data"
+
+
+def figure_skeleton(traces, title=None, **layout):
+    """
+    Static figure for dcc.Graph(figure=...): styled traces without data + final layout.
+    """
+    fig = go.Figure(data=traces)
+    fig.update_layout(template="plotly_white", title_text=title, **layout)
+    return fig
+
+
+def patch_traces(arrays, title=None):
+    """
+    Patch that replaces the data arrays of existing traces.
+    arrays: one dict per trace, e.g. [{'x': dates, 'y': counts}]
+    """
+    patch = Patch()
+    for i, values in enumerate(arrays):
+        for key, value in values.items():
+            patch['data'][i][key] = value
+    patch['layout']['title']['text'] = title
+    return patch
+
+
+def patch_data(traces, title=None):
+    """
+    Patch that replaces the whole trace list (for charts whose number of traces depends on the data).
+    """
+    patch = Patch()
+    patch['data'] = [trace.to_plotly_json() if hasattr(trace, 'to_plotly_json') else trace for trace in traces]
+    patch['layout']['title']['text'] = title
+    return patch
+
+
+def patch_empty(trace_count, keys=('x', 'y'), title=NO_DATA_TITLE):
+    """
+    Clears `keys` on the first `trace_count` traces and shows the "No Data" title.
+    """
+    return patch_traces([{key: [] for key in keys}] * trace_count, title=title)
+
+
+# --- 3. COMPACT ARRAYS ---
+
+def typed_array(values):
+    """
+    Encodes a numeric array in plotly.js' typed-array form, using the smallest dtype that holds it exactly
+    (e.g. counts stored as float64 go out as u2). Falls back to a plain list when disabled or non-numeric.
+    """
+    arr = np.asarray(values)
+    if not FIGURE_CONFIG['typed_arrays'] or arr.size == 0 or arr.dtype.kind not in 'biuf':
+        return arr.tolist()
+
+    code = 'f8'
+    if arr.dtype.kind != 'f' or (np.isfinite(arr).all() and (arr % 1 == 0).all()):
+        lo, hi = arr.min(), arr.max()
+        for candidate in _INT_CODES:
+            info = np.iinfo(candidate)
+            if info.min <= lo and hi <= info.max:
+                code = candidate
+                break
+
+    data = np.ascontiguousarray(arr, dtype=np.dtype(code).newbyteorder('<'))
+    return {'dtype': code, 'bdata': base64.b64encode(data.tobytes()).decode('ascii')}
+
+
+def epoch_ms(dates):
+    """
+    Dates / timestamps -> float milliseconds since epoch (what a plotly 'date' axis reads from numbers).
+    """
+    return pd.to_datetime(pd.Series(dates)).to_numpy(dtype='datetime64[ms]').astype(np.int64).astype(np.float64)
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: positions of `threshold` points that keep the visual shape of (x, y).
+    First and last points are always kept.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # threshold - 2 buckets between the fixed first and last point
+    every = (n - 2) / (threshold - 2)
+    bounds = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        next_hi = bounds[i + 2] if i + 2 < len(bounds) else n
+        cx, cy = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+
+        # Triangle area (x2) between the last kept point, each candidate and the next bucket's average
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        indices[i + 1] = a
+
+    return indices
+
+
+# --- 4. TIME SERIES BUILDER ---
+
+def time_series_skeleton(x_name, y_name, line_color, fill_color=None, line_width=2, **layout):
+    """
+    Static area chart (spline + markers, filled to zero) on a date axis, built with graph objects.
+    Data arrives later through time_series_patch().
+    """
+    trace = go.Scatter(
+        x=[], y=[],
+        mode='lines+markers',
+        fill='tozeroy',
+        line=dict(color=line_color, shape='spline', width=line_width),
+        fillcolor=fill_color,
+        xhoverformat='%Y-%m-%d',
+        hovertemplate=f"{x_name}=%{{x}}<br>{y_name}=%{{y}}<extra></extra>"
+    )
+    layout['xaxis'] = dict(layout.get('xaxis', {}), type='date')
+    layout['xaxis'].setdefault('title', x_name)
+    layout['yaxis'] = dict(layout.get('yaxis', {}))
+    layout['yaxis'].setdefault('title', y_name)
+    return figure_skeleton([trace], **layout)
+
+
+def time_series_arrays(dates, values, max_points=None):
+    """
+    {'x', 'y'} for one time series: epoch-ms x, LTTB-downsampled above max_points, typed-array encoded.
+    """
+    x = epoch_ms(dates)
+    y = np.asarray(values, dtype=np.float64)
+
+    keep = lttb_indices(x, y, max_points or FIGURE_CONFIG['max_points'])
+    if len(keep) < len(x):
+        x, y = x[keep], y[keep]
+
+    return {'x': typed_array(x), 'y': typed_array(y)}
+
+
+def time_series_patch(dates, values, title=None, max_points=None):
+    """
+    Patch for a time_series_skeleton() graph.
+    """
+    return patch_traces([time_series_arrays(dates, values, max_points)], title=title)
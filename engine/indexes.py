@@ -0,0 +1,126 @@
+import threading
+
+import numpy as np
+
+from Data.dataset import get_dataset, dataset_version
+from engine.selection import select_positions, sorted_positions
+
+# --- Sorted Permutation Indexes ---
+# For a column, the permutation that sorts the WHOLE dataset (stable, NaN last) is built once per dataset
+# version. A sorted view of any selection is that permutation with the non-matching rows skipped, and a
+# top-N only walks the permutation until N matching rows were seen - no per-request sort of the filtered rows.
+
+_INDEXES = {'version': None, 'orders': {}}
+_LOCK = threading.Lock()
+
+# First walk step of a top-N, in rows (doubles until enough matches were found)
+_WALK_STEP = 1024
+
+
+def sort_permutation(col, ascending=False):
+    """
+    Dataset row positions sorted by `col`, or None when the column does not exist.
+    """
+    version = dataset_version()
+    with _LOCK:
+        if _INDEXES['version'] != version:
+            _INDEXES['version'] = version
+            _INDEXES['orders'] = {}
+        perm = _INDEXES['orders'].get((col, ascending))
+    if perm is not None:
+        return perm
+
+    df = get_dataset()
+    if df is None or col not in df.columns:
+        return None
+
+    positions = np.arange(len(df), dtype=np.int32 if len(df) < 2 ** 31 else np.int64)
+    perm = sorted_positions(df, positions, col, ascending)
+    with _LOCK:
+        if _INDEXES['version'] == version:
+            _INDEXES['orders'][(col, ascending)] = perm
+    return perm
+
+
+def _membership(positions, size):
+    mask = np.zeros(size, dtype=bool)
+    mask[positions] = True
+    return mask
+
+
+def _walk(perm, mask, limit):
+    """
+    First `limit` entries of perm whose rows are set in mask, reading perm in growing blocks.
+    """
+    found, count, start = [], 0, 0
+    step = max(limit * 4, _WALK_STEP)
+    while count < limit and start < len(perm):
+        block = perm[start:start + step]
+        hits = block[mask[block]]
+        found.append(hits)
+        count += len(hits)
+        start += step
+        step *= 2
+    return np.concatenate(found)[:limit] if found else perm[:0]
+
+
+def ordered_positions(selection, col, ascending=False, limit=None, mask=None):
+    """
+    Positions of the rows matching `selection` (and the optional extra boolean row mask), sorted by `col`.
+    With `limit`, only the first `limit` of them (top-N).
+    """
+    perm = sort_permutation(col, ascending)
+    if perm is None:
+        return None
+
+    positions = select_positions(selection)
+    if positions is not None:
+        member = _membership(positions, len(perm))
+        mask = member if mask is None else mask & member
+
+    if mask is None:
+        return perm if limit is None else perm[:limit]
+    if limit is None:
+        return perm[mask[perm]]
+    return _walk(perm, mask, limit)
+
+
+def nlargest(selection, col, n=3, label_col=None):
+    """
+    Row-level df.nlargest(n, col) for a selection, as [(label, value), ...] (label = row position if no label_col).
+    """
+    df = get_dataset()
+    top = ordered_positions(selection, col, ascending=False, limit=n)
+    if df is None or top is None:
+        return []
+    rows = df.iloc[top]
+    labels = rows[label_col].tolist() if label_col else top.tolist()
+    return list(zip(labels, rows[col].tolist()))
+
+
+def clear_indexes():
+    with _LOCK:
+        _INDEXES['version'] = None
+        _INDEXES['orders'] = {}
+
+
+class IndexedRows:
+    """
+    Detail-table source over the matching rows of the active dataset (see engine/tables.py).
+    Orders come from the permutation indexes, so the first pages of any sort are a short walk.
+    """
+
+    def __init__(self, selection, sort_col, ascending=False):
+        self.selection = selection
+        self.sort = (sort_col, ascending)
+        self.frame = get_dataset()
+
+    def count(self):
+        if self.frame is None:
+            return 0
+        positions = select_positions(self.selection)
+        return len(self.frame) if positions is None else len(positions)
+
+    def order(self, sort_col=None, ascending=None, mask=None, limit=None):
+        col, asc = (sort_col, ascending) if sort_col else self.sort
+        return ordered_positions(self.selection, col, asc, limit=limit, mask=mask)
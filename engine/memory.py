@@ -0,0 +1,168 @@
+import os
+import math
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+from Data.dataset import get_dataset, dataset_version
+from engine.metrics import METRICS_CONFIG, observe, inc, note_memory, note_approximate
+from engine.selection import select_positions
+
+# --- 1. CONFIGURATION ---
+# Accounting: with MEMORY_TRACKING=1 every stage computation records its peak Python allocation (tracemalloc,
+# numpy / pandas buffers included) in the stage_peak_memory_bytes histograms on /metrics. Tracing allocations
+# slows them down, and the peak is process-wide: concurrent requests add to each other's numbers.
+# Budget: with MEMORY_BUDGET_MB > 0 a stage whose estimated working memory (matching rows x bytes per row x
+# copy factor) is over the budget runs on an evenly spaced sample of its rows instead of all of them. Counts and
+# sums it declares (@stage(..., scale=...)) are multiplied back, so the answer is approximate, not missing. Only
+# additive totals scale: averages are recomputed from the scaled totals (derive=...), and distinct counts or
+# bucket distributions (estimates=...) keep their sample value and are flagged in the X-Approximate header.
+MEMORY_CONFIG = {
+    'tracking': os.getenv('MEMORY_TRACKING', '0') == '1',
+    'budget_mb': float(os.getenv('MEMORY_BUDGET_MB', 0)),  # Per request; 0 = no budget
+    'copy_factor': float(os.getenv('MEMORY_COPY_FACTOR', 2)),  # Filtered copy + group-by intermediates
+    'memory_buckets': [2 ** 20, 4 * 2 ** 20, 16 * 2 ** 20, 64 * 2 ** 20, 256 * 2 ** 20, 2 ** 30, 4 * 2 ** 30],
+}
+
+_ROW_BYTES = {'version': None, 'bytes': None}
+_LOCK = threading.Lock()
+_FRAMES = threading.local()  # Open measurements of this thread (nested stages)
+
+
+# --- 2. ACCOUNTING ---
+
+def start_tracking():
+    if MEMORY_CONFIG['tracking'] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+@contextmanager
+def measure(page, name):
+    """
+    Peak allocation of the block above its starting point -> stage_peak_memory_bytes{page, stage}.
+    """
+    if not MEMORY_CONFIG['tracking'] or not tracemalloc.is_tracing():
+        yield
+        return
+
+    frames = getattr(_FRAMES, 'stack', None)
+    if frames is None:
+        frames = _FRAMES.stack = []
+    current, peak = tracemalloc.get_traced_memory()
+    for outer in frames:  # The peak is about to be reset: enclosing stages keep what they saw so far
+        outer['peak'] = max(outer['peak'], peak)
+    tracemalloc.reset_peak()
+    frame = {'start': current, 'peak': current}
+    frames.append(frame)
+    try:
+        yield
+    finally:
+        frame['peak'] = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+        frames.pop()
+        for outer in frames:
+            outer['peak'] = max(outer['peak'], frame['peak'])
+        used = frame['peak'] - frame['start']
+        if METRICS_CONFIG['enabled']:
+            observe('stage_peak_memory_bytes', {'page': page, 'stage': name}, used, MEMORY_CONFIG['memory_buckets'])
+        note_memory(used)
+
+
+def measured(page, name, func):
+    @wraps(func)
+    def wrapper(*args):
+        with measure(page, name):
+            return func(*args)
+
+    return wrapper
+
+
+# --- 3. BUDGET ---
+
+def row_bytes():
+    """
+    Average in-memory bytes of one dataset row (text included), estimated once per dataset version.
+    """
+    version = dataset_version()
+    with _LOCK:
+        if _ROW_BYTES['version'] == version:
+            return _ROW_BYTES['bytes']
+    df = get_dataset()
+    if df is None or df.empty:
+        return 0
+    sample = df.iloc[np.linspace(0, len(df) - 1, min(len(df), 10000)).astype(np.int64)]
+    value = sample.memory_usage(index=False, deep=True).sum() / len(sample)
+    with _LOCK:
+        _ROW_BYTES.update(version=version, bytes=value)
+    return value
+
+
+def sample_step(selection):
+    """
+    1 when the selection's rows fit the budget, else k: the stage should read every k-th matching row.
+    """
+    budget = MEMORY_CONFIG['budget_mb'] * 2 ** 20
+    if budget <= 0 or not selection or selection.get('sample'):
+        return 1
+
+    df = get_dataset()
+    positions = select_positions(selection)
+    rows = len(df) if positions is None else len(positions)
+    estimate = rows * row_bytes() * MEMORY_CONFIG['copy_factor']
+    return max(1, math.ceil(estimate / budget))
+
+
+def _scaled(value, factor):
+    if isinstance(value, (bool, np.bool_)) or value is None:
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(round(value * factor))
+    if isinstance(value, (float, np.floating)):
+        return value * factor
+    if isinstance(value, tuple) and len(value) == 2:  # (label, count) pairs of the KPI cards
+        return value[0], _scaled(value[1], factor)
+    if isinstance(value, list):
+        return [_scaled(v, factor) for v in value]
+    if isinstance(value, pd.Series):
+        if pd.api.types.is_numeric_dtype(value) and not pd.api.types.is_bool_dtype(value):
+            scaled = value * factor
+            return scaled.round().astype(value.dtype) if pd.api.types.is_integer_dtype(value) else scaled
+        return value
+    return value
+
+
+def scale_result(value, factor, scale):
+    """
+    Multiplies the row-count-like parts of a stage result computed on 1 / factor of the rows.
+    scale: True (every number of a Series / DataFrame / dict) or the dict keys / DataFrame columns to scale.
+    """
+    if not scale or factor == 1 or value is None:
+        return value
+    if isinstance(value, pd.DataFrame):
+        value = value.copy()
+        for col in (value.columns if scale is True else [c for c in scale if c in value.columns]):
+            value[col] = _scaled(value[col], factor)
+        return value
+    if isinstance(value, dict):
+        return {k: _scaled(v, factor) if scale is True or k in scale else v for k, v in value.items()}
+    return _scaled(value, factor)
+
+
+def per_group(total, groups):
+    """
+    Average per group from a (scaled) total - how a sampled stage rebuilds its means (see derive=...).
+    """
+    return round(total / groups, 1) if groups else 0
+
+
+def approximate(page, name, step, estimates=None):
+    """
+    Records that a stage answered from 1 / step of its rows (metrics + the X-Approximate response header).
+    estimates: the parts of its result left as sample estimates (True = all of it).
+    """
+    if METRICS_CONFIG['enabled']:
+        inc('stage_approximate_total', {'page': page, 'stage': name})
+    note_approximate(f"{page}/{name}", step, estimates)
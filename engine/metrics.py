@@ -0,0 +1,258 @@
+import os
+import time
+import bisect
+import threading
+
+from flask import request, Response
+
+from engine.tracing import start_trace, finish_trace, server_timing
+
+# --- 1. CONFIGURATION ---
+# Every Dash callback request is measured (wall time, request / response bytes, rows left after filtering,
+# stage cache hits / misses) and exposed as Prometheus text on /metrics, with latency histograms per page.
+# Numbers are per server process: under gunicorn each worker answers for itself.
+METRICS_CONFIG = {
+    'enabled': os.getenv('METRICS_ENABLED', '1') != '0',
+    'route': os.getenv('METRICS_ROUTE', '/metrics'),
+    'latency_buckets': [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30],
+    'rows_buckets': [0, 100, 1000, 10000, 100000, 1000000, 10000000],
+}
+
+CALLBACK_ROUTE = '_dash-update-component'
+
+_HELP = {
+    'dash_callback_duration_seconds': ('histogram', "Wall time of Dash callback requests"),
+    'dash_callback_rows': ('histogram', "Dataset rows left after the callback's filters"),
+    'dash_span_duration_seconds': ('histogram', "Time per traced span of a callback (filter, stage.*, render...)"),
+    'dash_callback_calls_total': ('counter', "Dash callback requests"),
+    'dash_callback_seconds_total': ('counter', "Wall time spent in Dash callback requests"),
+    'dash_callback_request_bytes_total': ('counter', "Request payload bytes of Dash callbacks"),
+    'dash_callback_response_bytes_total': ('counter', "Response payload bytes of Dash callbacks"),
+    'dash_callback_cache_lookups_total': ('counter', "Cache lookups made while answering a callback"),
+    'dash_callback_peak_memory_bytes': ('histogram', "Largest stage peak allocation of a callback (MEMORY_TRACKING)"),
+    'stage_peak_memory_bytes': ('histogram', "Peak allocation per stage computation (MEMORY_TRACKING)"),
+    'stage_approximate_total': ('counter', "Stage computations answered from a sample (over MEMORY_BUDGET_MB)"),
+    'stage_cache_lookups_total': ('counter', "Cache lookups per compute stage (any caller)"),
+    'cache_entries': ('gauge', "Entries in the memory cache tier"),
+    'cache_memory_bytes': ('gauge', "Bytes held by the memory cache tier"),
+    'admission_running': ('gauge', "Stage computations running per page"),
+    'admission_waiting': ('gauge', "Stage computations waiting for a slot per page"),
+    'admission_rejected_total': ('counter', "Stage computations rejected as busy per page (queue full or timeout)"),
+}
+
+_COUNTERS = {}  # (name, labels) -> value
+_HISTOGRAMS = {}  # (name, labels) -> {'buckets': [...], 'counts': [...], 'sum', 'count'}
+_OWNERS = {}  # callback output key -> (page, callback name)
+_LOCK = threading.Lock()
+_CURRENT = threading.local()  # Measurements of the callback request handled by this thread
+
+
+# --- 2. RECORDING ---
+
+def inc(name, labels, amount=1):
+    key = (name, tuple(sorted(labels.items())))
+    with _LOCK:
+        _COUNTERS[key] = _COUNTERS.get(key, 0) + amount
+
+
+def observe(name, labels, value, buckets):
+    key = (name, tuple(sorted(labels.items())))
+    with _LOCK:
+        hist = _HISTOGRAMS.get(key)
+        if hist is None:
+            hist = _HISTOGRAMS[key] = {'buckets': buckets, 'counts': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0}
+        hist['counts'][bisect.bisect_left(hist['buckets'], value)] += 1
+        hist['sum'] += value
+        hist['count'] += 1
+
+
+def note_rows(count):
+    """
+    Rows matching the selection being filtered (called by engine/selection.py).
+    """
+    record = getattr(_CURRENT, 'record', None)
+    if record is not None:
+        record['rows'] = count
+
+
+def note_memory(used):
+    """
+    Peak allocation of one stage computation (called by engine/memory.py).
+    """
+    record = getattr(_CURRENT, 'record', None)
+    if record is not None:
+        record['memory'] = max(record['memory'] or 0, used)
+
+
+def note_approximate(stage, step, estimates=None):
+    """
+    A stage answered from every `step`-th row only (called by engine/memory.py).
+    estimates: the parts of its result that stay sample estimates (not scaled back), True = all of them.
+    """
+    record = getattr(_CURRENT, 'record', None)
+    if record is not None:
+        record['approximate'][stage] = (step, estimates)
+
+
+def note_cache(page, stage, hit):
+    """
+    One cache lookup (called by engine/cache.py).
+    """
+    if not METRICS_CONFIG['enabled']:
+        return
+    result = 'hit' if hit else 'miss'
+    inc('stage_cache_lookups_total', {'page': page, 'stage': stage, 'result': result})
+    record = getattr(_CURRENT, 'record', None)
+    if record is not None:
+        record[result] += 1
+
+
+# --- 3. CALLBACK INSTRUMENTATION ---
+
+def register_callback_owner(app, known_outputs, page):
+    """
+    Attributes every callback registered since `known_outputs` (a set of app.callback_map keys) to `page`.
+    """
+    for output, spec in app.callback_map.items():
+        if output not in known_outputs:
+            _OWNERS[output] = (page, getattr(spec.get('callback'), '__name__', output))
+
+
+def _approximate_entry(stage, step, estimates):
+    """
+    One X-Approximate entry: "page/stage;sample=1/k", plus ";estimates=a+b" (or "all") for the parts of the
+    result that are sample estimates rather than totals scaled back (distinct counts, distributions).
+    """
+    entry = f"{stage};sample=1/{step}"
+    if estimates:
+        entry += ";estimates=" + ("all" if estimates is True else "+".join(estimates))
+    return entry
+
+
+def instrument_callbacks(server):
+    """
+    Times every /_dash-update-component request on the Flask server and files it under its page + callback.
+    """
+    if not METRICS_CONFIG['enabled']:
+        return
+
+    @server.before_request
+    def _callback_started():
+        if request.method != 'POST' or not request.path.endswith(CALLBACK_ROUTE):
+            return
+        body = request.get_json(silent=True) or {}
+        _CURRENT.record = {'start': time.perf_counter(), 'output': body.get('output', ''), 'rows': None,
+                           'hit': 0, 'miss': 0, 'memory': None, 'approximate': {}}
+        start_trace()
+
+    @server.after_request
+    def _callback_finished(response):
+        record = getattr(_CURRENT, 'record', None)
+        if record is None:
+            return response
+        _CURRENT.record = None
+
+        seconds = time.perf_counter() - record['start']
+        page, callback = _OWNERS.get(record['output'], ('app', record['output'][:80]))
+        labels = {'page': page, 'callback': callback}
+        response_bytes = response.calculate_content_length() or 0
+
+        inc('dash_callback_calls_total', {**labels, 'status': str(response.status_code)})
+        inc('dash_callback_seconds_total', labels, seconds)
+        inc('dash_callback_request_bytes_total', labels, request.content_length or 0)
+        inc('dash_callback_response_bytes_total', labels, response_bytes)
+        for result in ('hit', 'miss'):
+            if record[result]:
+                inc('dash_callback_cache_lookups_total', {**labels, 'result': result}, record[result])
+        observe('dash_callback_duration_seconds', {'page': page}, seconds, METRICS_CONFIG['latency_buckets'])
+        if record['rows'] is not None:
+            observe('dash_callback_rows', {'page': page}, record['rows'], METRICS_CONFIG['rows_buckets'])
+        if record['memory'] is not None:
+            from engine.memory import MEMORY_CONFIG
+            observe('dash_callback_peak_memory_bytes', {'page': page}, record['memory'],
+                    MEMORY_CONFIG['memory_buckets'])
+        if record['approximate']:
+            # Over the memory budget: these stages answered from a sample (see engine/memory.py)
+            response.headers['X-Approximate'] = ", ".join(_approximate_entry(stage, step, estimates)
+                                                          for stage, (step, estimates) in record['approximate'].items())
+
+        # Spans (engine/tracing.py): 'render' is the callback's own time - building figures, formatting KPIs
+        spans = finish_trace()
+        if 'callback' in spans:
+            spans['render'] = (spans['callback'][1], spans['callback'][1])
+        for name, (total, _) in spans.items():
+            observe('dash_span_duration_seconds', {'page': page, 'span': name}, total,
+                    METRICS_CONFIG['latency_buckets'])
+        if spans:
+            response.headers['Server-Timing'] = server_timing({**spans, 'total': (seconds, seconds)})
+        return response
+
+    @server.teardown_request
+    def _callback_aborted(exc=None):
+        _CURRENT.record = None
+        finish_trace()
+
+
+# --- 4. EXPOSITION ---
+
+def _labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+def _number(value):
+    return "+Inf" if value == float('inf') else f"{value:.12g}" if isinstance(value, float) else str(value)
+
+
+def _gauges():
+    """
+    Point-in-time values read from the cache and the admission gates at scrape time.
+    """
+    from engine.admission import admission_stats
+    from engine.cache import cache_stats
+
+    cache = cache_stats()
+    values = [('cache_entries', (), cache['entries']), ('cache_memory_bytes', (), cache['memory_bytes'])]
+    for page, stats in admission_stats().items():
+        labels = (('page', page),)
+        values += [('admission_running', labels, stats['running']), ('admission_waiting', labels, stats['waiting']),
+                   ('admission_rejected_total', labels, stats['rejected'] + stats['timeouts'])]
+    return values
+
+
+def render_metrics():
+    """
+    All metrics in the Prometheus text exposition format (0.0.4).
+    """
+    with _LOCK:
+        samples = {}
+        for (name, labels), value in sorted(_COUNTERS.items()):
+            samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), hist in sorted(_HISTOGRAMS.items(), key=lambda item: item[0]):
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(hist['buckets'] + [float('inf')], hist['counts']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, [('le', _number(float(bound)))])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(float(hist['sum']))}")
+            lines.append(f"{name}_count{_labels(labels)} {hist['count']}")
+    for name, labels, value in _gauges():
+        samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+
+    out = []
+    for name in sorted(samples):
+        kind, text = _HELP.get(name, ('untyped', name))
+        out += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"] + samples[name]
+    return "\n".join(out) + "\n"
+
+
+def register_metrics(server):
+    if not METRICS_CONFIG['enabled']:
+        return
+
+    @server.route(METRICS_CONFIG['route'], methods=['GET'])
+    def metrics():
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
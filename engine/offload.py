@@ -0,0 +1,107 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from Data.dataset import DATASET_CONFIG, dataset_version, attach_shared
+from engine.admission import ServerBusy
+
+# --- 1. CONFIGURATION ---
+# Heavy compute stages (big groupbys) can run in a pool of worker processes instead of the request thread,
+# so they don't hold this process' GIL while other requests wait. Opt-in: OFFLOAD_WORKERS > 0.
+# The timeout is soft: the request gives up (503 busy, like a full admission queue) but a running task can't be
+# stopped - it finishes in its worker, which stays busy meanwhile. Forking a new pool from a serving process
+# (threads running) isn't safe, so a stuck worker is not replaced; OFFLOAD_TIMEOUT bounds the wait only.
+OFFLOAD_CONFIG = {
+    'workers': int(os.getenv('OFFLOAD_WORKERS', 0)),  # 0 = run every stage in the request thread
+    'timeout': float(os.getenv('OFFLOAD_TIMEOUT', 30)),  # Seconds a request waits for an offloaded stage (soft)
+}
+
+_POOL = {'executor': None, 'pid': None}
+_LOCK = threading.Lock()
+
+
+class OffloadTimeout(ServerBusy):
+    # The pool did not answer in time: served as busy (503 + Retry-After, engine/admission.py), not as an error
+    pass
+
+
+# --- 2. POOL ---
+
+def _init_worker():
+    # Stages that call other stages run them inline inside the worker
+    OFFLOAD_CONFIG['workers'] = 0
+    _POOL['executor'] = None
+
+
+def _ping():
+    return os.getpid()
+
+
+def start_pool():
+    """
+    Starts the process pool (call at startup, before the server starts its threads).
+    Workers are forked, so they inherit the loaded (or memory-mapped) dataset and every imported module.
+    """
+    if OFFLOAD_CONFIG['workers'] <= 0 or _POOL['executor'] is not None:
+        return _POOL['executor']
+
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        print("⚠️ OFFLOAD_WORKERS needs the 'fork' start method (Linux / macOS). Running stages inline.")
+        return None
+
+    executor = ProcessPoolExecutor(OFFLOAD_CONFIG['workers'], mp_context=multiprocessing.get_context('fork'),
+                                   initializer=_init_worker)
+    executor.submit(_ping).result()  # A fork-context pool starts all its workers on the first task
+    _POOL['executor'] = executor
+    _POOL['pid'] = os.getpid()
+    print(f"🧮 Offload pool started: {OFFLOAD_CONFIG['workers']} processes (timeout {OFFLOAD_CONFIG['timeout']:g}s)")
+    return executor
+
+
+def offload_enabled():
+    # Forked children (background jobs...) inherit the executor object but can't use it
+    return _POOL['executor'] is not None and _POOL['pid'] == os.getpid()
+
+
+def shutdown_pool():
+    with _LOCK:
+        executor, _POOL['executor'] = _POOL['executor'], None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# --- 3. STAGE TASKS ---
+
+def _stage_task(page, name, selection, version, shared_path):
+    """
+    Runs in a pool worker. Re-attaches the shared dataset first if the parent published a new version.
+    """
+    if dataset_version() != version and (not shared_path or attach_shared(shared_path) != version):
+        raise RuntimeError(f"Offload worker has no dataset version {version}")
+
+    from engine.stages import STAGES
+    return STAGES[(page, name)](selection)
+
+
+def run_offloaded(page, name, selection):
+    """
+    Runs stage `name` of `page` in the pool and returns its (small, aggregated) result.
+    Raises OffloadTimeout (a ServerBusy) after OFFLOAD_TIMEOUT seconds - the task itself runs on in its worker;
+    falls back to inline if the pool broke.
+    """
+    from engine.stages import STAGES
+
+    executor = _POOL['executor']
+    future = executor.submit(_stage_task, page, name, selection, dataset_version(), DATASET_CONFIG['shared_path'])
+    try:
+        return future.result(timeout=OFFLOAD_CONFIG['timeout'])
+    except FutureTimeout:
+        future.cancel()
+        print(f"⚠️ Offloaded stage {page}/{name} timed out after {OFFLOAD_CONFIG['timeout']:g}s")
+        raise OffloadTimeout(page, f"stage {name} did not finish within {OFFLOAD_CONFIG['timeout']:g}s")
+    except BrokenProcessPool:
+        print("⚠️ Offload pool broke (worker killed?). Running stages inline from now on.")
+        shutdown_pool()
+        return STAGES[(page, name)](selection)
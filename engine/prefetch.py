@@ -0,0 +1,148 @@
+import os
+import time
+import threading
+import importlib
+from collections import OrderedDict
+from functools import wraps
+
+from engine.selection import make_selection
+from engine.stages import STAGES, COMPUTE_MODULES, run_stage
+
+# --- 1. CONFIGURATION ---
+# Users mostly walk the sidebar in order. After a page renders, the stages of the next pages are computed
+# for the same filters in a background thread, so their results are already cached when the user gets there.
+# Opt-in (PREFETCH_PAGES > 0). The thread only works while no request is in flight.
+PREFETCH_CONFIG = {
+    'pages': int(os.getenv('PREFETCH_PAGES', 0)),  # Next pages warmed after a page renders; 0 = off
+    'idle_ms': int(os.getenv('PREFETCH_IDLE_MS', 50)),  # Quiet time (no request in flight) before each stage
+    'max_jobs': 16,  # Pending (page, selection) jobs; the oldest are dropped first
+}
+
+_JOBS = OrderedDict()  # (page, selection key) -> (page, selection)
+_STATE = {'thread': None, 'active_requests': 0, 'runs': 0, 'errors': 0}
+_LOCK = threading.Lock()
+_WAKE = threading.Event()
+
+
+# --- 2. PAGE ORDER ---
+
+def _pages():
+    """
+    [(page, filter keys)] in sidebar order (= COMPUTE_MODULES order).
+    """
+    modules = [importlib.import_module(name) for name in COMPUTE_MODULES]
+    return [(module.PAGE, getattr(module, 'FILTERS', None)) for module in modules]
+
+
+def next_pages(page, count):
+    pages = _pages()
+    names = [name for name, _ in pages]
+    if page not in names:
+        return []
+    start = names.index(page) + 1
+    return pages[start:start + count]
+
+
+def project_selection(selection, filters):
+    """
+    The selection as another page sees it: filters that page doesn't offer are dropped.
+    """
+    if filters is None:
+        return dict(selection)
+    return {key: (value if key == 'version' or key in filters else None) for key, value in selection.items()}
+
+
+# --- 3. QUEUE + WORKER ---
+
+def schedule(page, selection):
+    """
+    Queues the next pages of `page` for `selection` (projected on each page's filters) and for the
+    page's unfiltered selection, which is what a page shows when it is opened.
+    """
+    if PREFETCH_CONFIG['pages'] <= 0 or not selection:
+        return
+
+    default = make_selection({'version': selection.get('version')})
+    with _LOCK:
+        for target, filters in next_pages(page, PREFETCH_CONFIG['pages']):
+            for candidate in (project_selection(selection, filters), default):
+                key = (target, repr(sorted(candidate.items())))
+                _JOBS[key] = (target, candidate)
+                _JOBS.move_to_end(key)
+            while len(_JOBS) > PREFETCH_CONFIG['max_jobs']:
+                _JOBS.popitem(last=False)
+
+        if _STATE['thread'] is None:
+            _STATE['thread'] = threading.Thread(target=_worker, name='prefetch', daemon=True)
+            _STATE['thread'].start()
+    _WAKE.set()
+
+
+def _wait_idle():
+    quiet = PREFETCH_CONFIG['idle_ms'] / 1000
+    while True:
+        time.sleep(quiet)
+        if _STATE['active_requests'] == 0:
+            return
+
+
+def _worker():
+    while True:
+        _WAKE.wait()
+        with _LOCK:
+            if not _JOBS:
+                _WAKE.clear()
+                continue
+            _, (page, selection) = _JOBS.popitem(last=False)
+
+        for name in [name for (stage_page, name) in list(STAGES) if stage_page == page]:
+            _wait_idle()
+            try:
+                run_stage(page, name, selection)  # Cache hit when it was already computed
+                _STATE['runs'] += 1
+            except Exception as e:
+                _STATE['errors'] += 1
+                print(f"⚠️ Prefetch of {page}/{name} failed: {e}")
+                break
+
+
+def prefetch_stats():
+    with _LOCK:
+        return {'pending': len(_JOBS), 'runs': _STATE['runs'], 'errors': _STATE['errors'],
+                'active_requests': _STATE['active_requests']}
+
+
+# --- 4. HOOKS ---
+
+def track_requests(server):
+    """
+    Counts in-flight requests on the Flask server, so prefetching waits for quiet moments.
+    """
+
+    @server.before_request
+    def _request_started():
+        with _LOCK:
+            _STATE['active_requests'] += 1
+
+    @server.teardown_request
+    def _request_finished(exc=None):
+        with _LOCK:
+            _STATE['active_requests'] -= 1
+
+
+def prefetch_next(page):
+    """
+    Callback decorator (place it *under* @app.callback, first argument = the page's selection):
+    once the callback has answered, the next pages are queued for the same selection.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(selection, *args):
+            result = func(selection, *args)
+            schedule(page, selection)
+            return result
+
+        return wrapper
+
+    return decorator
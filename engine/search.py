@@ -0,0 +1,122 @@
+import os
+import threading
+
+import numpy as np
+from dash import Input, Output, State
+
+from Data.dataset import dataset_version
+from engine.catalog import dimension
+
+# --- 1. CONFIGURATION ---
+# High-cardinality filters (Company, Job_Title...) don't ship their full value list to the browser.
+# The dropdown asks the server for the best matches of what is being typed (search_value).
+SEARCH_CONFIG = {
+    'max_options': int(os.getenv('SEARCH_MAX_OPTIONS', 50)),  # Options returned per keystroke
+}
+
+_INDEXES = {'version': None, 'columns': {}}
+_LOCK = threading.Lock()
+
+
+# --- 2. DICTIONARY INDEX ---
+# The column's distinct values from the dimension catalog (its categorical dictionary), sorted by lowercase text:
+# a prefix is a binary search, a substring a vectorized scan over the (few thousand) distinct values.
+
+def _build_index(entry):
+    lower = np.char.lower(entry['values'])
+    order = np.argsort(lower, kind='stable')
+    return {
+        'values': entry['values'][order],
+        'lower': lower[order],
+        'counts': entry['counts'][order],
+    }
+
+
+def get_index(col):
+    """
+    Search index of a dataset column for the current dataset version (None if the column is missing).
+    """
+    version = dataset_version()
+    with _LOCK:
+        if _INDEXES['version'] != version:
+            _INDEXES['version'] = version
+            _INDEXES['columns'] = {}
+        index = _INDEXES['columns'].get(col)
+    if index is not None:
+        return index
+
+    entry = dimension(col)
+    if entry is None:
+        return None
+
+    index = _build_index(entry)
+    with _LOCK:
+        if _INDEXES['version'] == version:
+            _INDEXES['columns'][col] = index
+    return index
+
+
+def _by_count(index, positions):
+    return positions[np.argsort(-index['counts'][positions], kind='stable')]
+
+
+def search_values(col, query, limit=None):
+    """
+    Up to `limit` values of `col` matching `query` (case-insensitive): prefix matches first, then
+    substring matches, each ranked by number of rows. An empty query returns the most frequent values.
+    """
+    index = get_index(col)
+    if index is None:
+        return []
+    limit = limit or SEARCH_CONFIG['max_options']
+    lower = index['lower']
+    query = (query or '').strip().lower()
+
+    if not query:
+        return index['values'][_by_count(index, np.arange(len(lower)))[:limit]].tolist()
+
+    lo = np.searchsorted(lower, query, side='left')
+    hi = np.searchsorted(lower, query + '\uffff', side='left')
+    matches = _by_count(index, np.arange(lo, hi))
+    if len(matches) < limit:
+        inner = np.flatnonzero(np.char.find(lower, query) > 0)
+        matches = np.concatenate([matches, _by_count(index, inner)])
+    return index['values'][matches[:limit]].tolist()
+
+
+def search_options(col, query, selected=None, limit=None):
+    """
+    Dropdown options for `query`. Already selected values are always kept (a multi-dropdown drops
+    selected values that are missing from its options).
+    """
+    selected = [str(v) for v in (selected or [])]
+    matches = [v for v in search_values(col, query, limit) if v not in selected]
+    return [{'label': v, 'value': v} for v in selected + matches]
+
+
+def clear_search():
+    with _LOCK:
+        _INDEXES['version'] = None
+        _INDEXES['columns'] = {}
+
+
+# --- 3. CALLBACK ---
+
+def register_search_dropdown(app, dropdown_id, col, data_id='global-data-store'):
+    """
+    Feeds a dcc.Dropdown's options from the search index of `col` as the user types.
+    """
+
+    @app.callback(
+        Output(dropdown_id, 'options'),
+        [Input(data_id, 'data'), Input(dropdown_id, 'search_value')],
+        State(dropdown_id, 'value')
+    )
+    def update_search_options(data, search_value, selected):
+        if not data:
+            return []
+        if isinstance(selected, (str, int, float)):
+            selected = [selected]
+        return search_options(col, search_value, selected)
+
+    return update_search_options
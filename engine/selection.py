@@ -0,0 +1,156 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from Data.dataset import get_dataset
+from engine.metrics import note_rows
+from engine.tracing import span
+
+# --- 1. FILTER SPEC ---
+# Dropdown filters map 1:1 to a column of the dataset.
+FILTER_COLUMNS = ['Job_Category', 'Company', 'Country', 'Traffic_Source']
+
+# Row positions of recent selections, so every stage of a page filters the table only once
+_ROW_CACHE = OrderedDict()
+_ROW_CACHE_SIZE = 32
+_LOCK = threading.Lock()
+
+
+def _clean_list(values):
+    if not values:
+        return None
+    return sorted(set(values), key=str)
+
+
+def _clean_date(value):
+    return str(value)[:10] if value else None
+
+
+# --- 2. SELECTION ---
+
+def make_selection(token, start_date=None, end_date=None, months=None,
+                   categories=None, companies=None, countries=None, sources=None):
+    """
+    Builds the normalized, JSON-friendly filter state of a page (stored in its 'xxx-selection' dcc.Store).
+    Returns None when no dataset is loaded.
+    """
+    if not token:
+        return None
+
+    return {
+        'version': token.get('version'),
+        'start_date': _clean_date(start_date),
+        'end_date': _clean_date(end_date),
+        'months': sorted(int(m) for m in months) if months else None,
+        'Job_Category': _clean_list(categories),
+        'Company': _clean_list(companies),
+        'Country': _clean_list(countries),
+        'Traffic_Source': _clean_list(sources),
+    }
+
+
+def _day_bound(created, value, days=0):
+    bound = pd.Timestamp(value) + pd.Timedelta(days=days)
+    tz = getattr(created.dt, 'tz', None)
+    return bound.tz_localize(tz) if tz is not None else bound
+
+
+def _filter_positions(df, selection):
+    """
+    Row positions matching the selection, or None when nothing is filtered.
+    Same rules as the original per-page filters: dates are compared by calendar day.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    filtered = False
+
+    if 'Created_At' in df.columns:
+        created = df['Created_At']
+        if selection.get('start_date'):
+            mask &= (created >= _day_bound(created, selection['start_date'])).to_numpy()
+            filtered = True
+        if selection.get('end_date'):
+            mask &= (created < _day_bound(created, selection['end_date'], days=1)).to_numpy()
+            filtered = True
+        if selection.get('months'):
+            mask &= created.dt.month.isin(selection['months']).to_numpy()
+            filtered = True
+
+    for col in FILTER_COLUMNS:
+        values = selection.get(col)
+        if values and col in df.columns:
+            mask &= df[col].isin(values).to_numpy()
+            filtered = True
+
+    # 'sample': k -> every k-th matching row only (approximate answers over the memory budget, engine/memory.py)
+    step = int(selection.get('sample') or 1)
+    if not filtered and step <= 1:
+        return None
+    positions = np.flatnonzero(mask)[::step]
+    return positions.astype(np.int32) if len(df) < 2 ** 31 else positions
+
+
+def select_positions(selection):
+    """
+    Row positions (into the active dataset) matching `selection`, or None when every row matches.
+    """
+    df = get_dataset()
+    if df is None or not selection:
+        return None
+
+    key = repr(sorted(selection.items()))
+    with _LOCK:
+        cached = _ROW_CACHE.get(key)
+        if cached is not None:
+            _ROW_CACHE.move_to_end(key)
+
+    if cached is None:
+        with span('filter'):
+            cached = (_filter_positions(df, selection),)
+        with _LOCK:
+            _ROW_CACHE[key] = cached
+            while len(_ROW_CACHE) > _ROW_CACHE_SIZE:
+                _ROW_CACHE.popitem(last=False)
+
+    note_rows(len(df) if cached[0] is None else len(cached[0]))
+    return cached[0]
+
+
+def select_rows(selection):
+    """
+    Returns the rows of the active dataset that match `selection` (a DataFrame the caller may modify).
+    """
+    df = get_dataset()
+    if df is None or not selection:
+        return df
+
+    positions = select_positions(selection)
+    if positions is None:
+        return df
+    return df.iloc[positions]
+
+
+# --- 3. ROW ORDER ---
+
+def sorted_positions(frame, positions, col, ascending):
+    """
+    Positions (into `frame`) of the given rows, stably sorted by `col` (ties keep their order in both
+    directions). Missing cells (NaN / NaT / None / <NA>) always go last.
+    """
+    values = frame[col].to_numpy()[positions]
+    missing = np.asarray(pd.isna(values), dtype=bool)
+    if values.dtype.kind in 'iufbmM':
+        keys = values.astype('datetime64[ns]').view(np.int64) if values.dtype.kind in 'mM' else values
+        keys = np.where(missing, 0, keys.astype(np.float64))
+    else:
+        # Text (or mixed) values: rank of their string form among the present values
+        keys = np.zeros(len(values), dtype=np.int64)
+        keys[~missing] = pd.factorize(pd.Series(values[~missing]).astype(str), sort=True)[0]
+    # Last key first: missing cells after the others, then by value (negated ranks for descending)
+    return positions[np.lexsort((keys if ascending else -keys, missing))]
+
+
+def clear_row_cache():
+    with _LOCK:
+        _ROW_CACHE.clear()
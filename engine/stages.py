@@ -0,0 +1,94 @@
+import importlib
+from functools import partial
+
+from engine.admission import admitted
+from engine.cache import cached_call
+from engine.memory import measured, sample_step, scale_result, approximate
+from engine.offload import offload_enabled, run_offloaded
+from engine.tracing import traced
+
+# --- Compute Stage Registry ---
+# Every page splits its work into named stages (kpis, charts, table, shared aggregates...).
+# A stage is a plain function of the page's selection dict; results are cached per
+# (page, stage, dataset version, selection), so a stage only re-runs when its inputs change.
+
+STAGES = {}
+# Heavy stages that run in the process pool when it is enabled (see engine/offload.py)
+OFFLOAD_STAGES = set()
+# Parts of a stage's result that grow with the row count (scaled back when it ran on a sample, engine/memory.py)
+STAGE_SCALES = {}
+# Recomputes a sampled stage's averages from its scaled totals
+STAGE_DERIVED = {}
+# Parts of a stage's result that stay sample estimates (distinct counts, distributions), flagged when sampled
+STAGE_ESTIMATES = {}
+
+# Pure pandas compute modules (no Dash imports) - one per dashboard page
+COMPUTE_MODULES = [
+    'job_views_dashboard.compute.overview_analytics',
+    'job_views_dashboard.compute.jobs_posted_analytics',
+    'job_views_dashboard.compute.application_analytics',
+    'job_views_dashboard.compute.views_analytics',
+    'job_views_dashboard.compute.country_jobs_posted',
+    'job_views_dashboard.compute.application_country',
+    'job_views_dashboard.compute.views_country',
+    'job_views_dashboard.compute.retention_analytics',
+    'job_views_dashboard.compute.company_analytics',
+    'job_views_dashboard.compute.company_cohorts',
+    'job_views_dashboard.compute.country_category_analytics',
+]
+
+
+def stage(page, name, offload=False, scale=None, derive=None, estimates=None):
+    """
+    Registers a compute function as stage `name` of `page`.
+    offload=True: CPU-heavy stage, run in the process pool when OFFLOAD_WORKERS > 0.
+    scale: the additive counts / sums of its result - True (every number) or dict keys / DataFrame columns.
+    They are multiplied back when the stage answers from a sample of its rows (over MEMORY_BUDGET_MB).
+    derive: function(result) -> result with its averages recomputed from the scaled totals (sampled runs only).
+    estimates: parts that cannot be scaled back (distinct counts, bucket distributions; True = all of it) -
+    reported as estimates in the X-Approximate header.
+    """
+
+    def decorator(func):
+        STAGES[(page, name)] = func
+        if offload:
+            OFFLOAD_STAGES.add((page, name))
+        if scale:
+            STAGE_SCALES[(page, name)] = scale
+        if derive:
+            STAGE_DERIVED[(page, name)] = derive
+        if estimates:
+            STAGE_ESTIMATES[(page, name)] = estimates
+        return func
+
+    return decorator
+
+
+def run_stage(page, name, selection):
+    """
+    Runs (or serves from cache) one stage for a selection.
+    A computation takes one of the page's admission slots (see engine/admission.py) while it runs.
+    """
+    step = sample_step(selection)
+    if step > 1:
+        # Too many rows for the memory budget: answer from every step-th one (nested stages follow the sample)
+        approximate(page, name, step, STAGE_ESTIMATES.get((page, name)))
+        value = scale_result(run_stage(page, name, {**selection, 'sample': step}), step,
+                             STAGE_SCALES.get((page, name)))
+        derive = STAGE_DERIVED.get((page, name))
+        return derive(value) if derive and value is not None else value
+
+    func = STAGES[(page, name)]
+    if (page, name) in OFFLOAD_STAGES and offload_enabled():
+        func = partial(run_offloaded, page, name)
+    func = measured(page, name, func)
+    return cached_call(page, f"stage:{name}", [selection], admitted(page, traced(f"stage.{name}", func)))
+
+
+def load_all_stages():
+    """
+    Imports every compute module so STAGES is complete (used by tools that don't load the Dash pages).
+    """
+    for module_name in COMPUTE_MODULES:
+        importlib.import_module(module_name)
+    return STAGES
@@ -0,0 +1,44 @@
+import os
+import time
+from contextlib import contextmanager
+
+# --- Startup Profile ---
+# Wall time of each import / startup step, printed once the app is ready (STARTUP_REPORT=0 to silence).
+# Page layouts are built lazily, their cost is logged on the first visit of each page instead.
+
+STARTUP_CONFIG = {
+    'report': os.getenv('STARTUP_REPORT', '1') != '0',
+}
+
+_STARTED = time.perf_counter()
+_TIMINGS = []  # [(kind, name, seconds)]
+
+
+@contextmanager
+def timed(kind, name):
+    """
+    Records the duration of the block. Yields a dict whose 'seconds' is filled when the block ends.
+    """
+    timing = {'kind': kind, 'name': name, 'seconds': None}
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing['seconds'] = time.perf_counter() - start
+        _TIMINGS.append((kind, name, timing['seconds']))
+
+
+def get_timings(kind=None):
+    return [t for t in _TIMINGS if kind is None or t[0] == kind]
+
+
+def startup_report():
+    """
+    Prints every recorded step (slowest first) and the total time since this module was imported.
+    """
+    if not STARTUP_CONFIG['report']:
+        return
+    total = time.perf_counter() - _STARTED
+    print(f"⏱️ Startup profile: ready in {total * 1000:.0f} ms")
+    for kind, name, seconds in sorted(_TIMINGS, key=lambda t: -t[2]):
+        print(f"   {kind:<10} {name:<55} {seconds * 1000:>8.1f} ms")
@@ -0,0 +1,283 @@
+import os
+import re
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from dash import dash_table, Input, Output, ctx
+
+from engine.indexes import IndexedRows
+from engine.selection import sorted_positions
+
+# --- 1. CONFIGURATION ---
+# Detail tables page, sort and filter on the server: the browser only ever receives one page of rows.
+TABLE_CONFIG = {
+    'page_size': int(os.getenv('TABLE_PAGE_SIZE', 10)),
+    'max_sources': 16,  # Table results kept in memory (one per recent page + selection)
+    'max_orders': 64,  # Row orders kept per (table, sort, filter)
+}
+
+TABLE_STYLE = {
+    'style_table': {'overflowX': 'auto'},
+    'style_header': {'backgroundColor': '#2c3e50', 'color': 'white', 'fontWeight': 'bold'},
+    'style_cell': {'textAlign': 'left', 'padding': '10px', 'fontFamily': 'Segoe UI'},
+    'style_data_conditional': [
+        {'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}
+    ],
+}
+
+# '{col} <operator> <value>' as the DataTable filter row writes it. The operator is the word right after the
+# column ('s' / 'i' prefixes = case-sensitive / insensitive), never a match inside the value.
+FILTER_PATTERN = re.compile(
+    r'^\{(.+?)\}\s+([si]?(?:>=|<=|!=|<|>|=|contains|datestartswith|ge|le|lt|gt|ne|eq))\s+(.*)$')
+FILTER_OPERATORS = {'>=': 'ge', '<=': 'le', '<': 'lt', '>': 'gt', '!=': 'ne', '=': 'eq'}
+
+_SOURCES = OrderedDict()  # key -> (frame, positions) | IndexedRows
+_ORDERS = OrderedDict()  # (key, sort, filter) -> row positions in display order
+_LOCK = threading.Lock()
+
+
+# --- 2. LAYOUT ---
+
+def server_table(table_id, columns, page_size=None, **style):
+    """
+    DataTable whose paging / sorting / filtering is done by a callback (see register_table).
+    columns: list of column ids, or DataTable column dicts. style: overrides of TABLE_STYLE.
+    """
+    columns = [c if isinstance(c, dict) else {'name': c, 'id': c} for c in columns]
+    return dash_table.DataTable(
+        id=table_id,
+        columns=columns,
+        data=[],
+        page_current=0,
+        page_size=page_size or TABLE_CONFIG['page_size'],
+        page_count=0,
+        page_action='custom',
+        sort_action='custom',
+        sort_mode='single',
+        sort_by=[],
+        filter_action='custom',
+        filter_query='',
+        filter_options={'case': 'insensitive'},  # Typed filters are written with the 'i' prefix (icontains...)
+        **{**TABLE_STYLE, **style}
+    )
+
+
+# --- 3. FILTER QUERY ---
+
+def split_filter_part(filter_part):
+    """
+    '{Company} icontains "Acme"' -> ('Company', 'contains', 'Acme', False)
+    The last item is the case sensitivity of text comparisons: 'i' prefix = insensitive, 's' or none = sensitive.
+    """
+    match = FILTER_PATTERN.match(filter_part.strip())
+    if match is None:
+        return None, None, None, None
+    name, operator, value_part = match.groups()
+    prefix = operator[:1] if operator[:1] in ('s', 'i') else ''  # No bare operator starts with s / i
+    operator = FILTER_OPERATORS.get(operator[len(prefix):], operator[len(prefix):])
+
+    value_part = value_part.strip()
+    v0 = value_part[:1]
+    if len(value_part) > 1 and v0 == value_part[-1] and v0 in ("'", '"', '`'):
+        value = value_part[1: -1].replace('\\' + v0, v0)
+    else:
+        try:
+            value = float(value_part)
+        except ValueError:
+            value = value_part
+    return name, operator, value, prefix != 'i'
+
+
+def parse_filter_query(filter_query):
+    filters = []
+    for part in (filter_query or '').split(' && '):
+        col, op, value, case = split_filter_part(part)
+        if col:
+            filters.append((col, op, value, case))
+    return filters
+
+
+def _filter_mask(frame, filters):
+    """
+    Boolean mask over `frame` for the parsed filters, or None when nothing filters.
+    """
+    mask = None
+    for col, op, value, case in filters:
+        if col not in frame.columns:
+            continue
+        series = frame[col]
+        is_date = pd.api.types.is_datetime64_any_dtype(series)
+
+        if op in ('contains', 'datestartswith') or is_date or not pd.api.types.is_numeric_dtype(series):
+            # Text comparison; missing cells (None / NaN) stay <NA> and never match
+            text = series.astype('string')
+            value = str(value)
+            if not case:
+                text, value = text.str.lower(), value.lower()
+            if op == 'contains':
+                part = text.str.contains(value, regex=False)
+            elif op == 'datestartswith' or (op == 'eq' and is_date):
+                part = text.str.startswith(value)
+            else:
+                part = getattr(text, op)(value)
+        else:
+            if isinstance(value, str):
+                continue  # Text typed into a numeric column -> ignore instead of failing
+            part = getattr(series, op)(value)
+
+        part = part.fillna(False).to_numpy(dtype=bool)
+        mask = part if mask is None else mask & part
+    return mask
+
+
+# --- 4. SORT ORDERS ---
+
+def _remember(store, key, value, limit):
+    with _LOCK:
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > limit:
+            store.popitem(last=False)
+
+
+def _lookup(store, key):
+    with _LOCK:
+        value = store.get(key)
+        if value is not None:
+            store.move_to_end(key)
+        return value
+
+
+def _display_order(key, frame, positions, sort_by, filter_query):
+    order_key = (key, repr(sort_by), filter_query or '')
+    order = _lookup(_ORDERS, order_key)
+    if order is not None:
+        return order
+
+    if positions is None:
+        positions = np.arange(len(frame))
+
+    if sort_by and sort_by[0]['column_id'] in frame.columns:
+        order = sorted_positions(frame, positions, sort_by[0]['column_id'], sort_by[0]['direction'] == 'asc')
+    else:
+        order = positions  # No sort, or a column the table doesn't have
+
+    filters = parse_filter_query(filter_query)
+    if filters:
+        mask = _filter_mask(frame, filters)
+        if mask is not None:
+            order = order[mask[order]]
+
+    _remember(_ORDERS, order_key, order, TABLE_CONFIG['max_orders'])
+    return order
+
+
+def _indexed_order(key, rows, sort_by, filter_query, limit):
+    """
+    Display order of an IndexedRows source -> (positions, total matching rows).
+    Without a filter query only the first `limit` rows are walked out of the permutation index.
+    A sort column without an index (not in the dataset) falls back to the source's default order.
+    """
+    col, ascending = (sort_by[0]['column_id'], sort_by[0]['direction'] == 'asc') if sort_by else (None, None)
+    filters = parse_filter_query(filter_query)
+    if not filters:
+        order = rows.order(col, ascending, limit=limit)
+        return (order if order is not None else rows.order(limit=limit)), rows.count()
+
+    order_key = (key, repr(sort_by), filter_query)
+    order = _lookup(_ORDERS, order_key)
+    if order is None:
+        mask = _filter_mask(rows.frame, filters)
+        order = rows.order(col, ascending, mask=mask)
+        if order is None:
+            order = rows.order(mask=mask)
+        _remember(_ORDERS, order_key, order, TABLE_CONFIG['max_orders'])
+    return order, len(order)
+
+
+# --- 5. PAGING ---
+
+def get_source(key, build):
+    """
+    (frame, positions) of a table, or an IndexedRows, built once per key.
+    positions=None means every row of frame, in order.
+    """
+    source = _lookup(_SOURCES, key)
+    if source is None:
+        source = build()
+        if source is None:
+            return None
+        if isinstance(source, pd.DataFrame):
+            source = (source.reset_index(drop=True), None)
+        _remember(_SOURCES, key, source, TABLE_CONFIG['max_sources'])
+    return source
+
+
+def page_rows(key, build, page_current, page_size, sort_by, filter_query, columns=None):
+    """
+    Returns (records of the requested page, page_count).
+    """
+    source = get_source(key, build)
+    if source is None:
+        return [], 0
+
+    page_size = page_size or TABLE_CONFIG['page_size']
+    page_current = page_current or 0
+    if isinstance(source, IndexedRows):
+        frame = source.frame
+        order, total = _indexed_order(key, source, sort_by, filter_query, (page_current + 1) * page_size)
+    else:
+        frame, positions = source
+        order = _display_order(key, frame, positions, sort_by, filter_query)
+        total = len(order)
+
+    page_count = max(1, math.ceil(total / page_size))
+    page_current = min(page_current, page_count - 1)
+
+    rows = frame.iloc[order[page_current * page_size:(page_current + 1) * page_size]]
+    if columns:
+        rows = rows[[c for c in columns if c in rows.columns]]
+    return rows.to_dict('records'), page_count
+
+
+def clear_tables():
+    with _LOCK:
+        _SOURCES.clear()
+        _ORDERS.clear()
+
+
+# --- 6. CALLBACK ---
+
+def register_table(app, table_id, selection_id, page, build, columns=None):
+    """
+    Wires a server_table to a page's selection store.
+    build(selection) -> DataFrame (rows in default order) | (frame, positions) | IndexedRows | None.
+    A new selection, sort or filter jumps back to the first page.
+    """
+
+    @app.callback(
+        [Output(table_id, 'data'), Output(table_id, 'page_count'), Output(table_id, 'page_current')],
+        [
+            Input(selection_id, 'data'),
+            Input(table_id, 'page_current'),
+            Input(table_id, 'page_size'),
+            Input(table_id, 'sort_by'),
+            Input(table_id, 'filter_query')
+        ]
+    )
+    def update_table_page(selection, page_current, page_size, sort_by, filter_query):
+        if not selection:
+            return [], 1, 0
+        if f"{table_id}.page_current" not in ctx.triggered_prop_ids:
+            page_current = 0
+
+        key = (page, table_id, repr(sorted(selection.items())))
+        data, page_count = page_rows(key, lambda: build(selection), page_current, page_size, sort_by,
+                                     filter_query, columns)
+        page_count = max(1, page_count)  # No source / no rows -> one empty page, never page -1
+        return data, page_count, max(0, min(page_current or 0, page_count - 1))
+
+    return update_table_page
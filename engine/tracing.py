@@ -0,0 +1,206 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import request
+
+# --- 1. CONFIGURATION ---
+# Spans split a callback request into filtering, compute stages, figure building / formatting ("render", the
+# callback's own time) and JSON serialization. They feed the dash_span_duration_seconds histograms on /metrics
+# and the Server-Timing header (browser dev tools -> Network -> Timing).
+# A request sent with `X-Profile: <PROFILE_TOKEN>` (or ?profile=<PROFILE_TOKEN>) is also sampled by a stack
+# profiler; the folded stacks are written for flamegraph.pl / speedscope. Profiling is off while no token is set.
+TRACING_CONFIG = {
+    'enabled': os.getenv('TRACING_ENABLED', '1') != '0',
+    'profile_token': os.getenv('PROFILE_TOKEN', ''),
+    'profile_interval_ms': float(os.getenv('PROFILE_INTERVAL_MS', 2)),
+    'profile_dir': os.getenv('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'job-portal-profiles'),
+}
+
+_CURRENT = threading.local()  # Trace of the request handled by this thread
+
+
+# --- 2. SPANS ---
+
+def start_trace():
+    if TRACING_CONFIG['enabled']:
+        _CURRENT.trace = {'spans': [], 'stack': []}
+
+
+def finish_trace():
+    """
+    Ends the thread's trace. Returns {span name: (total seconds, self seconds)}, summed over repeats.
+    """
+    trace = getattr(_CURRENT, 'trace', None)
+    _CURRENT.trace = None
+    if trace is None:
+        return {}
+    totals = {}
+    for name, seconds, own in trace['spans']:
+        total, self_total = totals.get(name, (0.0, 0.0))
+        totals[name] = (total + seconds, self_total + own)
+    return totals
+
+
+@contextmanager
+def span(name):
+    """
+    Times the block as `name` within the current request's trace (no-op outside a traced request).
+    """
+    trace = getattr(_CURRENT, 'trace', None)
+    if trace is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    trace['stack'].append(0.0)  # Time spent in child spans
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        children = trace['stack'].pop()
+        if trace['stack']:
+            trace['stack'][-1] += seconds
+        trace['spans'].append((name, seconds, seconds - children))
+
+
+def traced(name, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def server_timing(spans):
+    """
+    Server-Timing header value (milliseconds) for the spans of one request.
+    """
+    return ", ".join(f"{name};dur={total * 1000:.1f}" for name, (total, _) in spans.items())
+
+
+def trace_callbacks(app):
+    """
+    Wraps every registered Dash callback in a 'callback' span, and Dash's JSON encoder in a 'serialize' span.
+    Call once, after the pages registered their callbacks.
+    Both hooks are Dash internals, checked against Dash 4.4.1: app.callback_map[output]['callback'] (the wrapper
+    Dash dispatches to) and dash._callback.to_json (the module global that wrapper serializes with). A Dash
+    version without them only loses those spans (and 'render', derived from 'callback'); nothing else changes.
+    """
+    if not TRACING_CONFIG['enabled']:
+        return
+
+    callback_map = getattr(app, 'callback_map', None)
+    specs = [spec for spec in (callback_map.values() if isinstance(callback_map, dict) else [])
+             if isinstance(spec, dict) and callable(spec.get('callback'))]
+    if not specs:
+        print("⚠️ Tracing: no Dash callback_map to wrap (Dash version?) - no callback / render spans")
+    for spec in specs:
+        func = spec['callback']
+        if not getattr(func, '_traced', False):
+            spec['callback'] = traced('callback', func)
+            spec['callback']._traced = True
+
+    try:
+        from dash import _callback
+    except ImportError:
+        _callback = None
+    if not callable(getattr(_callback, 'to_json', None)):
+        print("⚠️ Tracing: dash._callback.to_json not found (Dash version?) - no serialize span")
+    elif not getattr(_callback.to_json, '_traced', False):
+        _callback.to_json = traced('serialize', _callback.to_json)
+        _callback.to_json._traced = True
+
+
+# --- 3. SAMPLING PROFILER ---
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a helper thread.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    @staticmethod
+    def _frame_label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def write_folded(self, path):
+        """
+        One "frame;frame;...;leaf count" line per distinct stack (Brendan Gregg's folded format).
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def _profile_requested():
+    token = TRACING_CONFIG['profile_token']
+    return bool(token) and token in (request.headers.get('X-Profile'), request.args.get('profile'))
+
+
+def register_profiler(server):
+    """
+    Profiles the requests that carry the profile token and tells the client where the folded stacks went
+    (X-Profile-File response header).
+    """
+    if not TRACING_CONFIG['profile_token']:
+        return
+
+    @server.before_request
+    def _profile_started():
+        if _profile_requested():
+            interval = TRACING_CONFIG['profile_interval_ms'] / 1000
+            _CURRENT.profiler = SamplingProfiler(threading.get_ident(), interval).start()
+
+    @server.after_request
+    def _profile_finished(response):
+        profiler = getattr(_CURRENT, 'profiler', None)
+        if profiler is None:
+            return response
+        _CURRENT.profiler = None
+        profiler.stop()
+
+        label = (request.get_json(silent=True) or {}).get('output', '') if request.is_json else request.path
+        label = "".join(c if c.isalnum() else '_' for c in label).strip('_')[:60] or 'request'
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10 ** 9:09d}"
+        path = os.path.join(TRACING_CONFIG['profile_dir'], f"{stamp}-{label}.folded")
+        profiler.write_folded(path)
+        print(f"🔥 Profile written: {path} ({profiler.samples} samples)")
+        response.headers['X-Profile-File'] = path
+        return response
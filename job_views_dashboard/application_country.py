@@ -1,9 +1,16 @@
-import pandas as pd
-import plotly.express as px
-from dash import html, dcc, Input, Output, dash_table
+from dash import html, dcc, Input, Output, State, no_update
 import dash_bootstrap_components as dbc
 import calendar
 
+from engine.cache import memoize_callback
+from engine.catalog import dimension_options, register_date_bounds
+from engine.export import export_buttons, register_export_links
+from engine.prefetch import prefetch_next
+from engine.selection import make_selection
+from engine.stages import run_stage
+from engine.tables import server_table, register_table
+from job_views_dashboard.compute.application_country import PAGE, TABLE_COLUMNS
+
 # --- 1. STYLING & HELPER FUNCTIONS ---
 
 glass_style = {
@@ -33,109 +40,117 @@ def create_detail_card(title, value, subtext, color, val_id=None):
 
 # --- 2. LAYOUT DEFINITION ---
 
-layout = dbc.Container([
-
-    # Header
-    dbc.Row([
-        dbc.Col(html.H3("Application Analytics by Country", className="my-4",
-                        style={'fontWeight': '800', 'color': '#2c3e50'}),
-                width=12)
-    ]),
-
-    # --- FILTERS ---
-    dbc.Row([
-        # 1. Date Range
-        dbc.Col([
-            html.Label("Date Range", className="fw-bold small text-muted"),
-            dcc.DatePickerRange(
-                id='ac-date-picker',
-                display_format='YYYY-MM-DD',
-                clearable=True,
-                style={'width': '100%', 'borderRadius': '8px'}
-            )
-        ], width=12, md=3),
-
-        # 2. Month Filter
-        dbc.Col([
-            html.Label("Filter by Month", className="fw-bold small text-muted"),
-            dcc.Dropdown(
-                id='ac-month-dropdown',
-                options=[{'label': calendar.month_name[i], 'value': i} for i in range(1, 13)],
-                multi=True,
-                placeholder="Select Months..."
-            )
-        ], width=12, md=3),
-
-        # 3. Country Filter (Primary Focus)
-        dbc.Col([
-            html.Label("Country", className="fw-bold small text-muted"),
-            dcc.Dropdown(id='ac-country-dropdown', multi=True, placeholder="All Countries")
-        ], width=12, md=3),
-
-        # 4. Category Filter
-        dbc.Col([
-            html.Label("Job Category", className="fw-bold small text-muted"),
-            dcc.Dropdown(id='ac-category-dropdown', multi=True, placeholder="All Categories")
-        ], width=12, md=3),
-
-    ], className="p-4 mb-4 bg-white shadow-sm", style={'borderRadius': '15px', 'borderLeft': '5px solid #6610f2'}),
-
-    # --- KPI GRID ---
-    dbc.Row([
-        # Row 1: General Stats
-        dbc.Col(create_detail_card("Total Applications", "0", "Global Volume", "dark", "ac-card-total"), width=12,
-                sm=6, lg=4, xl=2, className="mb-3"),
-        dbc.Col(create_detail_card("Avg Apps/Country", "0", "Mean per Region", "info", "ac-card-avg-country"), width=12,
-                sm=6,
-                lg=4, xl=2, className="mb-3"),
-        dbc.Col(create_detail_card("Active Countries", "0", "Countries with Apps", "info", "ac-card-active-countries"),
-                width=12, sm=6, lg=4, xl=2, className="mb-3"),
-        dbc.Col(create_detail_card("Top Country Share", "0%", "Dominance", "primary", "ac-card-share"), width=12,
-                sm=6, lg=4, xl=2, className="mb-3"),
-        dbc.Col(create_detail_card("Conversion Rate", "0%", "Global Apps/Views", "danger", "ac-card-conv"), width=12,
-                sm=6,
-                lg=4, xl=2, className="mb-3"),
-
-        # Row 2: Highs & Lows
-        dbc.Col(create_detail_card("Top Country (Volume)", "-", "Name: Total Apps", "success", "ac-card-top-country"),
+def build_layout():
+    """
+    Page layout, built on first navigation to the page (see root_file/app.py).
+    """
+    return dbc.Container([
+        # Normalized filter state shared by the KPI / chart / table stages
+        dcc.Store(id='ac-selection'),
+
+        # Header
+        dbc.Row([
+            dbc.Col(html.H3("Application Analytics by Country", className="my-4",
+                            style={'fontWeight': '800', 'color': '#2c3e50'}),
+                    width=True),
+            dbc.Col(export_buttons('ac'), width='auto', className="my-4")
+        ], className="align-items-center"),
+
+        # --- FILTERS ---
+        dbc.Row([
+            # 1. Date Range
+            dbc.Col([
+                html.Label("Date Range", className="fw-bold small text-muted"),
+                dcc.DatePickerRange(
+                    id='ac-date-picker',
+                    display_format='YYYY-MM-DD',
+                    clearable=True,
+                    style={'width': '100%', 'borderRadius': '8px'}
+                )
+            ], width=12, md=3),
+
+            # 2. Month Filter
+            dbc.Col([
+                html.Label("Filter by Month", className="fw-bold small text-muted"),
+                dcc.Dropdown(
+                    id='ac-month-dropdown',
+                    options=[{'label': calendar.month_name[i], 'value': i} for i in range(1, 13)],
+                    multi=True,
+                    placeholder="Select Months..."
+                )
+            ], width=12, md=3),
+
+            # 3. Country Filter (Primary Focus)
+            dbc.Col([
+                html.Label("Country", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='ac-country-dropdown', multi=True, placeholder="All Countries")
+            ], width=12, md=3),
+
+            # 4. Category Filter
+            dbc.Col([
+                html.Label("Job Category", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='ac-category-dropdown', multi=True, placeholder="All Categories")
+            ], width=12, md=3),
+
+        ], className="p-4 mb-4 bg-white shadow-sm", style={'borderRadius': '15px', 'borderLeft': '5px solid #6610f2'}),
+
+        # --- KPI GRID ---
+        dbc.Row([
+            # Row 1: General Stats
+            dbc.Col(create_detail_card("Total Applications", "0", "Global Volume", "dark", "ac-card-total"), width=12,
+                    sm=6, lg=4, xl=2, className="mb-3"),
+            dbc.Col(create_detail_card("Avg Apps/Country", "0", "Mean per Region", "info", "ac-card-avg-country"),
+                    width=12, sm=6, lg=4, xl=2, className="mb-3"),
+            dbc.Col(create_detail_card("Active Countries", "0", "Countries with Apps", "info",
+                                       "ac-card-active-countries"), width=12, sm=6, lg=4, xl=2, className="mb-3"),
+            dbc.Col(create_detail_card("Top Country Share", "0%", "Dominance", "primary", "ac-card-share"), width=12,
+                    sm=6, lg=4, xl=2, className="mb-3"),
+            dbc.Col(create_detail_card("Conversion Rate", "0%", "Global Apps/Views", "danger", "ac-card-conv"),
+                    width=12, sm=6, lg=4, xl=2, className="mb-3"),
+
+            # Row 2: Highs & Lows
+            dbc.Col(create_detail_card("Top Country (Volume)", "-", "Name: Total Apps", "success",
+                                       "ac-card-top-country"), width=12, sm=6, lg=4, className="mb-3"),
+            dbc.Col(
+                create_detail_card("Lowest Country (Volume)", "-", "Name: Total Apps", "warning",
+                                   "ac-card-low-country"),
                 width=12, sm=6, lg=4, className="mb-3"),
-        dbc.Col(
-            create_detail_card("Lowest Country (Volume)", "-", "Name: Total Apps", "warning", "ac-card-low-country"),
-            width=12, sm=6, lg=4, className="mb-3"),
-
-        # Row 3: Top Lists (UPDATED)
-        dbc.Col(create_detail_card("Top 3 Markets", "-", "Country: Apps", "secondary", "ac-card-top3"),
-                width=12, md=4, className="mb-3"),
-        dbc.Col(create_detail_card("Top 3 Categories", "-", "Category: Apps", "secondary", "ac-card-top3-cat"),
-                width=12, md=4, className="mb-3"),
-        dbc.Col(create_detail_card("Top 3 Companies", "-", "Company: Apps", "secondary", "ac-card-top3-comp"),
-                width=12, md=4, className="mb-3"),
-    ]),
-
-    # --- GRAPHS ---
-    dbc.Row([
-        # Graph 1: Bar Chart (Countries)
-        dbc.Col(dbc.Card([
-            dbc.CardHeader("1. Total Applications by Country (Top 20)", className="bg-transparent fw-bold border-0"),
-            dbc.CardBody(dcc.Graph(id='ac-bar-graph', style={'height': '350px'}, config={'displayModeBar': False}))
-        ], style=glass_style), width=12),
-
-        # Graph 2: Pie Chart (Share)
-        dbc.Col(dbc.Card([
-            dbc.CardHeader("2. Application Market Share Distribution", className="bg-transparent fw-bold border-0"),
-            dbc.CardBody(dcc.Graph(id='ac-pie-graph', style={'height': '350px'}, config={'displayModeBar': False}))
-        ], style=glass_style), width=12),
-    ]),
-
-    # --- DATA TABLE ---
-    dbc.Row([
-        dbc.Col([
-            html.H5("Detailed Country Statistics", className="mb-3 text-muted fw-bold"),
-            html.Div(id='ac-table-container', className="styled-table-container")
-        ], width=12)
-    ], className="mb-5")
-
-], fluid=True)
+
+            # Row 3: Top Lists (UPDATED)
+            dbc.Col(create_detail_card("Top 3 Markets", "-", "Country: Apps", "secondary", "ac-card-top3"),
+                    width=12, md=4, className="mb-3"),
+            dbc.Col(create_detail_card("Top 3 Categories", "-", "Category: Apps", "secondary", "ac-card-top3-cat"),
+                    width=12, md=4, className="mb-3"),
+            dbc.Col(create_detail_card("Top 3 Companies", "-", "Company: Apps", "secondary", "ac-card-top3-comp"),
+                    width=12, md=4, className="mb-3"),
+        ]),
+
+        # --- GRAPHS ---
+        dbc.Row([
+            # Graph 1: Bar Chart (Countries)
+            dbc.Col(dbc.Card([
+                dbc.CardHeader("1. Total Applications by Country (Top 20)",
+                               className="bg-transparent fw-bold border-0"),
+                dbc.CardBody(dcc.Graph(id='ac-bar-graph', style={'height': '350px'}, config={'displayModeBar': False}))
+            ], style=glass_style), width=12),
+
+            # Graph 2: Pie Chart (Share)
+            dbc.Col(dbc.Card([
+                dbc.CardHeader("2. Application Market Share Distribution", className="bg-transparent fw-bold border-0"),
+                dbc.CardBody(dcc.Graph(id='ac-pie-graph', style={'height': '350px'}, config={'displayModeBar': False}))
+            ], style=glass_style), width=12),
+        ]),
+
+        # --- DATA TABLE ---
+        dbc.Row([
+            dbc.Col([
+                html.H5("Detailed Country Statistics", className="mb-3 text-muted fw-bold"),
+                html.Div(server_table('ac-table', TABLE_COLUMNS),
+                         id='ac-table-container', className="styled-table-container")
+            ], width=12)
+        ], className="mb-5")
+
+    ], fluid=True)
 
 
 # --- 3. CALLBACKS ---
@@ -149,15 +164,30 @@ def register_callbacks(app):
     )
     def update_filters(data):
         if not data: return [], []
-        df = pd.DataFrame(data)
+        return dimension_options('Country'), dimension_options('Job_Category')
 
-        countries = [{'label': c, 'value': c} for c in
-                     sorted(df['Country'].dropna().unique().astype(str))] if 'Country' in df.columns else []
-        cats = [{'label': c, 'value': c} for c in
-                sorted(df['Job_Category'].dropna().unique().astype(str))] if 'Job_Category' in df.columns else []
-        return countries, cats
+    # The calendar only offers the dataset's dates (first / last posting from the dimension catalog)
+    register_date_bounds(app, 'ac-date-picker')
+
+    # 2. Filtered Selection (shared by the KPI / chart / table stages)
+    @app.callback(
+        Output('ac-selection', 'data'),
+        [
+            Input('global-data-store', 'data'),
+            Input('ac-date-picker', 'start_date'),
+            Input('ac-date-picker', 'end_date'),
+            Input('ac-month-dropdown', 'value'),
+            Input('ac-country-dropdown', 'value'),
+            Input('ac-category-dropdown', 'value')
+        ],
+        State('ac-selection', 'data')
+    )
+    def update_selection(data, start_date, end_date, selected_months, selected_countries, selected_cats, current):
+        selection = make_selection(data, start_date=start_date, end_date=end_date, months=selected_months,
+                                   countries=selected_countries, categories=selected_cats)
+        return no_update if selection == current else selection
 
-    # 2. Update Dashboard
+    # 3. KPI Stage
     @app.callback(
         [
             Output('ac-card-total', 'children'),
@@ -168,105 +198,54 @@ def register_callbacks(app):
             Output('ac-card-top-country', 'children'),
             Output('ac-card-low-country', 'children'),
             Output('ac-card-top3', 'children'),
-            Output('ac-card-top3-cat', 'children'),  # New Output
-            Output('ac-card-top3-comp', 'children'),  # New Output
-            Output('ac-bar-graph', 'figure'),
-            Output('ac-pie-graph', 'figure'),
-            Output('ac-table-container', 'children')
+            Output('ac-card-top3-cat', 'children'),
+            Output('ac-card-top3-comp', 'children')
         ],
+        Input('ac-selection', 'data')
+    )
+    @prefetch_next(PAGE)
+    def update_kpis(selection):
+        stats = run_stage(PAGE, 'kpis', selection) if selection else None
+        if stats is None:
+            return "0", "0", "0", "0%", "0%", "-", "-", "-", "-", "-"
+
+        def top3_str(items):
+            return ", ".join([f"{k}: {v}" for k, v in items]) if items is not None else "-"
+
+        top_name, top_val = stats['top_country']
+        low_name, low_val = stats['low_country']
+
+        return (
+            f"{stats['total_apps']:,}",
+            f"{stats['avg_apps_country']}",
+            f"{stats['active_countries']}",
+            f"{stats['share_pct']:.1f}%",
+            f"{stats['conversion_rate']:.2f}%",
+            f"{top_val} ({top_name})",
+            f"{low_val} ({low_name})",
+            top3_str(stats['top3']),
+            top3_str(stats['top3_categories']),
+            top3_str(stats['top3_companies'])
+        )
+
+    # 4. Chart Stage
+    @app.callback(
         [
-            Input('global-data-store', 'data'),
-            Input('ac-date-picker', 'start_date'),
-            Input('ac-date-picker', 'end_date'),
-            Input('ac-month-dropdown', 'value'),
-            Input('ac-country-dropdown', 'value'),
-            Input('ac-category-dropdown', 'value')
-        ]
+            Output('ac-bar-graph', 'figure'),
+            Output('ac-pie-graph', 'figure')
+        ],
+        Input('ac-selection', 'data')
     )
-    def update_analytics(data, start_date, end_date, selected_months, selected_countries, selected_cats):
-        empty_fig = px.bar(title="No Data")
-        # Updated default return to include 2 extra fields
-        if not data:
-            return "0", "0", "0", "0%", "0%", "-", "-", "-", "-", "-", empty_fig, empty_fig, None
-
-        df = pd.DataFrame(data)
-
-        # --- PREPROCESSING ---
-        if 'Created_At' in df.columns:
-            df['Created_At'] = pd.to_datetime(df['Created_At'], errors='coerce')
-
-        for col in ['Total_Applications', 'Total_Views']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-        # --- FILTERING ---
-        if start_date and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.date >= pd.to_datetime(start_date).date()]
-        if end_date and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.date <= pd.to_datetime(end_date).date()]
-        if selected_months and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.month.isin(selected_months)]
-        if selected_countries and 'Country' in df.columns:
-            df = df[df['Country'].isin(selected_countries)]
-        if selected_cats and 'Job_Category' in df.columns:
-            df = df[df['Job_Category'].isin(selected_cats)]
-
-        if df.empty or 'Country' not in df.columns:
-            return "0", "0", "0", "0%", "0%", "-", "-", "-", "-", "-", empty_fig, empty_fig, None
-
-        # --- KPI CALCULATIONS ---
-
-        # 1. Total Applications
-        total_apps = df['Total_Applications'].sum()
-
-        # 2. Group by Country
-        country_stats = df.groupby('Country')['Total_Applications'].sum()
-
-        if country_stats.empty:
-            return "0", "0", "0", "0%", "0%", "-", "-", "-", "-", "-", empty_fig, empty_fig, None
-
-        # 3. Averages & Counts
-        avg_apps_country = round(country_stats.mean(), 1)
-        active_countries = len(country_stats)
-
-        # 4. Top & Low Country
-        top_val = country_stats.max()
-        top_name = country_stats.idxmax()
-        top_str = f"{top_val} ({top_name})"
-
-        low_val = country_stats.min()
-        low_name = country_stats.idxmin()
-        low_str = f"{low_val} ({low_name})"
-
-        # 5. Market Share (Dominance)
-        share_pct = (top_val / total_apps * 100) if total_apps > 0 else 0
-        share_str = f"{share_pct:.1f}%"
-
-        # 6. Top 3 Markets (Countries)
-        top3 = country_stats.nlargest(3)
-        top3_str = ", ".join([f"{k}: {v}" for k, v in top3.items()])
-
-        # 7. Top 3 Categories (NEW)
-        if 'Job_Category' in df.columns:
-            top3_cats = df.groupby('Job_Category')['Total_Applications'].sum().nlargest(3)
-            top3_cat_str = ", ".join([f"{k}: {v}" for k, v in top3_cats.items()])
-        else:
-            top3_cat_str = "-"
-
-        # 8. Top 3 Companies (NEW)
-        if 'Company' in df.columns:
-            top3_comps = df.groupby('Company')['Total_Applications'].sum().nlargest(3)
-            top3_comp_str = ", ".join([f"{k}: {v}" for k, v in top3_comps.items()])
-        else:
-            top3_comp_str = "-"
-
-        # 9. Conversion Rate
-        tot_views = df['Total_Views'].sum()
-        conv_rate = (total_apps / tot_views * 100) if tot_views > 0 else 0
+    @memoize_callback(PAGE, 'charts')
+    def update_charts(selection):
+        import plotly.express as px  # ~140 ms: loaded on the first chart, not at app startup
 
-        # --- GRAPHS ---
+        country_stats = run_stage(PAGE, 'country_stats', selection) if selection else None
+        if country_stats is None:
+            empty_fig = px.bar(title="No Data")
+            return empty_fig, empty_fig
 
-        # Bar Graph (Top 20 Countries by Apps)
+        # Bar Graph (Top 20 Countries by Applications)
         bar_df = country_stats.nlargest(20).reset_index(name='Applications')
         fig_bar = px.bar(bar_df, x='Country', y='Applications', text='Applications', template="plotly_white")
         fig_bar.update_traces(marker_color='#6610f2', textposition='outside')
@@ -278,40 +257,11 @@ def register_callbacks(app):
         fig_pie.update_traces(textposition='inside', textinfo='percent+label')
         fig_pie.update_layout(margin=dict(l=20, r=20, t=20, b=20), showlegend=True)
 
-        # --- TABLE (Aggregated by Country) ---
-        table_df = df.groupby('Country').agg({
-            'Job_Title': 'count',
-            'Total_Views': 'sum',
-            'Total_Applications': 'sum'
-        }).reset_index()
-
-        table_df.columns = ['Country', 'Total Jobs', 'Total Views', 'Total Applications']
-        table_df['Conversion (%)'] = (table_df['Total Applications'] / table_df['Total Views'] * 100).fillna(0).round(2)
-
-        table = dash_table.DataTable(
-            data=table_df.sort_values('Total Applications', ascending=False).to_dict('records'),
-            columns=[{'name': i, 'id': i} for i in table_df.columns],
-            page_size=10,
-            style_table={'overflowX': 'auto'},
-            style_header={'backgroundColor': '#2c3e50', 'color': 'white', 'fontWeight': 'bold'},
-            style_cell={'textAlign': 'left', 'padding': '10px', 'fontFamily': 'Segoe UI'},
-            style_data_conditional=[
-                {'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}
-            ]
-        )
+        return fig_bar, fig_pie
 
-        return (
-            f"{total_apps:,}",
-            f"{avg_apps_country}",
-            f"{active_countries}",
-            share_str,
-            f"{conv_rate:.2f}%",
-            top_str,
-            low_str,
-            top3_str,
-            top3_cat_str,  # New
-            top3_comp_str,  # New
-            fig_bar,
-            fig_pie,
-            table
-        )
\ No newline at end of file
+    # 5. Table Stage (server-side paging / sorting / filtering over the full table)
+    register_table(app, 'ac-table', 'ac-selection', PAGE, lambda selection: run_stage(PAGE, 'table', selection),
+                   columns=TABLE_COLUMNS)
+
+    # 6. Export Links (filtered rows, streamed as CSV / Parquet)
+    register_export_links(app, 'ac', 'ac-selection', PAGE)
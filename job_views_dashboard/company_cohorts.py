@@ -0,0 +1,289 @@
+import numpy as np
+import plotly.graph_objects as go
+from dash import html, dcc, Input, Output, State, no_update
+import dash_bootstrap_components as dbc
+
+from engine.cache import memoize_callback
+from engine.catalog import dimension_options
+from engine.export import export_buttons, register_export_links
+from engine.figures import figure_skeleton, patch_traces, patch_empty
+from engine.prefetch import prefetch_next
+from engine.selection import make_selection
+from engine.stages import run_stage
+from engine.tables import server_table, register_table
+from engine.background import background_callback, report_progress
+from job_views_dashboard.compute.company_cohorts import PAGE, TABLE_COLUMNS
+
+# --- 1. COLOR THEMES ---
+CARD_THEMES = {
+    'black': {'bg': 'linear-gradient(135deg, #212529 0%, #343a40 100%)', 'text': '#ffffff'},
+    'blue': {'bg': 'linear-gradient(135deg, #0d6efd 0%, #0a58ca 100%)', 'text': '#ffffff'},
+    'purple': {'bg': 'linear-gradient(135deg, #6f42c1 0%, #59359a 100%)', 'text': '#ffffff'},
+    'red': {'bg': 'linear-gradient(135deg, #dc3545 0%, #b02a37 100%)', 'text': '#ffffff'},
+    'green': {'bg': 'linear-gradient(135deg, #198754 0%, #146c43 100%)', 'text': '#ffffff'},
+    'orange': {'bg': 'linear-gradient(135deg, #fd7e14 0%, #e35d0b 100%)', 'text': '#ffffff'},
+    'cyan': {'bg': 'linear-gradient(135deg, #0dcaf0 0%, #0aa2c0 100%)', 'text': '#ffffff'},
+}
+
+
+# --- 2. HELPER FUNCTION ---
+def create_solid_card(card_id, title, value, subtext, theme_key):
+    theme = CARD_THEMES.get(theme_key, CARD_THEMES['black'])
+    return html.Div([
+        html.H6(title, className="text-uppercase fw-bold",
+                style={'fontSize': '0.75rem', 'opacity': '0.9', 'marginBottom': '5px'}),
+        html.H2(value, id=f"{card_id}-value", className="fw-bold",
+                style={'margin': '5px 0', 'fontSize': '1.4rem', 'lineHeight': '1.4', 'whiteSpace': 'normal',
+                       'wordWrap': 'break-word'}),
+        html.Small(subtext, id=f"{card_id}-sub", style={'fontSize': '0.75rem', 'opacity': '0.8'})
+    ],
+        id=card_id,
+        style={
+            'background': theme['bg'],
+            'color': theme['text'],
+            'borderRadius': '12px',
+            'padding': '20px',
+            'boxShadow': '0 4px 6px rgba(0,0,0,0.1)',
+            'height': '100%',
+            'display': 'flex',
+            'flexDirection': 'column',
+            'justifyContent': 'center',
+            'border': 'none'
+        },
+        className="kpi-card-hover"
+    )
+
+
+def create_graph_card(title, graph_id, figure, height='400px'):
+    return dbc.Card([
+        dbc.CardHeader(title, className="bg-transparent fw-bold border-0", style={'color': '#343a40'}),
+        dbc.CardBody(dcc.Graph(id=graph_id, figure=figure, style={'height': height},
+                               config={'displayModeBar': False}))
+    ], style={'borderRadius': '12px', 'boxShadow': '0 4px 12px rgba(0,0,0,0.05)', 'border': 'none'}, className="mb-4")
+
+
+def _cells(frame):
+    """
+    DataFrame -> nested lists for a heatmap, with None for the cells not observed yet (NaN is not valid JSON).
+    """
+    return [[None if np.isnan(v) else v for v in row] for row in frame.to_numpy(dtype=float)]
+
+
+# --- 2b. STATIC FIGURES (callbacks only patch in the data arrays) ---
+# Graph ids in callback output order
+GRAPH_IDS = ['coh-graph-heatmap', 'coh-graph-curve', 'coh-graph-sizes']
+
+
+def create_figures():
+    return {
+        # 1. Cohort Triangle (HEATMAP: cohort x months since first posting, % still posting)
+        'coh-graph-heatmap': figure_skeleton(
+            [go.Heatmap(x=[], y=[], z=[], customdata=[], colorscale='Blues', zmin=0, zmax=100,
+                        texttemplate='%{z}', colorbar_title_text='%',
+                        hovertemplate="Cohort=%{y}<br>Months Since First Post=%{x}<br>Still Posting=%{z}%"
+                                      "<br>Companies=%{customdata}<extra></extra>")],
+            title="Share of Each Cohort Still Posting", plot_bgcolor='rgba(0,0,0,0)',
+            xaxis_title='Months Since First Post', yaxis_title='Cohort (First Posting Month)',
+            xaxis_dtick=1, yaxis_autorange='reversed', yaxis_type='category'
+        ),
+        # 2. Average Retention Curve
+        'coh-graph-curve': figure_skeleton(
+            [go.Scatter(x=[], y=[], mode='lines+markers', line_color='#198754', customdata=[],
+                        hovertemplate="Months Since First Post=%{x}<br>Retention Rate=%{y}%"
+                                      "<br>Cohorts=%{customdata}<extra></extra>")],
+            title="Average Retention Curve", plot_bgcolor='rgba(0,0,0,0)',
+            xaxis_title='Months Since First Post', yaxis_title='Retention Rate (%)', xaxis_dtick=1
+        ),
+        # 3. Cohort Sizes
+        'coh-graph-sizes': figure_skeleton(
+            [go.Bar(x=[], y=[], text=[], marker_color='#6f42c1',
+                    hovertemplate="Cohort=%{x}<br>New Companies=%{y}<extra></extra>")],
+            title="New Companies per Cohort", plot_bgcolor='rgba(0,0,0,0)',
+            xaxis_title='Cohort (First Posting Month)', yaxis_title='Companies', xaxis_type='category'
+        ),
+    }
+
+
+# --- 3. LAYOUT ---
+def build_layout():
+    """
+    Page layout, built on first navigation to the page (see root_file/app.py).
+    """
+    figures = create_figures()
+    return dbc.Container([
+        # Normalized filter state shared by the KPI / chart / table stages
+        dcc.Store(id='coh-selection'),
+
+        # Header
+        dbc.Row([
+            dbc.Col(
+                html.H3("Company Cohort Analytics", className="my-4", style={'fontWeight': '800',
+                                                                            'color': '#2c3e50'}),
+                width=True),
+            dbc.Col(export_buttons('coh'), width='auto', className="my-4")
+        ], className="align-items-center"),
+
+        # Filters (cohorts span the whole history, so there is no date filter)
+        dbc.Row([
+            dbc.Col([
+                html.Label("Country", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='coh-country-dropdown', multi=True, placeholder="All Countries")
+            ], width=12, md=6),
+            dbc.Col([
+                html.Label("Job Category", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='coh-category-dropdown', multi=True, placeholder="All Categories")
+            ], width=12, md=6),
+        ], className="p-4 mb-4 bg-white shadow-sm", style={'borderRadius': '15px', 'borderLeft': '5px solid #6f42c1'}),
+
+        # Progress (only visible while a background job is running)
+        html.Div(dbc.Progress(id='coh-progress', value=0, striped=True, animated=True, style={'height': '18px'}),
+                 id='coh-progress-wrapper', style={'display': 'none'}, className="mb-4"),
+
+        # --- KPI CARDS ---
+
+        # Row 1: Cohorts
+        dbc.Row([
+            dbc.Col(create_solid_card("coh-total", "Cohorts", "0", "0 Companies", "black"), width=12, sm=6,
+                    lg=3, className="mb-4"),
+            dbc.Col(create_solid_card("coh-largest", "Largest Cohort", "-", "0 New Companies", "purple"), width=12,
+                    sm=6, lg=3, className="mb-4"),
+            dbc.Col(create_solid_card("coh-month1", "Month 1 Retention", "0%", "Month 3: 0%", "green"), width=12,
+                    sm=6, lg=3, className="mb-4"),
+            dbc.Col(create_solid_card("coh-best", "Best Cohort", "-", "0% Month 1 Retention", "blue"), width=12,
+                    sm=6, lg=3, className="mb-4"),
+        ]),
+
+        # --- GRAPHS ---
+
+        # 1. Cohort Triangle
+        dbc.Row([
+            dbc.Col(create_graph_card("1. Cohort Retention Triangle", "coh-graph-heatmap",
+                                      figures['coh-graph-heatmap'], height='550px'), width=12)
+        ]),
+
+        # 2. Retention Curve + 3. Cohort Sizes
+        dbc.Row([
+            dbc.Col(create_graph_card("2. Average Retention Curve", "coh-graph-curve", figures['coh-graph-curve']),
+                    width=12, lg=6),
+            dbc.Col(create_graph_card("3. Cohort Sizes", "coh-graph-sizes", figures['coh-graph-sizes']),
+                    width=12, lg=6),
+        ]),
+
+        # --- TABLE ---
+        dbc.Row([
+            dbc.Col([
+                html.H5("Cohort Retention Table (% Still Posting)", className="mb-3 text-muted fw-bold"),
+                html.Div(server_table('coh-table', TABLE_COLUMNS), id='coh-table-container',
+                         style={'background': 'white', 'padding': '20px', 'borderRadius': '12px',
+                                'boxShadow': '0 4px 12px rgba(0,0,0,0.05)'})
+            ], width=12)
+        ], className="mb-5")
+
+    ], fluid=True)
+
+
+# --- 4. CALLBACKS ---
+def register_callbacks(app):
+    # --- 1. Populate Dropdowns ---
+    @app.callback(
+        [Output('coh-country-dropdown', 'options'),
+         Output('coh-category-dropdown', 'options')],
+        Input('global-data-store', 'data')
+    )
+    def update_filters(data):
+        if not data: return [], []
+        return dimension_options('Country'), dimension_options('Job_Category')
+
+    # --- 2. Filtered Selection (shared by the KPI / chart / table stages) ---
+    @app.callback(
+        Output('coh-selection', 'data'),
+        [
+            Input('global-data-store', 'data'),
+            Input('coh-country-dropdown', 'value'),
+            Input('coh-category-dropdown', 'value')
+        ],
+        State('coh-selection', 'data')
+    )
+    def update_selection(data, selected_countries, selected_cats, current):
+        selection = make_selection(data, countries=selected_countries, categories=selected_cats)
+        return no_update if selection == current else selection
+
+    # --- 3. KPI Stage (values only - card titles and styling stay static) ---
+    @app.callback(
+        [
+            Output('coh-total-value', 'children'), Output('coh-total-sub', 'children'),
+            Output('coh-largest-value', 'children'), Output('coh-largest-sub', 'children'),
+            Output('coh-month1-value', 'children'), Output('coh-month1-sub', 'children'),
+            Output('coh-best-value', 'children'), Output('coh-best-sub', 'children')
+        ],
+        Input('coh-selection', 'data')
+    )
+    @prefetch_next(PAGE)
+    def update_kpis(selection):
+        stats = run_stage(PAGE, 'kpis', selection) if selection else None
+        if stats is None:
+            return "0", "0 Companies", "-", "0 New Companies", "0%", "Month 3: 0%", "-", "0% Month 1 Retention"
+
+        largest, largest_size = stats['largest']
+        best, best_rate = stats['best']
+        return (
+            f"{stats['cohorts']}", f"{stats['companies']:,} Companies",
+            f"{largest}", f"{largest_size:,} New Companies",
+            f"{stats['month1']}%", f"Month 3: {stats['month3']}%",
+            f"{best}", f"{best_rate}% Month 1 Retention"
+        )
+
+    # --- 4. Chart Stage (background job when enabled; data arrays only, see create_figures) ---
+    @background_callback(
+        app,
+        [Output(graph_id, 'figure') for graph_id in GRAPH_IDS],
+        Input('coh-selection', 'data'),
+        progress=[Output('coh-progress', 'value'), Output('coh-progress', 'label')],
+        running=[(Output('coh-progress-wrapper', 'style'), {'display': 'block'}, {'display': 'none'})]
+    )
+    @memoize_callback(PAGE, 'charts')
+    def update_charts(selection):
+        report_progress(10, "Building cohorts")
+        counts = run_stage(PAGE, 'matrix', selection) if selection else None
+        if counts is None:
+            return (
+                patch_empty(1, keys=('x', 'y', 'z', 'customdata')),
+                patch_empty(1, keys=('x', 'y', 'customdata')),
+                patch_empty(1, keys=('x', 'y', 'text'))
+            )
+
+        # 1. Cohort Triangle
+        report_progress(40, "Computing retention")
+        shares = run_stage(PAGE, 'rates', selection)
+        months = [col for col in counts.columns if col not in ('Cohort', 'Companies')]
+        fig_heatmap = patch_traces([{
+            'x': months,
+            'y': counts['Cohort'],
+            'z': _cells(shares[months]),
+            'customdata': _cells(counts[months])
+        }], title="Share of Each Cohort Still Posting")
+
+        # 2. Average Retention Curve
+        report_progress(70, "Building charts")
+        retention = run_stage(PAGE, 'curve', selection)
+        fig_curve = patch_traces([{
+            'x': retention['Months Since First Post'],
+            'y': retention['Retention Rate'],
+            'customdata': retention['Cohorts']
+        }], title="Average Retention Curve")
+
+        # 3. Cohort Sizes
+        fig_sizes = patch_traces([{
+            'x': counts['Cohort'],
+            'y': counts['Companies'],
+            'text': counts['Companies']
+        }], title="New Companies per Cohort")
+
+        return fig_heatmap, fig_curve, fig_sizes
+
+    # --- 5. Table Stage (server-side paging / sorting / filtering over the full table) ---
+    register_table(app, 'coh-table', 'coh-selection', PAGE, lambda selection: run_stage(PAGE, 'table', selection),
+                   columns=TABLE_COLUMNS)
+
+    # --- 6. Export Links (filtered rows, streamed as CSV / Parquet) ---
+    register_export_links(app, 'coh', 'coh-selection', PAGE)
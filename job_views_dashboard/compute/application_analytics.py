@@ -0,0 +1,83 @@
+import pandas as pd
+
+from engine.indexes import IndexedRows
+from engine.memory import per_group
+from engine.selection import select_rows
+from engine.stages import stage, run_stage
+
+# --- Application Analytics: compute stages (pure pandas, no Dash) ---
+PAGE = 'application_analytics'
+
+# Selection keys set by the page's filter bar
+FILTERS = ['start_date', 'end_date', 'months', 'Job_Category', 'Company']
+
+TABLE_COLUMNS = ['Job_Title', 'Company', 'Job_Category', 'Created_At', 'Total_Views', 'Total_Applications']
+
+
+@stage(PAGE, 'daily_totals', scale=True)
+def daily_totals(selection):
+    """
+    Applications per job-creation day.
+    """
+    df = select_rows(selection)
+    if df is None or df.empty or 'Created_At' not in df.columns:
+        return pd.Series()
+    return df.groupby(df['Created_At'].dt.date)['Total_Applications'].sum()
+
+
+@stage(PAGE, 'monthly_totals', scale=True)
+def monthly_totals(selection):
+    """
+    Applications per month (Period index named 'Month_Year').
+    """
+    df = select_rows(selection)
+    if df is None or df.empty or 'Created_At' not in df.columns:
+        return pd.Series()
+    return df.groupby(df['Created_At'].dt.to_period('M').rename('Month_Year'))['Total_Applications'].sum()
+
+
+def _monthly_average(stats):
+    # Applications per month of a sampled run, from the scaled total
+    return {**stats, 'avg_apps_month': per_group(stats['total_apps'], stats['active_months'])}
+
+
+@stage(PAGE, 'kpis', scale=['total_apps', 'high_day', 'low_day', 'top3_categories', 'top3_companies'],
+       derive=_monthly_average)
+def kpis(selection):
+    df = select_rows(selection)
+    if df is None or df.empty:
+        return None
+
+    daily = run_stage(PAGE, 'daily_totals', selection)
+    monthly = run_stage(PAGE, 'monthly_totals', selection)
+
+    total_apps = df['Total_Applications'].sum()
+    tot_views = df['Total_Views'].sum()
+
+    stats = {
+        'total_apps': total_apps,
+        'avg_apps_per_job': round(df['Total_Applications'].mean(), 1),
+        'median_apps_per_job': round(df['Total_Applications'].median(), 1),
+        'high_day': (daily.idxmax(), daily.max()) if not daily.empty else None,
+        'low_day': (daily.idxmin(), daily.min()) if not daily.empty else None,
+        'avg_apps_month': round(monthly.mean(), 1) if 'Created_At' in df.columns else 0,
+        'active_months': len(monthly),
+        'top3_categories': None,
+        'top3_companies': None,
+        'conversion_rate': (total_apps / tot_views * 100) if tot_views > 0 else 0,
+    }
+
+    if 'Job_Category' in df.columns:
+        stats['top3_categories'] = list(df.groupby('Job_Category')['Total_Applications'].sum().nlargest(3).items())
+    if 'Company' in df.columns:
+        stats['top3_companies'] = list(df.groupby('Company')['Total_Applications'].sum().nlargest(3).items())
+
+    return stats
+
+
+def table(selection):
+    """
+    Matching jobs for the detail table, most applications first (walked out of the permutation index, see engine/indexes.py).
+    """
+    rows = IndexedRows(selection, 'Total_Applications', ascending=False)
+    return rows if rows.count() else None
@@ -0,0 +1,82 @@
+from engine.memory import per_group
+from engine.selection import select_rows
+from engine.stages import stage, run_stage
+
+# --- Application Country Analytics: compute stages (pure pandas, no Dash) ---
+PAGE = 'application_country'
+
+# Selection keys set by the page's filter bar
+FILTERS = ['start_date', 'end_date', 'months', 'Country', 'Job_Category']
+
+TABLE_COLUMNS = ['Country', 'Total Jobs', 'Total Views', 'Total Applications', 'Conversion (%)']
+
+
+@stage(PAGE, 'country_stats', scale=True)
+def country_stats(selection):
+    """
+    Applications per country.
+    """
+    df = select_rows(selection)
+    if df is None or df.empty or 'Country' not in df.columns:
+        return None
+    stats = df.groupby('Country')['Total_Applications'].sum()
+    return stats if not stats.empty else None
+
+
+def _country_average(stats):
+    # Applications per country of a sampled run, from the scaled total (the country count stays an estimate)
+    return {**stats, 'avg_apps_country': per_group(stats['total_apps'], stats['active_countries'])}
+
+
+@stage(PAGE, 'kpis', scale=['total_apps', 'top_country', 'low_country', 'top3', 'top3_categories', 'top3_companies'],
+       derive=_country_average, estimates=['active_countries', 'avg_apps_country'])
+def kpis(selection):
+    stats = run_stage(PAGE, 'country_stats', selection)
+    if stats is None:
+        return None
+
+    df = select_rows(selection)
+    total_apps = df['Total_Applications'].sum()
+    top_val = stats.max()
+
+    result = {
+        'total_apps': total_apps,
+        'avg_apps_country': round(stats.mean(), 1),
+        'active_countries': len(stats),
+        'top_country': (stats.idxmax(), top_val),
+        'low_country': (stats.idxmin(), stats.min()),
+        'share_pct': (top_val / total_apps * 100) if total_apps > 0 else 0,
+        'top3': list(stats.nlargest(3).items()),
+        'top3_categories': None,
+        'top3_companies': None,
+    }
+
+    if 'Job_Category' in df.columns:
+        result['top3_categories'] = list(df.groupby('Job_Category')['Total_Applications'].sum().nlargest(3).items())
+    if 'Company' in df.columns:
+        result['top3_companies'] = list(df.groupby('Company')['Total_Applications'].sum().nlargest(3).items())
+
+    # Conversion Rate
+    tot_views = df['Total_Views'].sum()
+    result['conversion_rate'] = (total_apps / tot_views * 100) if tot_views > 0 else 0
+    return result
+
+
+@stage(PAGE, 'table', scale=['Total Jobs', 'Total Views', 'Total Applications'])
+def table(selection):
+    """
+    Jobs / Views / Applications / Conversion per country.
+    """
+    if run_stage(PAGE, 'country_stats', selection) is None:
+        return None
+    df = select_rows(selection)
+
+    table_df = df.groupby('Country').agg({
+        'Job_Title': 'count',
+        'Total_Views': 'sum',
+        'Total_Applications': 'sum'
+    }).reset_index()
+
+    table_df.columns = ['Country', 'Total Jobs', 'Total Views', 'Total Applications']
+    table_df['Conversion (%)'] = (table_df['Total Applications'] / table_df['Total Views'] * 100).fillna(0).round(2)
+    return table_df.sort_values('Total Applications', ascending=False)
@@ -0,0 +1,150 @@
+import pandas as pd
+
+from engine.memory import per_group
+from engine.selection import select_rows
+from engine.stages import stage, run_stage
+
+# --- Company & Traffic Analytics: compute stages (pure pandas, no Dash) ---
+PAGE = 'company_analytics'
+
+# Selection keys set by the page's filter bar
+FILTERS = ['start_date', 'end_date', 'Country', 'Company', 'Traffic_Source']
+
+JOB_RANGE_BINS = [0, 1, 5, 10, 15, 20, 25, 10000]
+JOB_RANGE_LABELS = ['1', '2-5', '6-10', '11-15', '16-20', '21-25', '25+']
+
+TABLE_COLUMNS = ['Company', 'Job_Count', 'Total_Applications', 'Avg Apps/Job', 'Total_Views', 'Avg Views/Job',
+                 'Traffic_Source']
+
+
+def _rows(selection):
+    df = select_rows(selection)
+    if df is None or df.empty or 'Company' not in df.columns:
+        return None
+    return df
+
+
+@stage(PAGE, 'company_stats', offload=True, scale=True)
+def company_stats(selection):
+    """
+    Jobs / Applications / Views per company.
+    """
+    df = _rows(selection)
+    if df is None:
+        return None
+    return df.groupby('Company').agg({
+        'Job_Title': 'count',
+        'Total_Applications': 'sum',
+        'Total_Views': 'sum'
+    }).rename(columns={'Job_Title': 'Job_Count'})
+
+
+@stage(PAGE, 'traffic_stats', scale=True)
+def traffic_stats(selection):
+    """
+    Jobs / Applications / Views per traffic source.
+    """
+    df = _rows(selection)
+    if df is None:
+        return None
+    return df.groupby('Traffic_Source').agg({
+        'Job_Title': 'count',
+        'Total_Applications': 'sum',
+        'Total_Views': 'sum'
+    }).rename(columns={'Job_Title': 'Job_Count'})
+
+
+def _company_averages(stats):
+    # Per-company means of a sampled run, from the scaled totals (the company count stays a sample estimate)
+    companies = stats['total_companies']
+    return {**stats, 'avg_jobs': per_group(stats['total_jobs'], companies),
+            'avg_apps': per_group(stats['total_apps'], companies),
+            'avg_views': per_group(stats['total_views'], companies)}
+
+
+@stage(PAGE, 'kpis', scale=['total_jobs', 'top3_jobs', 'total_apps', 'top3_apps', 'total_views', 'top3_views',
+                          'top_source', 'top3_sources'],
+       derive=_company_averages, estimates=['total_companies', 'avg_jobs', 'avg_apps', 'avg_views', 'total_sources'])
+def kpis(selection):
+    comp_stats = run_stage(PAGE, 'company_stats', selection)
+    if comp_stats is None:
+        return None
+    traffic = run_stage(PAGE, 'traffic_stats', selection)
+    df = select_rows(selection)
+
+    return {
+        # Row 1: Company Supply
+        'total_companies': len(comp_stats),
+        'total_jobs': comp_stats['Job_Count'].sum(),
+        'avg_jobs': round(comp_stats['Job_Count'].mean(), 1),
+        'top3_jobs': list(comp_stats['Job_Count'].nlargest(3).items()),
+        # Row 2: Applications
+        'total_apps': df['Total_Applications'].sum(),
+        'avg_apps': round(comp_stats['Total_Applications'].mean(), 1),
+        'top3_apps': list(comp_stats['Total_Applications'].nlargest(3).items()),
+        # Row 3: Views
+        'total_views': df['Total_Views'].sum(),
+        'avg_views': round(comp_stats['Total_Views'].mean(), 1),
+        'top3_views': list(comp_stats['Total_Views'].nlargest(3).items()),
+        # Row 4: Traffic
+        'total_sources': len(traffic),
+        'top_source': (traffic['Job_Count'].idxmax(), traffic['Job_Count'].max()) if not traffic.empty else ("-", 0),
+        'top3_sources': list(traffic['Job_Count'].nlargest(3).items()),
+    }
+
+
+@stage(PAGE, 'traffic_by_company', offload=True, scale=['Count'])
+def traffic_by_company(selection):
+    """
+    Job count per (Company, Traffic_Source) for the top 20 companies by volume.
+    """
+    comp_stats = run_stage(PAGE, 'company_stats', selection)
+    if comp_stats is None:
+        return None
+    df = select_rows(selection)
+
+    top20_comps = comp_stats.nlargest(20, 'Job_Count').index
+    df_top20 = df[df['Company'].isin(top20_comps)]
+    return df_top20.groupby(['Company', 'Traffic_Source']).size().reset_index(name='Count')
+
+
+@stage(PAGE, 'job_ranges', estimates=True)
+def job_ranges(selection):
+    """
+    Number of companies per posting-volume bucket (1, 2-5, ..., 25+).
+    """
+    comp_stats = run_stage(PAGE, 'company_stats', selection)
+    if comp_stats is None:
+        return None
+
+    job_range = pd.cut(comp_stats['Job_Count'], bins=JOB_RANGE_BINS, labels=JOB_RANGE_LABELS, right=True)
+    range_counts = job_range.value_counts().reindex(JOB_RANGE_LABELS).reset_index()
+    range_counts.columns = ['Job Range', 'Company Count']
+    return range_counts
+
+
+@stage(PAGE, 'table', offload=True, scale=['Job_Count', 'Total_Applications', 'Total_Views'])
+def table(selection):
+    """
+    Company performance matrix (most jobs first) with each company's most used traffic source.
+    """
+    comp_stats = run_stage(PAGE, 'company_stats', selection)
+    if comp_stats is None:
+        return None
+    df = select_rows(selection)
+
+    table_df = comp_stats.reset_index().sort_values('Job_Count', ascending=False)
+    table_df['Avg Apps/Job'] = (table_df['Total_Applications'] / table_df['Job_Count']).round(1)
+    table_df['Avg Views/Job'] = (table_df['Total_Views'] / table_df['Job_Count']).round(1)
+
+    # Most frequent source per company (ties -> alphabetically first, like Series.mode()[0])
+    source_counts = df.groupby(['Company', 'Traffic_Source']).size()
+    top_pairs = source_counts.groupby(level='Company').idxmax()
+    top_traffic_per_comp = pd.DataFrame({
+        'Company': top_pairs.index,
+        'Traffic_Source': [pair[1] for pair in top_pairs]
+    })
+
+    table_df = pd.merge(table_df, top_traffic_per_comp, on='Company', how='left')
+    table_df['Traffic_Source'] = table_df['Traffic_Source'].fillna("-")
+    return table_df
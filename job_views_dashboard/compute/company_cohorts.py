@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from engine.cohorts import cohort_matrix
+from engine.stages import stage, run_stage
+
+# --- Company Cohorts: compute stages (pure pandas, no Dash) ---
+# Cohort = month of a company's first posting; the triangle comes from the activity bitsets (engine/cohorts.py).
+PAGE = 'company_cohorts'
+
+# Selection keys set by the page's filter bar (no dates: a date filter would move every company's first month)
+FILTERS = ['Country', 'Job_Category']
+
+# Months since the first posting shown as table columns
+TABLE_MONTHS = [1, 2, 3, 6, 12]
+
+TABLE_COLUMNS = ['Cohort', 'Companies'] + [f"Month {k}" for k in TABLE_MONTHS]
+
+
+@stage(PAGE, 'matrix', estimates=True)
+def matrix(selection):
+    """
+    Companies per cohort and the number of them active 0, 1, 2... months after their first posting.
+    """
+    return cohort_matrix(selection)
+
+
+def _months(frame):
+    return [col for col in frame.columns if isinstance(col, (int, np.integer))]
+
+
+@stage(PAGE, 'rates', estimates=True)
+def rates(selection):
+    """
+    Same triangle as a share of each cohort (%, NaN = not observed yet).
+    """
+    counts = run_stage(PAGE, 'matrix', selection)
+    if counts is None:
+        return None
+
+    result = counts.copy()
+    months = _months(counts)
+    result[months] = (counts[months].div(counts['Companies'], axis=0) * 100).round(1)
+    return result
+
+
+@stage(PAGE, 'curve', estimates=True)
+def curve(selection):
+    """
+    Average retention k months after the first posting, weighted by cohort size over the cohorts observed
+    that long.
+    """
+    counts = run_stage(PAGE, 'matrix', selection)
+    if counts is None:
+        return None
+
+    months = _months(counts)
+    active = counts[months]
+    observed = active.notna().to_numpy()
+    sizes = np.where(observed, counts['Companies'].to_numpy()[:, None], 0).sum(axis=0)
+    totals = active.fillna(0).to_numpy().sum(axis=0)
+    return pd.DataFrame({
+        'Months Since First Post': months,
+        'Cohorts': observed.sum(axis=0),
+        'Retention Rate': np.round(np.divide(totals * 100, sizes, out=np.zeros(len(months)), where=sizes > 0), 1),
+    })
+
+
+@stage(PAGE, 'kpis', estimates=True)
+def kpis(selection):
+    counts = run_stage(PAGE, 'matrix', selection)
+    if counts is None:
+        return None
+    shares = run_stage(PAGE, 'rates', selection)
+    retention = run_stage(PAGE, 'curve', selection).set_index('Months Since First Post')['Retention Rate']
+
+    # Best cohort: highest month-1 retention among the cohorts observed for a month
+    month_one = shares[1].dropna() if 1 in shares.columns else pd.Series(dtype=float)
+    best = shares.loc[month_one.idxmax()] if not month_one.empty else None
+    return {
+        'cohorts': len(counts),
+        'companies': int(counts['Companies'].sum()),
+        'largest': (counts.loc[counts['Companies'].idxmax(), 'Cohort'], int(counts['Companies'].max())),
+        'month1': retention.get(1, 0.0),
+        'month3': retention.get(3, 0.0),
+        'best': (best['Cohort'], best[1]) if best is not None else ("-", 0.0),
+    }
+
+
+@stage(PAGE, 'table', estimates=True)
+def table(selection):
+    """
+    Cohort retention table: companies per cohort and the % still posting 1, 2, 3, 6 and 12 months later.
+    """
+    shares = run_stage(PAGE, 'rates', selection)
+    if shares is None:
+        return None
+
+    table_df = shares[['Cohort', 'Companies']].copy()
+    for k in TABLE_MONTHS:
+        table_df[f"Month {k}"] = shares[k] if k in shares.columns else np.nan
+    return table_df
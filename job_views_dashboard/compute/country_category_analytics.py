@@ -0,0 +1,147 @@
+import pandas as pd
+
+from engine.memory import per_group
+from engine.selection import select_rows
+from engine.stages import stage, run_stage
+
+# --- Country vs. Category: compute stages (pure pandas, no Dash) ---
+PAGE = 'country_category_analytics'
+
+# Selection keys set by the page's filter bar
+FILTERS = ['start_date', 'end_date', 'months', 'Country', 'Job_Category']
+
+TOP_CAT_COLUMNS = ['Top 1 Cat', 'Top 2 Cat', 'Top 3 Cat']
+
+TABLE_COLUMNS = ['Country'] + TOP_CAT_COLUMNS + ['Total Jobs', 'Avg Jobs', 'Total Apps', 'Avg Apps', 'Total Views',
+                                                 'Avg Views']
+
+
+def _rows(selection):
+    df = select_rows(selection)
+    if df is None or df.empty or 'Country' not in df.columns or 'Job_Category' not in df.columns:
+        return None
+    return df
+
+
+def _group_stats(df, col):
+    return df.groupby(col).agg({
+        'Job_Title': 'count',
+        'Total_Applications': 'sum',
+        'Total_Views': 'sum'
+    }).rename(columns={'Job_Title': 'Job_Count'})
+
+
+@stage(PAGE, 'category_stats', offload=True, scale=True)
+def category_stats(selection):
+    """
+    Global stats per category.
+    """
+    df = _rows(selection)
+    return _group_stats(df, 'Job_Category') if df is not None else None
+
+
+@stage(PAGE, 'country_stats', offload=True, scale=True)
+def country_stats(selection):
+    """
+    Global stats per country.
+    """
+    df = _rows(selection)
+    return _group_stats(df, 'Country') if df is not None else None
+
+
+def _category_averages(stats):
+    # Jobs per category of a sampled run, from the scaled total (the category count stays a sample estimate)
+    return {**stats, 'avg_jobs': per_group(stats['total_jobs'], stats['total_cats'])}
+
+
+@stage(PAGE, 'kpis', scale=['top_country', 'total_jobs', 'top3_jobs', 'total_apps', 'top3_apps', 'total_views',
+                          'top3_views'],
+       derive=_category_averages, estimates=['total_cats', 'avg_jobs'])
+def kpis(selection):
+    cat_stats = run_stage(PAGE, 'category_stats', selection)
+    if cat_stats is None:
+        return None
+    country_stats = run_stage(PAGE, 'country_stats', selection)
+
+    total_jobs = cat_stats['Job_Count'].sum()
+    total_apps = cat_stats['Total_Applications'].sum()
+    total_views = cat_stats['Total_Views'].sum()
+
+    return {
+        # Row 1
+        'total_cats': len(cat_stats),
+        'top3_global': cat_stats['Job_Count'].nlargest(3).index.tolist(),
+        'top_country': (country_stats['Job_Count'].idxmax(), country_stats['Job_Count'].max())
+        if not country_stats.empty else ("-", 0),
+        # Row 2 (Jobs)
+        'total_jobs': total_jobs,
+        'avg_jobs': round(cat_stats['Job_Count'].mean(), 1),  # Avg Jobs per Category
+        'top3_jobs': list(cat_stats['Job_Count'].nlargest(3).items()),
+        # Row 3 (Apps)
+        'total_apps': total_apps,
+        'avg_apps': round(total_apps / total_jobs, 1) if total_jobs > 0 else 0,  # Avg Apps per Job
+        'top3_apps': list(cat_stats['Total_Applications'].nlargest(3).items()),
+        # Row 4 (Views)
+        'total_views': total_views,
+        'avg_views': round(total_views / total_jobs, 1) if total_jobs > 0 else 0,  # Avg Views per Job
+        'top3_views': list(cat_stats['Total_Views'].nlargest(3).items()),
+    }
+
+
+@stage(PAGE, 'sunburst', offload=True, scale=['Jobs'])
+def sunburst(selection):
+    """
+    Jobs per (Country, Category) for the 15 biggest countries.
+    """
+    df = _rows(selection)
+    if df is None:
+        return None
+    sunburst_df = df.groupby(['Country', 'Job_Category']).size().reset_index(name='Jobs')
+    top_countries = sunburst_df.groupby('Country')['Jobs'].sum().nlargest(15).index
+    return sunburst_df[sunburst_df['Country'].isin(top_countries)]
+
+
+def _table_averages(table_df):
+    table_df['Avg Jobs'] = (table_df['Total Jobs'] / table_df['Cat Count']).round(1)
+    return table_df
+
+
+@stage(PAGE, 'table', offload=True, scale=['Total Jobs', 'Total Apps', 'Total Views'], derive=_table_averages,
+       estimates=['Cat Count', 'Avg Jobs'])
+def table(selection):
+    """
+    Country performance matrix with each country's top 3 categories (most jobs first).
+    """
+    df = _rows(selection)
+    if df is None:
+        return None
+
+    # 1. Base Aggregation by Country
+    table_base = df.groupby('Country').agg({
+        'Job_Title': 'count',
+        'Total_Applications': 'sum',
+        'Total_Views': 'sum',
+        'Job_Category': 'nunique'  # Count unique categories
+    }).reset_index()
+    table_base.columns = ['Country', 'Total Jobs', 'Total Apps', 'Total Views', 'Cat Count']
+
+    # 2. Calculate Averages
+    table_base['Avg Jobs'] = (table_base['Total Jobs'] / table_base['Cat Count']).round(1)  # Jobs per Category
+    table_base['Avg Apps'] = (table_base['Total Apps'] / table_base['Total Jobs']).round(1)  # Apps per Job
+    table_base['Avg Views'] = (table_base['Total Views'] / table_base['Total Jobs']).round(1)  # Views per Job
+
+    # 3. Top 3 Categories per Country (rank inside each country instead of a per-group apply)
+    cc_counts = df.groupby(['Country', 'Job_Category']).size().reset_index(name='Count')
+    cc_counts = cc_counts.sort_values(['Country', 'Count'], ascending=[True, False])
+    cc_counts['Rank'] = cc_counts.groupby('Country').cumcount()
+    cc_counts = cc_counts[cc_counts['Rank'] < 3]
+
+    top_cats_df = cc_counts.pivot(index='Country', columns='Rank', values='Job_Category')
+    top_cats_df = top_cats_df.reindex(columns=range(3)).fillna("-")
+    top_cats_df.columns = TOP_CAT_COLUMNS
+    top_cats_df = top_cats_df.reset_index()
+
+    # 4. Merge
+    final_table = pd.merge(table_base, top_cats_df, on='Country', how='left')
+    final_table = final_table.sort_values('Total Jobs', ascending=False)
+    return final_table
@@ -0,0 +1,67 @@
+from engine.memory import per_group
+from engine.selection import select_rows
+from engine.stages import stage, run_stage
+
+# --- Country Jobs Posted: compute stages (pure pandas, no Dash) ---
+PAGE = 'country_jobs_posted'
+
+# Selection keys set by the page's filter bar
+FILTERS = ['start_date', 'end_date', 'months', 'Country', 'Job_Category']
+
+TABLE_COLUMNS = ['Country', 'Jobs Posted', 'Total Views', 'Total Applications']
+
+
+@stage(PAGE, 'country_counts', scale=True)
+def country_counts(selection):
+    """
+    Jobs per country, largest first.
+    """
+    df = select_rows(selection)
+    if df is None or df.empty or 'Country' not in df.columns:
+        return None
+    counts = df['Country'].value_counts()
+    return counts if not counts.empty else None
+
+
+def _country_average(stats):
+    # Jobs per country of a sampled run, from the scaled total (the country count stays an estimate)
+    return {**stats, 'avg_per_country': per_group(stats['total_jobs'], stats['active_countries'])}
+
+
+@stage(PAGE, 'kpis', scale=['total_jobs', 'max_country', 'min_country', 'top3'], derive=_country_average,
+       estimates=['active_countries', 'avg_per_country'])
+def kpis(selection):
+    counts = run_stage(PAGE, 'country_counts', selection)
+    if counts is None:
+        return None
+
+    total_jobs = len(select_rows(selection))
+    max_val = counts.max()
+
+    return {
+        'total_jobs': total_jobs,
+        'avg_per_country': round(counts.mean(), 1),
+        'active_countries': len(counts),
+        'max_country': (counts.idxmax(), max_val),
+        'min_country': (counts.idxmin(), counts.min()),
+        'share_pct': (max_val / total_jobs * 100),
+        'top3': list(counts.head(3).items()),
+    }
+
+
+@stage(PAGE, 'table', scale=['Jobs Posted', 'Total Views', 'Total Applications'])
+def table(selection):
+    """
+    Jobs / Views / Applications per country (most jobs first).
+    """
+    df = select_rows(selection)
+    if run_stage(PAGE, 'country_counts', selection) is None:
+        return None
+
+    table_df = df.groupby('Country').agg({
+        'Job_Title': 'count',
+        'Total_Views': 'sum',
+        'Total_Applications': 'sum'
+    }).reset_index()
+    table_df.columns = ['Country', 'Jobs Posted', 'Total Views', 'Total Applications']
+    return table_df.sort_values('Jobs Posted', ascending=False)
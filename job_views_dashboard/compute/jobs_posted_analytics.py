@@ -0,0 +1,76 @@
+from engine.indexes import IndexedRows
+from engine.memory import per_group
+from engine.selection import select_rows
+from engine.stages import stage, run_stage
+
+# --- Jobs Posted Analytics: compute stages (pure pandas, no Dash) ---
+PAGE = 'jobs_posted_analytics'
+
+# Selection keys set by the page's filter bar
+FILTERS = ['start_date', 'end_date', 'months', 'Job_Category', 'Company']
+
+TABLE_COLUMNS = ['Job_Title', 'Company', 'Job_Category', 'Created_At', 'Total_Views', 'Total_Applications']
+
+
+@stage(PAGE, 'daily_counts', scale=True)
+def daily_counts(selection):
+    """
+    Jobs posted per calendar day.
+    """
+    df = select_rows(selection)
+    if df is None or df.empty:
+        return None
+    return df.groupby(df['Created_At'].dt.date).size()
+
+
+@stage(PAGE, 'monthly_counts', scale=True)
+def monthly_counts(selection):
+    """
+    Jobs posted per month (Period index named 'Month_Year').
+    """
+    df = select_rows(selection)
+    if df is None or df.empty:
+        return None
+    return df.groupby(df['Created_At'].dt.to_period('M').rename('Month_Year')).size()
+
+
+def _period_averages(stats):
+    # Jobs per day / month of a sampled run, from the scaled total
+    return {**stats, 'avg_day': per_group(stats['total_jobs'], stats['active_days']),
+            'avg_month': per_group(stats['total_jobs'], stats['active_months'])}
+
+
+@stage(PAGE, 'kpis', scale=['total_jobs', 'median_day', 'high_day', 'low_day', 'top3_days', 'top3_months'],
+       derive=_period_averages)
+def kpis(selection):
+    df = select_rows(selection)
+    if df is None or df.empty:
+        return None
+
+    daily = run_stage(PAGE, 'daily_counts', selection)
+    monthly = run_stage(PAGE, 'monthly_counts', selection)
+
+    tot_apps = df['Total_Applications'].sum()
+    tot_views = df['Total_Views'].sum()
+
+    return {
+        'total_jobs': len(df),
+        'avg_day': round(daily.mean(), 1),
+        'active_days': len(daily),
+        'median_day': round(daily.median(), 1),
+        'high_day': (daily.idxmax(), daily.max()),
+        'low_day': (daily.idxmin(), daily.min()),
+        'top3_days': list(daily.nlargest(3).items()),
+        'avg_month': round(monthly.mean(), 1),
+        'active_months': len(monthly),
+        'top3_months': list(monthly.nlargest(3).items()),
+        'conversion_rate': (tot_apps / tot_views * 100) if tot_views > 0 else 0,
+    }
+
+
+def table(selection):
+    """
+    Matching jobs for the detail table, newest first (walked out of the permutation index, see engine/indexes.py).
+    """
+    rows = IndexedRows(selection, 'Created_At', ascending=False)
+    return rows if rows.count() else None
@@ -0,0 +1,46 @@
+from engine.selection import select_rows
+from engine.stages import stage
+
+# --- Job Overview: compute stages (pure pandas, no Dash) ---
+PAGE = 'overview_analytics'
+
+# Selection keys set by the page's filter bar
+FILTERS = ['start_date', 'end_date', 'Job_Category', 'Company']
+
+
+@stage(PAGE, 'kpis', scale=['total_jobs', 'total_apps', 'total_views'])
+def kpis(selection):
+    df = select_rows(selection)
+    if df is None or df.empty:
+        return None
+
+    total_jobs = len(df)
+    total_apps = int(df['Total_Applications'].sum())
+    total_views = int(df['Total_Views'].sum())
+
+    return {
+        'total_jobs': total_jobs,
+        'total_apps': total_apps,
+        'total_views': total_views,
+        'avg_views': round(total_views / total_jobs, 1) if total_jobs > 0 else 0,
+        'avg_apps': round(total_apps / total_jobs, 1) if total_jobs > 0 else 0,
+        'conversion_rate': (total_apps / total_views * 100) if total_views > 0 else 0,
+    }
+
+
+@stage(PAGE, 'daily_trend', scale=['Jobs_Count', 'Total_Applications', 'Total_Views'])
+def daily_trend(selection):
+    """
+    Jobs / Applications / Views per day (one row per date).
+    """
+    df = select_rows(selection)
+    if df is None or df.empty or 'Created_At' not in df.columns:
+        return None
+
+    time_df = df.groupby(df['Created_At'].dt.date).agg({
+        'Created_At': 'count',
+        'Total_Applications': 'sum',
+        'Total_Views': 'sum'
+    }).rename(columns={'Created_At': 'Jobs_Count'}).reset_index()
+    time_df.rename(columns={'Created_At': 'Date'}, inplace=True)
+    return time_df
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+from engine.activity import company_activity, active_months, month_matrix, first_active_month, month_labels
+from engine.stages import stage, run_stage
+
+# --- Retention & Loyalty: compute stages (pure pandas, no Dash) ---
+# Per-company activity comes from the activity index (engine/activity.py), not from a groupby over the rows.
+PAGE = 'retention_analytics'
+
+# Selection keys set by the page's filter bar
+FILTERS = ['start_date', 'end_date', 'Country', 'Job_Category']
+
+# A partner is retained when its first and last posting are more than this many days apart
+RETAINED_DAYS = 30
+
+LOYALTY_BINS = [0, 1, 5, 10, np.inf]
+LOYALTY_LABELS = ['1 Job', '2-5 Jobs', '6-10 Jobs', '11+ Jobs']
+
+# "Why do they return?": companies split into quantile buckets of applications / views per job
+DRIVER_BUCKETS = 5
+
+TABLE_COLUMNS = ['Company', 'Job_Count', 'First_Post', 'Last_Post', 'Active_Days', 'Active_Months',
+                 'Avg Apps/Job', 'Avg Views/Job', 'Status']
+
+
+@stage(PAGE, 'companies', scale=['Job_Count', 'Total_Applications', 'Total_Views'])
+def companies(selection):
+    """
+    One row per company: postings, applications, views, first / last posting, active days and months.
+    """
+    activity = company_activity(selection)
+    if activity is None or not len(activity['companies']):
+        return None
+
+    active_days = (activity['last'] - activity['first']) / np.timedelta64(1, 'D')
+    return pd.DataFrame({
+        'Company': activity['companies'],
+        'Job_Count': activity['postings'],
+        'Total_Applications': activity['applications'],
+        'Total_Views': activity['views'],
+        'First_Post': activity['first'],
+        'Last_Post': activity['last'],
+        'Active_Days': np.floor(active_days).astype(np.int64),
+        'Active_Months': active_months(activity['bits']),
+        'Retained': active_days > RETAINED_DAYS,
+    })
+
+
+@stage(PAGE, 'kpis', estimates=True)
+def kpis(selection):
+    comp = run_stage(PAGE, 'companies', selection)
+    if comp is None:
+        return None
+
+    total = len(comp)
+    retained = int(comp['Retained'].sum())
+    single = int((comp['Job_Count'] == 1).sum())
+    loyal = comp.sort_values(['Active_Months', 'Job_Count'], ascending=False, kind='stable').head(3)
+    return {
+        # Row 1: Churn
+        'total_companies': total,
+        'retained': retained,
+        'retention_rate': round(retained / total * 100, 1),
+        'one_time': total - retained,
+        # Row 2: Loyalty
+        'single_job': single,
+        'single_job_share': round(single / total * 100, 1),
+        'avg_active_months': round(comp['Active_Months'].mean(), 1),
+        'avg_retained_days': round(comp.loc[comp['Retained'], 'Active_Days'].mean(), 1) if retained else 0,
+        'top3_loyal': list(zip(loyal['Company'], loyal['Active_Months'])),
+    }
+
+
+@stage(PAGE, 'loyalty', estimates=True)
+def loyalty(selection):
+    """
+    Companies and retention rate per posting-frequency segment (1 Job, 2-5 Jobs, ...).
+    """
+    comp = run_stage(PAGE, 'companies', selection)
+    if comp is None:
+        return None
+
+    segment = pd.cut(comp['Job_Count'], bins=LOYALTY_BINS, labels=LOYALTY_LABELS, right=True)
+    grouped = comp['Retained'].groupby(segment, observed=False)
+    result = pd.DataFrame({'Companies': grouped.size(), 'Retained': grouped.sum()}).reindex(LOYALTY_LABELS)
+    result['Retention Rate'] = (result['Retained'] / result['Companies'].where(result['Companies'] > 0) * 100)
+    result['Retention Rate'] = result['Retention Rate'].fillna(0).round(1)
+    return result.rename_axis('Segment').reset_index()
+
+
+def _driver(comp, per_job):
+    """
+    Retention rate per quantile bucket of a per-job metric, and its correlation with being retained.
+    """
+    buckets = pd.qcut(per_job.rank(method='first'), q=min(DRIVER_BUCKETS, len(comp)), labels=False)
+    grouped = pd.DataFrame({'value': per_job, 'retained': comp['Retained']}).groupby(buckets)
+    result = pd.DataFrame({
+        'Bucket': [f"{lo:,.1f} - {hi:,.1f}" for lo, hi in zip(grouped['value'].min(), grouped['value'].max())],
+        'Companies': grouped.size().to_numpy(),
+        'Retention Rate': (grouped['retained'].mean() * 100).round(1).to_numpy(),
+    })
+    flags = comp['Retained'].to_numpy(dtype=float)
+    corr = np.corrcoef(np.log1p(per_job.to_numpy(dtype=float)), flags)[0, 1] if flags.std() and per_job.std() else 0.0
+    return result, round(float(corr), 3)
+
+
+@stage(PAGE, 'drivers', estimates=True)
+def drivers(selection):
+    """
+    "Why do they return?": retention rate by applications and views per job (quantile buckets) and the
+    correlation of each with retention (point-biserial, on log1p values).
+    """
+    comp = run_stage(PAGE, 'companies', selection)
+    if comp is None:
+        return None
+
+    apps, apps_corr = _driver(comp, comp['Total_Applications'] / comp['Job_Count'])
+    views, views_corr = _driver(comp, comp['Total_Views'] / comp['Job_Count'])
+    return {'apps': apps, 'apps_corr': apps_corr, 'views': views, 'views_corr': views_corr}
+
+
+@stage(PAGE, 'monthly', estimates=True)
+def monthly(selection):
+    """
+    Active companies per month split into new (first month with a posting) and returning ones, plus the share
+    of the previous month's companies that posted again - straight from the activity bitsets.
+    """
+    activity = company_activity(selection)
+    if activity is None or not len(activity['companies']):
+        return None
+
+    matrix = month_matrix(activity['bits'], activity['month_count'])
+    first = first_active_month(activity['bits'], activity['month_count'])
+    active = matrix.sum(axis=0)
+    new = np.bincount(first[first >= 0], minlength=activity['month_count'])
+    kept = np.r_[0, (matrix[:, 1:] & matrix[:, :-1]).sum(axis=0)]
+    previous = np.r_[0, active[:-1]]
+
+    result = pd.DataFrame({
+        'Month': month_labels(activity['first_month'], activity['month_count']),
+        'Active': active,
+        'New': new,
+        'Returning': active - new,
+        'Retention Rate': np.round(np.divide(kept * 100, previous, out=np.zeros(len(active)), where=previous > 0), 1),
+    })
+    return result[result['Active'] > 0].reset_index(drop=True)
+
+
+@stage(PAGE, 'table', scale=['Job_Count'])
+def table(selection):
+    """
+    Company retention matrix (most active months first).
+    """
+    comp = run_stage(PAGE, 'companies', selection)
+    if comp is None:
+        return None
+
+    table_df = comp.sort_values(['Active_Months', 'Job_Count'], ascending=False, kind='stable').copy()
+    table_df['Avg Apps/Job'] = (table_df['Total_Applications'] / table_df['Job_Count']).round(1)
+    table_df['Avg Views/Job'] = (table_df['Total_Views'] / table_df['Job_Count']).round(1)
+    table_df['First_Post'] = table_df['First_Post'].dt.strftime('%Y-%m-%d')
+    table_df['Last_Post'] = table_df['Last_Post'].dt.strftime('%Y-%m-%d')
+    table_df['Status'] = np.where(table_df['Retained'], 'Retained', 'One-Time')
+    return table_df[TABLE_COLUMNS]
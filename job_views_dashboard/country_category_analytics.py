@@ -1,9 +1,17 @@
-import pandas as pd
-import plotly.express as px
-from dash import html, dcc, Input, Output, dash_table
+from dash import html, dcc, Input, Output, State, no_update
 import dash_bootstrap_components as dbc
 import calendar
 
+from engine.cache import memoize_callback
+from engine.catalog import dimension_options, register_date_bounds
+from engine.export import export_buttons, register_export_links
+from engine.prefetch import prefetch_next
+from engine.selection import make_selection
+from engine.stages import run_stage
+from engine.tables import server_table, register_table
+from engine.background import background_callback, report_progress
+from job_views_dashboard.compute.country_category_analytics import PAGE, TABLE_COLUMNS
+
 # --- 1. COLOR THEMES ---
 CARD_THEMES = {
     'black': {'bg': 'linear-gradient(135deg, #212529 0%, #343a40 100%)', 'text': '#ffffff'},
@@ -23,10 +31,10 @@ def create_solid_card(card_id, title, value, subtext, theme_key):
         html.H6(title, className="text-uppercase fw-bold",
                 style={'fontSize': '0.75rem', 'opacity': '0.9', 'marginBottom': '5px'}),
         # Updated font size and line height to accommodate Top 3 lists
-        html.H2(value, className="fw-bold",
+        html.H2(value, id=f"{card_id}-value", className="fw-bold",
                 style={'margin': '5px 0', 'fontSize': '1.1rem', 'lineHeight': '1.4', 'whiteSpace': 'normal',
                        'wordWrap': 'break-word'}),
-        html.Small(subtext, style={'fontSize': '0.75rem', 'opacity': '0.8'})
+        html.Small(subtext, id=f"{card_id}-sub", style={'fontSize': '0.75rem', 'opacity': '0.8'})
     ],
         id=card_id,
         style={
@@ -46,100 +54,112 @@ def create_solid_card(card_id, title, value, subtext, theme_key):
 
 
 # --- 3. LAYOUT ---
-layout = dbc.Container([
-
-    # Header
-    dbc.Row([
-        dbc.Col(html.H3("Country vs. Category Performance", className="my-4",
-                        style={'fontWeight': '800', 'color': '#2c3e50'}), width=12)
-    ]),
-
-    # Filters
-    dbc.Row([
-        dbc.Col([
-            html.Label("Date Range", className="fw-bold small text-muted"),
-            dcc.DatePickerRange(id='cca-date-picker', display_format='YYYY-MM-DD', clearable=True,
-                                style={'width': '100%', 'borderRadius': '8px'})
-        ], width=12, md=3),
-        dbc.Col([
-            html.Label("Month", className="fw-bold small text-muted"),
-            dcc.Dropdown(id='cca-month-dropdown',
-                         options=[{'label': calendar.month_name[i], 'value': i} for i in range(1, 13)], multi=True,
-                         placeholder="Select Months...")
-        ], width=12, md=3),
-        dbc.Col([
-            html.Label("Country", className="fw-bold small text-muted"),
-            dcc.Dropdown(id='cca-country-dropdown', multi=True, placeholder="All Countries")
-        ], width=12, md=3),
-        dbc.Col([
-            html.Label("Job Category", className="fw-bold small text-muted"),
-            dcc.Dropdown(id='cca-category-dropdown', multi=True, placeholder="All Categories")
-        ], width=12, md=3),
-    ], className="p-4 mb-4 bg-white shadow-sm", style={'borderRadius': '15px', 'borderLeft': '5px solid #fd7e14'}),
-
-    # --- KPI CARDS ---
-
-    # Row 1: High Level Overview
-    dbc.Row([
-        dbc.Col(create_solid_card("cca-total-cats", "Total Categories", "0", "Active Globally", "black"), width=12,
-                sm=6, lg=4, className="mb-4"),
-        dbc.Col(create_solid_card("cca-top-global", "Top 3 Global Categories", "-", "Most Jobs Posted", "blue"),
-                width=12, sm=6, lg=4, className="mb-4"),
-        dbc.Col(create_solid_card("cca-top-country", "Top Country (Supply)", "-", "Most Jobs Posted", "purple"),
-                width=12, sm=6, lg=4, className="mb-4"),
-    ]),
-
-    # Row 2: Job Supply Stats (Jobs Posted)
-    dbc.Row([
-        dbc.Col(create_solid_card("cca-job-total", "Total Jobs Posted", "0", "Global Sum", "blue"), width=12, sm=6,
-                lg=4, className="mb-4"),
-        dbc.Col(create_solid_card("cca-job-avg", "Avg Jobs/Category", "0", "Mean per Category", "blue"), width=12, sm=6,
-                lg=4, className="mb-4"),
-        dbc.Col(create_solid_card("cca-job-max", "Top 3 Categories (Volume)", "-", "Highest Job Counts", "blue"),
-                width=12, sm=12, lg=4, className="mb-4"),
-    ]),
-
-    # Row 3: Demand Stats (Applications)
-    dbc.Row([
-        dbc.Col(create_solid_card("cca-app-total", "Total Applications", "0", "Global Sum", "green"), width=12, sm=6,
-                lg=4, className="mb-4"),
-        dbc.Col(create_solid_card("cca-app-avg", "Avg Apps/Job", "0", "Mean per Job Posting", "green"), width=12, sm=6,
-                lg=4, className="mb-4"),
-        dbc.Col(create_solid_card("cca-app-max", "Top 3 Categories (Demand)", "-", "Highest Applications", "green"),
-                width=12, sm=12, lg=4, className="mb-4"),
-    ]),
-
-    # Row 4: Engagement Stats (Views)
-    dbc.Row([
-        dbc.Col(create_solid_card("cca-view-total", "Total Views", "0", "Global Sum", "cyan"), width=12, sm=6, lg=4,
-                className="mb-4"),
-        dbc.Col(create_solid_card("cca-view-avg", "Avg Views/Job", "0", "Mean per Job Posting", "cyan"), width=12, sm=6,
-                lg=4, className="mb-4"),
-        dbc.Col(create_solid_card("cca-view-max", "Top 3 Categories (Traffic)", "-", "Highest Views", "cyan"), width=12,
-                sm=12, lg=4, className="mb-4"),
-    ]),
-
-    # --- GRAPHS ---
-    dbc.Row([
-        # Graph 1: Sunburst (Hierarchy) - Full Width
-        dbc.Col(dbc.Card([
-            dbc.CardHeader("1. Global Distribution: Country > Category (Jobs)",
-                           className="bg-transparent fw-bold border-0"),
-            dbc.CardBody(dcc.Graph(id='cca-sunburst', style={'height': '500px'}, config={'displayModeBar': False}))
-        ], style={'borderRadius': '12px', 'boxShadow': '0 4px 12px rgba(0,0,0,0.05)', 'border': 'none'},
-            className="mb-4"), width=12),
-    ]),
+def build_layout():
+    """
+    Page layout, built on first navigation to the page (see root_file/app.py).
+    """
+    return dbc.Container([
+        # Normalized filter state shared by the KPI / chart / table stages
+        dcc.Store(id='cca-selection'),
+
+        # Header
+        dbc.Row([
+            dbc.Col(html.H3("Country vs. Category Performance", className="my-4",
+                            style={'fontWeight': '800', 'color': '#2c3e50'}), width=True),
+            dbc.Col(export_buttons('cca'), width='auto', className="my-4")
+        ], className="align-items-center"),
+
+        # Filters
+        dbc.Row([
+            dbc.Col([
+                html.Label("Date Range", className="fw-bold small text-muted"),
+                dcc.DatePickerRange(id='cca-date-picker', display_format='YYYY-MM-DD', clearable=True,
+                                    style={'width': '100%', 'borderRadius': '8px'})
+            ], width=12, md=3),
+            dbc.Col([
+                html.Label("Month", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='cca-month-dropdown',
+                             options=[{'label': calendar.month_name[i], 'value': i} for i in range(1, 13)], multi=True,
+                             placeholder="Select Months...")
+            ], width=12, md=3),
+            dbc.Col([
+                html.Label("Country", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='cca-country-dropdown', multi=True, placeholder="All Countries")
+            ], width=12, md=3),
+            dbc.Col([
+                html.Label("Job Category", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='cca-category-dropdown', multi=True, placeholder="All Categories")
+            ], width=12, md=3),
+        ], className="p-4 mb-4 bg-white shadow-sm", style={'borderRadius': '15px', 'borderLeft': '5px solid #fd7e14'}),
+
+        # Progress (only visible while a background job is running)
+        html.Div(dbc.Progress(id='cca-progress', value=0, striped=True, animated=True, style={'height': '18px'}),
+                 id='cca-progress-wrapper', style={'display': 'none'}, className="mb-4"),
+
+        # --- KPI CARDS ---
+
+        # Row 1: High Level Overview
+        dbc.Row([
+            dbc.Col(create_solid_card("cca-total-cats", "Total Categories", "0", "Active Globally", "black"), width=12,
+                    sm=6, lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("cca-top-global", "Top 3 Global Categories", "-", "By Job Volume", "blue"),
+                    width=12, sm=6, lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("cca-top-country", "Top Country (Supply)", "-", "0 Jobs", "purple"),
+                    width=12, sm=6, lg=4, className="mb-4"),
+        ]),
+
+        # Row 2: Job Supply Stats (Jobs Posted)
+        dbc.Row([
+            dbc.Col(create_solid_card("cca-job-total", "Total Jobs Posted", "0", "Global Sum", "blue"), width=12, sm=6,
+                    lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("cca-job-avg", "Avg Jobs/Category", "0", "Mean per Category", "blue"), width=12,
+                    sm=6, lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("cca-job-max", "Top 3 Categories (Volume)", "-", "Highest Job Counts", "blue"),
+                    width=12, sm=12, lg=4, className="mb-4"),
+        ]),
+
+        # Row 3: Demand Stats (Applications)
+        dbc.Row([
+            dbc.Col(create_solid_card("cca-app-total", "Total Applications", "0", "Global Sum", "green"), width=12,
+                    sm=6, lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("cca-app-avg", "Avg Apps/Job", "0", "Mean per Job", "green"), width=12, sm=6,
+                    lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("cca-app-max", "Top 3 Categories (Demand)", "-", "Highest Applications", "green"),
+                    width=12, sm=12, lg=4, className="mb-4"),
+        ]),
+
+        # Row 4: Engagement Stats (Views)
+        dbc.Row([
+            dbc.Col(create_solid_card("cca-view-total", "Total Views", "0", "Global Sum", "cyan"), width=12, sm=6, lg=4,
+                    className="mb-4"),
+            dbc.Col(create_solid_card("cca-view-avg", "Avg Views/Job", "0", "Mean per Job", "cyan"), width=12, sm=6,
+                    lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("cca-view-max", "Top 3 Categories (Traffic)", "-", "Highest Views", "cyan"),
+                    width=12, sm=12, lg=4, className="mb-4"),
+        ]),
 
-    # --- TABLE ---
-    dbc.Row([
-        dbc.Col([
-            html.H5("Detailed Country & Category Performance Matrix", className="mb-3 text-muted fw-bold"),
-            html.Div(id='cca-table-container', style={'background': 'white', 'padding': '20px', 'borderRadius': '12px',
-                                                      'boxShadow': '0 4px 12px rgba(0,0,0,0.05)'})
-        ], width=12)
-    ], className="mb-5")
-
-], fluid=True)
+        # --- GRAPHS ---
+        dbc.Row([
+            # Graph 1: Sunburst (Hierarchy) - Full Width
+            dbc.Col(dbc.Card([
+                dbc.CardHeader("1. Global Distribution: Country > Category (Jobs)",
+                               className="bg-transparent fw-bold border-0"),
+                dbc.CardBody(dcc.Graph(id='cca-sunburst', style={'height': '500px'}, config={'displayModeBar': False}))
+            ], style={'borderRadius': '12px', 'boxShadow': '0 4px 12px rgba(0,0,0,0.05)', 'border': 'none'},
+                className="mb-4"), width=12),
+        ]),
+
+        # --- TABLE ---
+        dbc.Row([
+            dbc.Col([
+                html.H5("Detailed Country & Category Performance Matrix", className="mb-3 text-muted fw-bold"),
+                html.Div(server_table('cca-table', TABLE_COLUMNS), id='cca-table-container',
+                         style={'background': 'white', 'padding': '20px', 'borderRadius': '12px',
+                                'boxShadow': '0 4px 12px rgba(0,0,0,0.05)'})
+            ], width=12)
+        ], className="mb-5")
+
+    ], fluid=True)
 
 
 # --- 4. CALLBACKS ---
@@ -152,30 +172,14 @@ def register_callbacks(app):
     )
     def update_filters(data):
         if not data: return [], []
-        df = pd.DataFrame(data)
-        countries = [{'label': c, 'value': c} for c in
-                     sorted(df['Country'].dropna().unique().astype(str))] if 'Country' in df.columns else []
-        cats = [{'label': c, 'value': c} for c in
-                sorted(df['Job_Category'].dropna().unique().astype(str))] if 'Job_Category' in df.columns else []
-        return countries, cats
+        return dimension_options('Country'), dimension_options('Job_Category')
 
-    # --- 2. Update Analytics ---
+    # The calendar only offers the dataset's dates (first / last posting from the dimension catalog)
+    register_date_bounds(app, 'cca-date-picker')
+
+    # --- 2. Filtered Selection (shared by the KPI / chart / table stages) ---
     @app.callback(
-        [
-            # Row 1
-            Output('cca-total-cats', 'children'), Output('cca-top-global', 'children'),
-            Output('cca-top-country', 'children'),
-            # Row 2 (Jobs)
-            Output('cca-job-total', 'children'), Output('cca-job-avg', 'children'), Output('cca-job-max', 'children'),
-            # Row 3 (Apps)
-            Output('cca-app-total', 'children'), Output('cca-app-avg', 'children'), Output('cca-app-max', 'children'),
-            # Row 4 (Views)
-            Output('cca-view-total', 'children'), Output('cca-view-avg', 'children'),
-            Output('cca-view-max', 'children'),
-            # Graphs & Table
-            Output('cca-sunburst', 'figure'),
-            Output('cca-table-container', 'children')
-        ],
+        Output('cca-selection', 'data'),
         [
             Input('global-data-store', 'data'),
             Input('cca-date-picker', 'start_date'),
@@ -183,181 +187,82 @@ def register_callbacks(app):
             Input('cca-month-dropdown', 'value'),
             Input('cca-country-dropdown', 'value'),
             Input('cca-category-dropdown', 'value')
-        ]
+        ],
+        State('cca-selection', 'data')
     )
-    def update_analytics(data, start_date, end_date, selected_months, selected_countries, selected_cats):
-        empty_fig = px.bar(title="No Data")
-
-        # Helper for Card Content
-        def make_content(title, val, sub):
-            return [
-                html.H6(title, className="text-uppercase fw-bold",
-                        style={'fontSize': '0.75rem', 'opacity': '0.9', 'marginBottom': '5px'}),
-                html.H2(val, className="fw-bold",
-                        style={'margin': '5px 0', 'fontSize': '1.1rem', 'lineHeight': '1.4', 'whiteSpace': 'normal',
-                               'wordWrap': 'break-word'}),
-                html.Small(sub, style={'fontSize': '0.75rem', 'opacity': '0.8'})
-            ]
-
-        defaults = [make_content("Metric", "0", "No Data")] * 12 + [empty_fig, None]
-
-        if not data: return defaults
-
-        df = pd.DataFrame(data)
-
-        # --- PREPROCESSING ---
-        if 'Created_At' in df.columns:
-            df['Created_At'] = pd.to_datetime(df['Created_At'], errors='coerce')
-
-        for col in ['Total_Applications', 'Total_Views']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-        # --- FILTERING ---
-        if start_date and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.date >= pd.to_datetime(start_date).date()]
-        if end_date and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.date <= pd.to_datetime(end_date).date()]
-        if selected_months and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.month.isin(selected_months)]
-        if selected_countries and 'Country' in df.columns:
-            df = df[df['Country'].isin(selected_countries)]
-        if selected_cats and 'Job_Category' in df.columns:
-            df = df[df['Job_Category'].isin(selected_cats)]
-
-        if df.empty or 'Country' not in df.columns or 'Job_Category' not in df.columns:
-            return defaults
-
-        # --- AGGREGATION LOGIC ---
-
-        # 1. Group by Category (Global Stats)
-        cat_stats = df.groupby('Job_Category').agg({
-            'Job_Title': 'count',
-            'Total_Applications': 'sum',
-            'Total_Views': 'sum'
-        }).rename(columns={'Job_Title': 'Job_Count'})
-
-        # 2. Group by Country (For Table)
-        country_stats = df.groupby('Country').agg({
-            'Job_Title': 'count',
-            'Total_Applications': 'sum',
-            'Total_Views': 'sum'
-        }).rename(columns={'Job_Title': 'Job_Count'})
-
-        # --- KPI CALCULATIONS ---
-
-        # Row 1
-        total_cats = len(cat_stats)
-
-        # Top 3 Global Categories (Names only)
-        top3_global = cat_stats['Job_Count'].nlargest(3).index.tolist()
-        top_global_str = ", ".join(top3_global) if top3_global else "-"
-
-        top_country = country_stats['Job_Count'].idxmax() if not country_stats.empty else "-"
-        top_country_val = country_stats['Job_Count'].max() if not country_stats.empty else 0
+    def update_selection(data, start_date, end_date, selected_months, selected_countries, selected_cats, current):
+        selection = make_selection(data, start_date=start_date, end_date=end_date, months=selected_months,
+                                   countries=selected_countries, categories=selected_cats)
+        return no_update if selection == current else selection
 
-        # Row 2 (Jobs)
-        total_jobs = cat_stats['Job_Count'].sum()
-        avg_jobs = round(cat_stats['Job_Count'].mean(), 1)  # Avg Jobs per Category
-
-        # Top 3 Categories by Jobs (Name + Value)
-        top3_jobs = cat_stats['Job_Count'].nlargest(3)
-        max_jobs_str = ", ".join([f"{idx} ({val})" for idx, val in top3_jobs.items()])
+    # --- 3. KPI Stage (values only - card titles and styling stay static) ---
+    @app.callback(
+        [
+            # Row 1
+            Output('cca-total-cats-value', 'children'), Output('cca-top-global-value', 'children'),
+            Output('cca-top-country-value', 'children'), Output('cca-top-country-sub', 'children'),
+            # Row 2 (Jobs)
+            Output('cca-job-total-value', 'children'), Output('cca-job-avg-value', 'children'),
+            Output('cca-job-max-value', 'children'),
+            # Row 3 (Apps)
+            Output('cca-app-total-value', 'children'), Output('cca-app-avg-value', 'children'),
+            Output('cca-app-max-value', 'children'),
+            # Row 4 (Views)
+            Output('cca-view-total-value', 'children'), Output('cca-view-avg-value', 'children'),
+            Output('cca-view-max-value', 'children')
+        ],
+        Input('cca-selection', 'data')
+    )
+    @prefetch_next(PAGE)
+    def update_kpis(selection):
+        stats = run_stage(PAGE, 'kpis', selection) if selection else None
+        if stats is None:
+            return "0", "-", "-", "0 Jobs", "0", "0", "-", "0", "0", "-", "0", "0", "-"
 
-        # Row 3 (Apps)
-        total_apps = cat_stats['Total_Applications'].sum()
-        avg_apps = round(total_apps / total_jobs, 1) if total_jobs > 0 else 0  # Avg Apps per Job
+        def top3_str(items):
+            return ", ".join([f"{idx} ({val})" for idx, val in items])
 
-        # Top 3 Categories by Apps (Name + Value)
-        top3_apps = cat_stats['Total_Applications'].nlargest(3)
-        max_apps_str = ", ".join([f"{idx} ({val})" for idx, val in top3_apps.items()])
+        top_global_str = ", ".join(stats['top3_global']) if stats['top3_global'] else "-"
+        top_country, top_country_val = stats['top_country']
 
-        # Row 4 (Views)
-        total_views = cat_stats['Total_Views'].sum()
-        avg_views = round(total_views / total_jobs, 1) if total_jobs > 0 else 0  # Avg Views per Job
+        return (
+            # Row 1
+            f"{stats['total_cats']}", top_global_str, f"{top_country}", f"{top_country_val} Jobs",
+            # Row 2
+            f"{stats['total_jobs']:,}", f"{stats['avg_jobs']}", top3_str(stats['top3_jobs']),
+            # Row 3
+            f"{stats['total_apps']:,}", f"{stats['avg_apps']}", top3_str(stats['top3_apps']),
+            # Row 4
+            f"{stats['total_views']:,}", f"{stats['avg_views']}", top3_str(stats['top3_views'])
+        )
 
-        # Top 3 Categories by Views (Name + Value)
-        top3_views = cat_stats['Total_Views'].nlargest(3)
-        max_views_str = ", ".join([f"{idx} ({val})" for idx, val in top3_views.items()])
+    # --- 4. Chart Stage (background job when enabled) ---
+    @background_callback(
+        app,
+        Output('cca-sunburst', 'figure'),
+        Input('cca-selection', 'data'),
+        progress=[Output('cca-progress', 'value'), Output('cca-progress', 'label')],
+        running=[(Output('cca-progress-wrapper', 'style'), {'display': 'block'}, {'display': 'none'})]
+    )
+    @memoize_callback(PAGE, 'charts')
+    def update_charts(selection):
+        import plotly.express as px  # ~140 ms: loaded on the first chart, not at app startup
 
-        # --- GRAPHS ---
+        report_progress(10, "Loading data")
+        sunburst_df = run_stage(PAGE, 'sunburst', selection) if selection else None
+        if sunburst_df is None:
+            return px.bar(title="No Data")
 
         # 1. Sunburst (Country -> Category -> Jobs)
-        sunburst_df = df.groupby(['Country', 'Job_Category']).size().reset_index(name='Jobs')
-        top_countries = sunburst_df.groupby('Country')['Jobs'].sum().nlargest(15).index
-        sunburst_df = sunburst_df[sunburst_df['Country'].isin(top_countries)]
-
+        report_progress(55, "Building charts")
         fig_sun = px.sunburst(sunburst_df, path=['Country', 'Job_Category'], values='Jobs',
                               color='Jobs', color_continuous_scale='Blues')
         fig_sun.update_layout(margin=dict(l=0, r=0, t=0, b=0))
+        return fig_sun
 
-        # --- TABLE LOGIC ---
-
-        # 1. Base Aggregation by Country
-        table_base = df.groupby('Country').agg({
-            'Job_Title': 'count',
-            'Total_Applications': 'sum',
-            'Total_Views': 'sum',
-            'Job_Category': 'nunique'  # Count unique categories
-        }).reset_index()
-
-        # Flatten columns
-        table_base.columns = ['Country', 'Total Jobs', 'Total Apps', 'Total Views', 'Cat Count']
-
-        # 2. Calculate Averages
-        table_base['Avg Jobs'] = (table_base['Total Jobs'] / table_base['Cat Count']).round(1)  # Jobs per Category
-        table_base['Avg Apps'] = (table_base['Total Apps'] / table_base['Total Jobs']).round(1)  # Apps per Job
-        table_base['Avg Views'] = (table_base['Total Views'] / table_base['Total Jobs']).round(1)  # Views per Job
-
-        # 3. Find Top 3 Categories per Country
-        cc_counts = df.groupby(['Country', 'Job_Category']).size().reset_index(name='Count')
-        cc_counts = cc_counts.sort_values(['Country', 'Count'], ascending=[True, False])
-
-        def get_top_3_cols(x):
-            cats = x['Job_Category'].head(3).tolist()
-            while len(cats) < 3: cats.append("-")
-            return pd.Series(cats, index=['Top 1 Cat', 'Top 2 Cat', 'Top 3 Cat'])
-
-        top_cats_df = cc_counts.groupby('Country').apply(get_top_3_cols).reset_index()
-
-        # 4. Merge
-        final_table = pd.merge(table_base, top_cats_df, on='Country', how='left')
-        final_table = final_table.sort_values('Total Jobs', ascending=False)
+    # --- 5. Table Stage (server-side paging / sorting / filtering over the full table) ---
+    register_table(app, 'cca-table', 'cca-selection', PAGE, lambda selection: run_stage(PAGE, 'table', selection),
+                   columns=TABLE_COLUMNS)
 
-        # 5. Reorder Columns
-        cols_order = ['Country', 'Top 1 Cat', 'Top 2 Cat', 'Top 3 Cat', 'Total Jobs', 'Avg Jobs', 'Total Apps',
-                      'Avg Apps', 'Total Views', 'Avg Views']
-
-        table = dash_table.DataTable(
-            data=final_table.head(50).to_dict('records'),
-            columns=[{'name': i, 'id': i} for i in cols_order],
-            page_size=10,
-            style_table={'overflowX': 'auto'},
-            style_header={'backgroundColor': '#2c3e50', 'color': 'white', 'fontWeight': 'bold'},
-            style_cell={'textAlign': 'left', 'padding': '10px', 'fontFamily': 'Segoe UI'},
-            style_data_conditional=[
-                {'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}
-            ]
-        )
-
-        return (
-            # Row 1
-            make_content("Total Categories", f"{total_cats}", "Active Globally"),
-            make_content("Top 3 Global Categories", top_global_str, "By Job Volume"),
-            make_content("Top Country (Supply)", f"{top_country}", f"{top_country_val} Jobs"),
-            # Row 2
-            make_content("Total Jobs Posted", f"{total_jobs:,}", "Global Sum"),
-            make_content("Avg Jobs/Category", f"{avg_jobs}", "Mean per Category"),
-            make_content("Top 3 Categories (Volume)", max_jobs_str, "Highest Job Counts"),
-            # Row 3
-            make_content("Total Applications", f"{total_apps:,}", "Global Sum"),
-            make_content("Avg Apps/Job", f"{avg_apps}", "Mean per Job"),
-            make_content("Top 3 Categories (Demand)", max_apps_str, "Highest Applications"),
-            # Row 4
-            make_content("Total Views", f"{total_views:,}", "Global Sum"),
-            make_content("Avg Views/Job", f"{avg_views}", "Mean per Job"),
-            make_content("Top 3 Categories (Traffic)", max_views_str, "Highest Views"),
-            # Visuals
-            fig_sun,
-            table
-        )
\ No newline at end of file
+    # --- 6. Export Links (filtered rows, streamed as CSV / Parquet) ---
+    register_export_links(app, 'cca', 'cca-selection', PAGE)
@@ -1,8 +1,16 @@
-import pandas as pd
-import plotly.express as px
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, no_update
 import dash_bootstrap_components as dbc
 
+from engine.cache import memoize_callback
+from engine.catalog import dimension_options, register_date_bounds
+from engine.export import export_buttons, register_export_links
+from engine.figures import time_series_skeleton, time_series_patch, patch_empty
+from engine.prefetch import prefetch_next
+from engine.search import register_search_dropdown
+from engine.selection import make_selection
+from engine.stages import run_stage
+from job_views_dashboard.compute.overview_analytics import PAGE
+
 # --- 1. COLOR THEMES (Same as Country Page) ---
 CARD_THEMES = {
     'black': {'bg': 'linear-gradient(135deg, #212529 0%, #343a40 100%)', 'text': '#ffffff'},
@@ -28,8 +36,8 @@ def create_solid_card(card_id, title, value, subtext, theme_key):
     return html.Div([
         html.H6(title, className="text-uppercase fw-bold",
                 style={'fontSize': '0.75rem', 'opacity': '0.9', 'marginBottom': '5px'}),
-        html.H2(value, className="fw-bold", style={'margin': '5px 0', 'fontSize': '2rem'}),
-        html.Small(subtext, style={'fontSize': '0.8rem', 'opacity': '0.8'})
+        html.H2(value, id=f"{card_id}-value", className="fw-bold", style={'margin': '5px 0', 'fontSize': '2rem'}),
+        html.Small(subtext, id=f"{card_id}-sub", style={'fontSize': '0.8rem', 'opacity': '0.8'})
     ],
         id=card_id,
         style={
@@ -48,253 +56,208 @@ def create_solid_card(card_id, title, value, subtext, theme_key):
     )
 
 
-def create_graph_card(title, graph_id):
+def create_graph_card(title, graph_id, figure):
     """
     Creates a clean white card for graphs (Matches Country Page Style).
     """
     return dbc.Card([
         dbc.CardHeader(title, className="bg-transparent fw-bold border-0", style={'color': '#343a40'}),
-        dbc.CardBody(dcc.Graph(id=graph_id, style={'height': '350px'}, config={'displayModeBar': False}))
+        dbc.CardBody(dcc.Graph(id=graph_id, figure=figure, style={'height': '350px'},
+                               config={'displayModeBar': False}))
     ], style={'borderRadius': '12px', 'boxShadow': '0 4px 12px rgba(0,0,0,0.05)', 'border': 'none'}, className="mb-4")
 
 
+def create_trend_figure(y_col, line_color, fill_color):
+    """
+    Static styling of a daily area chart. Callbacks only patch in the (downsampled, typed) x / y arrays.
+    """
+    return time_series_skeleton(
+        'Date', y_col, line_color, fill_color, line_width=3,
+        margin=dict(l=20, r=20, t=20, b=20),
+        hovermode="x unified",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=False, title=None, showline=True, linecolor='#eee'),
+        yaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)', title=None),
+    )
+
+
+# Trend charts: (y column, line color, fill color)
+TREND_STYLES = {
+    'ov-jobs-posted-graph': ('Jobs_Count', "#0d6efd", "rgba(13, 110, 253, 0.1)"),  # Blue
+    'ov-applications-time-graph': ('Total_Applications', "#198754", "rgba(25, 135, 84, 0.1)"),  # Green
+    'ov-views-time-graph': ('Total_Views', "#0dcaf0", "rgba(13, 202, 240, 0.1)"),  # Cyan
+}
+
+
 # --- 3. LAYOUT DEFINITION ---
 
-layout = dbc.Container([
-
-    # 1. Page Header
-    dbc.Row([
-        dbc.Col(html.H3("Job Overview", className="my-4", style={'fontWeight': '800', 'color': '#2c3e50'}), width=12)
-    ]),
-
-    # 2. Filters (Styled like Country Page)
-    dbc.Row([
-        # Date Range
-        dbc.Col([
-            html.Label("Date Range", className="fw-bold small text-muted"),
-            dcc.DatePickerRange(
-                id='ov-date-picker',
-                display_format='YYYY-MM-DD',
-                clearable=True,
-                style={'width': '100%', 'borderRadius': '8px'}
-            )
-        ], width=12, md=4),
-
-        # Category
-        dbc.Col([
-            html.Label("Job Category", className="fw-bold small text-muted"),
-            dcc.Dropdown(
-                id='ov-category-dropdown',
-                options=[],
-                multi=True,
-                placeholder="All Categories",
-            )
-        ], width=12, md=4),
-
-        # Company
-        dbc.Col([
-            html.Label("Company", className="fw-bold small text-muted"),
-            dcc.Dropdown(
-                id='ov-company-dropdown',
-                options=[],
-                multi=True,
-                placeholder="All Companies",
-            )
-        ], width=12, md=4),
-    ], className="p-4 mb-4 bg-white shadow-sm", style={'borderRadius': '15px', 'borderLeft': '5px solid #0d6efd'}),
-
-    # 3. KPI Cards (Solid Gradients)
-    dbc.Row([
-        dbc.Col(create_solid_card("ov-kpi-total-jobs", "Total Jobs", "0", "Posted Jobs", "blue"), width=12, sm=6, lg=2,
-                className="mb-4"),
-        dbc.Col(create_solid_card("ov-kpi-total-apps", "Total Apps", "0", "Applications", "green"), width=12, sm=6,
-                lg=2, className="mb-4"),
-        dbc.Col(create_solid_card("ov-kpi-total-views", "Total Views", "0", "Job Views", "cyan"), width=12, sm=6, lg=2,
-                className="mb-4"),
-        dbc.Col(create_solid_card("ov-kpi-avg-views", "Avg Views/Job", "0", "Per Posting", "purple"), width=12, sm=6,
-                lg=2, className="mb-4"),
-        dbc.Col(create_solid_card("ov-kpi-avg-apps", "Avg Apps/Job", "0", "Per Posting", "orange"), width=12, sm=6,
-                lg=2, className="mb-4"),
-        dbc.Col(create_solid_card("ov-kpi-conversion", "Conversion", "0%", "Apps / Views", "red"), width=12, sm=6, lg=2,
-                className="mb-4"),
-    ]),
-
-    # 4. Graphs
-    dbc.Row([
-        dbc.Col(create_graph_card("Jobs Posted Trend", "ov-jobs-posted-graph"), width=12)
-    ]),
-
-    dbc.Row([
-        dbc.Col(create_graph_card("Application Volume Trend", "ov-applications-time-graph"), width=12)
-    ]),
-
-    dbc.Row([
-        dbc.Col(create_graph_card("View Traffic Trend", "ov-views-time-graph"), width=12)
-    ]),
-
-], fluid=True)
+def build_layout():
+    """
+    Page layout, built on first navigation to the page (see root_file/app.py).
+    """
+    return dbc.Container([
+        # Normalized filter state shared by the KPI / chart stages
+        dcc.Store(id='ov-selection'),
+
+        # 1. Page Header
+        dbc.Row([
+            dbc.Col(html.H3("Job Overview", className="my-4", style={'fontWeight': '800', 'color': '#2c3e50'}),
+                    width=True),
+            dbc.Col(export_buttons('ov'), width='auto', className="my-4")
+        ], className="align-items-center"),
+
+        # 2. Filters (Styled like Country Page)
+        dbc.Row([
+            # Date Range
+            dbc.Col([
+                html.Label("Date Range", className="fw-bold small text-muted"),
+                dcc.DatePickerRange(
+                    id='ov-date-picker',
+                    display_format='YYYY-MM-DD',
+                    clearable=True,
+                    style={'width': '100%', 'borderRadius': '8px'}
+                )
+            ], width=12, md=4),
+
+            # Category
+            dbc.Col([
+                html.Label("Job Category", className="fw-bold small text-muted"),
+                dcc.Dropdown(
+                    id='ov-category-dropdown',
+                    options=[],
+                    multi=True,
+                    placeholder="All Categories",
+                )
+            ], width=12, md=4),
+
+            # Company
+            dbc.Col([
+                html.Label("Company", className="fw-bold small text-muted"),
+                dcc.Dropdown(
+                    id='ov-company-dropdown',
+                    options=[],
+                    multi=True,
+                    placeholder="All Companies",
+                )
+            ], width=12, md=4),
+        ], className="p-4 mb-4 bg-white shadow-sm", style={'borderRadius': '15px', 'borderLeft': '5px solid #0d6efd'}),
+
+        # 3. KPI Cards (Solid Gradients)
+        dbc.Row([
+            dbc.Col(create_solid_card("ov-kpi-total-jobs", "Total Jobs", "0", "Posted Jobs", "blue"), width=12, sm=6,
+                    lg=2, className="mb-4"),
+            dbc.Col(create_solid_card("ov-kpi-total-apps", "Total Apps", "0", "Applications", "green"), width=12, sm=6,
+                    lg=2, className="mb-4"),
+            dbc.Col(create_solid_card("ov-kpi-total-views", "Total Views", "0", "Job Views", "cyan"), width=12, sm=6,
+                    lg=2, className="mb-4"),
+            dbc.Col(create_solid_card("ov-kpi-avg-views", "Avg Views/Job", "0", "Per Posting", "purple"), width=12,
+                    sm=6, lg=2, className="mb-4"),
+            dbc.Col(create_solid_card("ov-kpi-avg-apps", "Avg Apps/Job", "0", "Per Posting", "orange"), width=12, sm=6,
+                    lg=2, className="mb-4"),
+            dbc.Col(create_solid_card("ov-kpi-conversion", "Conversion", "0%", "Apps / Views", "red"), width=12, sm=6,
+                    lg=2, className="mb-4"),
+        ]),
+
+        # 4. Graphs
+        dbc.Row([
+            dbc.Col(create_graph_card("Jobs Posted Trend", "ov-jobs-posted-graph",
+                                      create_trend_figure(*TREND_STYLES['ov-jobs-posted-graph'])), width=12)
+        ]),
+
+        dbc.Row([
+            dbc.Col(create_graph_card("Application Volume Trend", "ov-applications-time-graph",
+                                      create_trend_figure(*TREND_STYLES['ov-applications-time-graph'])), width=12)
+        ]),
+
+        dbc.Row([
+            dbc.Col(create_graph_card("View Traffic Trend", "ov-views-time-graph",
+                                      create_trend_figure(*TREND_STYLES['ov-views-time-graph'])), width=12)
+        ]),
+
+    ], fluid=True)
 
 
 # --- 4. CALLBACKS ---
 
 def register_callbacks(app):
-    # --- Helper for Graph Styling ---
-    def create_clean_line_chart(df, x_col, y_col, title, line_color, fill_color):
-        fig = px.area(df, x=x_col, y=y_col, markers=True, template="plotly_white")
-        fig.update_traces(
-            line_color=line_color,
-            line_shape='spline',
-            line_width=3,
-            fillcolor=fill_color,
-            mode='lines+markers'
-        )
-        fig.update_layout(
-            margin=dict(l=20, r=20, t=20, b=20),
-            hovermode="x unified",
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(showgrid=False, title=None, showline=True, linecolor='#eee'),
-            yaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)', title=None),
-        )
-        return fig
-
     # --- Callback A: Populate Dropdowns ---
     @app.callback(
-        [Output('ov-category-dropdown', 'options'),
-         Output('ov-company-dropdown', 'options')],
+        Output('ov-category-dropdown', 'options'),
         Input('global-data-store', 'data')
     )
     def update_dropdowns(data):
-        if not data: return [], []
-        df = pd.DataFrame(data)
-
-        cat_opts = []
-        if 'Job_Category' in df.columns:
-            cats = sorted(df['Job_Category'].dropna().unique().astype(str))
-            cat_opts = [{'label': c, 'value': c} for c in cats]
+        if not data: return []
+        return dimension_options('Job_Category')
 
-        comp_opts = []
-        if 'Company' in df.columns:
-            comps = sorted(df['Company'].dropna().unique().astype(str))
-            comp_opts = [{'label': c, 'value': c} for c in comps]
+    # Company options are searched on the server as the user types (thousands of advertisers)
+    register_search_dropdown(app, 'ov-company-dropdown', 'Company')
 
-        return cat_opts, comp_opts
+    # The calendar only offers the dataset's dates (first / last posting from the dimension catalog)
+    register_date_bounds(app, 'ov-date-picker')
 
-    # --- Callback B: Update Metrics & Graphs ---
+    # --- Callback B: Filtered Selection (shared by every stage below) ---
     @app.callback(
-        [
-            Output('ov-kpi-total-jobs', 'children'),
-            Output('ov-kpi-total-apps', 'children'),
-            Output('ov-kpi-total-views', 'children'),
-            Output('ov-kpi-avg-views', 'children'),
-            Output('ov-kpi-avg-apps', 'children'),
-            Output('ov-kpi-conversion', 'children'),
-            Output('ov-jobs-posted-graph', 'figure'),
-            Output('ov-applications-time-graph', 'figure'),
-            Output('ov-views-time-graph', 'figure')
-        ],
+        Output('ov-selection', 'data'),
         [
             Input('global-data-store', 'data'),
             Input('ov-date-picker', 'start_date'),
             Input('ov-date-picker', 'end_date'),
             Input('ov-category-dropdown', 'value'),
             Input('ov-company-dropdown', 'value')
-        ]
+        ],
+        State('ov-selection', 'data')
+    )
+    def update_selection(data, start_date, end_date, selected_cats, selected_comps, current):
+        selection = make_selection(data, start_date=start_date, end_date=end_date,
+                                   categories=selected_cats, companies=selected_comps)
+        # Same filters as before (e.g. [] -> None) -> nothing downstream re-runs
+        return no_update if selection == current else selection
+
+    # --- Callback C: KPI Stage (values only - titles, subtexts and styling stay static) ---
+    @app.callback(
+        [
+            Output('ov-kpi-total-jobs-value', 'children'),
+            Output('ov-kpi-total-apps-value', 'children'),
+            Output('ov-kpi-total-views-value', 'children'),
+            Output('ov-kpi-avg-views-value', 'children'),
+            Output('ov-kpi-avg-apps-value', 'children'),
+            Output('ov-kpi-conversion-value', 'children')
+        ],
+        Input('ov-selection', 'data')
     )
-    def update_job_dashboard(data, start_date, end_date, selected_cats, selected_comps):
-        empty_fig = px.line(title="No Data Available")
-        empty_fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-
-        # Helper to reconstruct content (Same as Country Page logic)
-        def make_content(title, val, sub):
-            return [
-                html.H6(title, className="text-uppercase fw-bold",
-                        style={'fontSize': '0.75rem', 'opacity': '0.9', 'marginBottom': '5px'}),
-                html.H2(val, className="fw-bold", style={'margin': '5px 0', 'fontSize': '2rem'}),
-                html.Small(sub, style={'fontSize': '0.8rem', 'opacity': '0.8'})
-            ]
-
-        if not data:
-            return [make_content(*x) for x in [
-                ("Total Jobs", "0", "Posted Jobs"), ("Total Apps", "0", "Applications"),
-                ("Total Views", "0", "Job Views"), ("Avg Views/Job", "0", "Per Posting"),
-                ("Avg Apps/Job", "0", "Per Posting"), ("Conversion", "0%", "Apps / Views")
-            ]] + [empty_fig, empty_fig, empty_fig]
-
-        df = pd.DataFrame(data)
-
-        # Data Processing
-        cols_to_numeric = ['Total_Views', 'Total_Applications']
-        for col in cols_to_numeric:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-        if 'Created_At' in df.columns:
-            df['Created_At'] = pd.to_datetime(df['Created_At'], errors='coerce')
-
-        # Filters
-        if start_date and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.date >= pd.to_datetime(start_date).date()]
-        if end_date and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.date <= pd.to_datetime(end_date).date()]
-        if selected_cats and 'Job_Category' in df.columns:
-            df = df[df['Job_Category'].isin(selected_cats)]
-        if selected_comps and 'Company' in df.columns:
-            df = df[df['Company'].isin(selected_comps)]
-
-        if df.empty:
-            return [make_content(*x) for x in [
-                ("Total Jobs", "0", "Posted Jobs"), ("Total Apps", "0", "Applications"),
-                ("Total Views", "0", "Job Views"), ("Avg Views/Job", "0", "Per Posting"),
-                ("Avg Apps/Job", "0", "Per Posting"), ("Conversion", "0%", "Apps / Views")
-            ]] + [empty_fig, empty_fig, empty_fig]
-
-        # KPI Calculations
-        total_jobs = len(df)
-        total_apps = int(df['Total_Applications'].sum())
-        total_views = int(df['Total_Views'].sum())
-        avg_views = round(total_views / total_jobs, 1) if total_jobs > 0 else 0
-        avg_apps = round(total_apps / total_jobs, 1) if total_jobs > 0 else 0
-        conversion_rate = (total_apps / total_views * 100) if total_views > 0 else 0
-        conversion_str = f"{conversion_rate:.2f}%"
-
-        # Graphs
-        if 'Created_At' in df.columns:
-            time_df = df.groupby(df['Created_At'].dt.date).agg({
-                'Created_At': 'count',
-                'Total_Applications': 'sum',
-                'Total_Views': 'sum'
-            }).rename(columns={'Created_At': 'Jobs_Count'}).reset_index()
-            time_df.rename(columns={'Created_At': 'Date'}, inplace=True)
-
-            # 1. Jobs (Blue)
-            fig_jobs = create_clean_line_chart(
-                time_df, 'Date', 'Jobs_Count', "Jobs",
-                line_color="#0d6efd", fill_color="rgba(13, 110, 253, 0.1)"
-            )
-
-            # 2. Apps (Green)
-            fig_apps = create_clean_line_chart(
-                time_df, 'Date', 'Total_Applications', "Apps",
-                line_color="#198754", fill_color="rgba(25, 135, 84, 0.1)"
-            )
-
-            # 3. Views (Cyan)
-            fig_views = create_clean_line_chart(
-                time_df, 'Date', 'Total_Views', "Views",
-                line_color="#0dcaf0", fill_color="rgba(13, 202, 240, 0.1)"
-            )
-        else:
-            fig_jobs, fig_apps, fig_views = empty_fig, empty_fig, empty_fig
+    @prefetch_next(PAGE)
+    def update_kpis(selection):
+        stats = run_stage(PAGE, 'kpis', selection) if selection else None
+
+        if stats is None:
+            return "0", "0", "0", "0", "0", "0%"
 
         return (
-            make_content("Total Jobs", f"{total_jobs:,}", "Posted Jobs"),
-            make_content("Total Apps", f"{total_apps:,}", "Applications"),
-            make_content("Total Views", f"{total_views:,}", "Job Views"),
-            make_content("Avg Views/Job", f"{avg_views:,}", "Per Posting"),
-            make_content("Avg Apps/Job", f"{avg_apps:,}", "Per Posting"),
-            make_content("Conversion", conversion_str, "Apps / Views"),
-            fig_jobs,
-            fig_apps,
-            fig_views
-        )
\ No newline at end of file
+            f"{stats['total_jobs']:,}",
+            f"{stats['total_apps']:,}",
+            f"{stats['total_views']:,}",
+            f"{stats['avg_views']:,}",
+            f"{stats['avg_apps']:,}",
+            f"{stats['conversion_rate']:.2f}%"
+        )
+
+    # --- Callback D: Chart Stage (compact data arrays only, see create_trend_figure) ---
+    @app.callback(
+        [Output(graph_id, 'figure') for graph_id in TREND_STYLES],
+        Input('ov-selection', 'data')
+    )
+    @memoize_callback(PAGE, 'charts')
+    def update_charts(selection):
+        time_df = run_stage(PAGE, 'daily_trend', selection) if selection else None
+
+        if time_df is None:
+            return [patch_empty(1, title="No Data Available") for _ in TREND_STYLES]
+
+        return [
+            time_series_patch(time_df['Date'], time_df[y_col])
+            for y_col, _, _ in TREND_STYLES.values()
+        ]
+
+    # --- Callback E: Export Links (filtered rows, streamed as CSV / Parquet) ---
+    register_export_links(app, 'ov', 'ov-selection', PAGE)
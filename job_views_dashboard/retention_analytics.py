@@ -0,0 +1,342 @@
+import plotly.graph_objects as go
+from dash import html, dcc, Input, Output, State, no_update
+import dash_bootstrap_components as dbc
+
+from engine.cache import memoize_callback
+from engine.catalog import dimension_options, register_date_bounds
+from engine.export import export_buttons, register_export_links
+from engine.figures import figure_skeleton, patch_traces, patch_empty
+from engine.prefetch import prefetch_next
+from engine.selection import make_selection
+from engine.stages import run_stage
+from engine.tables import server_table, register_table
+from engine.background import background_callback, report_progress
+from job_views_dashboard.compute.retention_analytics import PAGE, TABLE_COLUMNS, LOYALTY_LABELS, RETAINED_DAYS
+
+# --- 1. COLOR THEMES ---
+CARD_THEMES = {
+    'black': {'bg': 'linear-gradient(135deg, #212529 0%, #343a40 100%)', 'text': '#ffffff'},
+    'blue': {'bg': 'linear-gradient(135deg, #0d6efd 0%, #0a58ca 100%)', 'text': '#ffffff'},
+    'purple': {'bg': 'linear-gradient(135deg, #6f42c1 0%, #59359a 100%)', 'text': '#ffffff'},
+    'red': {'bg': 'linear-gradient(135deg, #dc3545 0%, #b02a37 100%)', 'text': '#ffffff'},
+    'green': {'bg': 'linear-gradient(135deg, #198754 0%, #146c43 100%)', 'text': '#ffffff'},
+    'orange': {'bg': 'linear-gradient(135deg, #fd7e14 0%, #e35d0b 100%)', 'text': '#ffffff'},
+    'cyan': {'bg': 'linear-gradient(135deg, #0dcaf0 0%, #0aa2c0 100%)', 'text': '#ffffff'},
+}
+
+
+# --- 2. HELPER FUNCTION ---
+def create_solid_card(card_id, title, value, subtext, theme_key):
+    theme = CARD_THEMES.get(theme_key, CARD_THEMES['black'])
+    return html.Div([
+        html.H6(title, className="text-uppercase fw-bold",
+                style={'fontSize': '0.75rem', 'opacity': '0.9', 'marginBottom': '5px'}),
+        html.H2(value, id=f"{card_id}-value", className="fw-bold",
+                style={'margin': '5px 0', 'fontSize': '1.4rem', 'lineHeight': '1.4', 'whiteSpace': 'normal',
+                       'wordWrap': 'break-word'}),
+        html.Small(subtext, id=f"{card_id}-sub", style={'fontSize': '0.75rem', 'opacity': '0.8'})
+    ],
+        id=card_id,
+        style={
+            'background': theme['bg'],
+            'color': theme['text'],
+            'borderRadius': '12px',
+            'padding': '20px',
+            'boxShadow': '0 4px 6px rgba(0,0,0,0.1)',
+            'height': '100%',
+            'display': 'flex',
+            'flexDirection': 'column',
+            'justifyContent': 'center',
+            'border': 'none'
+        },
+        className="kpi-card-hover"
+    )
+
+
+def create_graph_card(title, graph_id, figure):
+    return dbc.Card([
+        dbc.CardHeader(title, className="bg-transparent fw-bold border-0", style={'color': '#343a40'}),
+        dbc.CardBody(dcc.Graph(id=graph_id, figure=figure, style={'height': '400px'},
+                               config={'displayModeBar': False}))
+    ], style={'borderRadius': '12px', 'boxShadow': '0 4px 12px rgba(0,0,0,0.05)', 'border': 'none'}, className="mb-4")
+
+
+# --- 2b. STATIC FIGURES (callbacks only patch in the data arrays) ---
+# Graph ids in callback output order
+GRAPH_IDS = ['ret-graph-split', 'ret-graph-loyalty', 'ret-graph-why-apps', 'ret-graph-why-views',
+             'ret-graph-monthly']
+
+SPLIT_LABELS = ['Retained Partners', 'One-Time Posters']
+
+
+def create_figures():
+    return {
+        # 1. Retained vs One-Time (DONUT CHART, fixed labels -> only values change)
+        'ret-graph-split': figure_skeleton(
+            [go.Pie(labels=SPLIT_LABELS, values=[], hole=0.4, textposition='inside', textinfo='percent+label',
+                    marker_colors=['#198754', '#dc3545'],
+                    hovertemplate="%{label}<br>Companies=%{value}<extra></extra>")],
+            title="Retained Partners vs. One-Time Posters", margin=dict(l=20, r=20, t=40, b=20), showlegend=True
+        ),
+        # 2. Loyalty Segments (fixed buckets -> only y / text change)
+        'ret-graph-loyalty': figure_skeleton(
+            [go.Bar(x=LOYALTY_LABELS, y=[], text=[], marker_color='#6f42c1',
+                    hovertemplate="Segment=%{x}<br>Companies=%{y}<br>%{text}<extra></extra>")],
+            title="Loyalty Segments (Posting Frequency)", plot_bgcolor='rgba(0,0,0,0)',
+            xaxis_title='Jobs Posted', yaxis_title='Companies'
+        ),
+        # 3. Why do they return? (Applications)
+        'ret-graph-why-apps': figure_skeleton(
+            [go.Bar(x=[], y=[], text=[], marker_color='#198754', texttemplate='%{text}%',
+                    hovertemplate="Apps/Job=%{x}<br>Retention Rate=%{y}%<extra></extra>")],
+            title="Retention Rate by Applications per Job", plot_bgcolor='rgba(0,0,0,0)',
+            xaxis_title='Avg Applications per Job', yaxis_title='Retention Rate (%)'
+        ),
+        # 4. Why do they return? (Views)
+        'ret-graph-why-views': figure_skeleton(
+            [go.Bar(x=[], y=[], text=[], marker_color='#0dcaf0', texttemplate='%{text}%',
+                    hovertemplate="Views/Job=%{x}<br>Retention Rate=%{y}%<extra></extra>")],
+            title="Retention Rate by Views per Job", plot_bgcolor='rgba(0,0,0,0)',
+            xaxis_title='Avg Views per Job', yaxis_title='Retention Rate (%)'
+        ),
+        # 5. New vs Returning Companies per Month (Stacked Bar)
+        'ret-graph-monthly': figure_skeleton(
+            [go.Bar(x=[], y=[], name='New', marker_color='#fd7e14',
+                    hovertemplate="Month=%{x}<br>New Companies=%{y}<extra></extra>"),
+             go.Bar(x=[], y=[], name='Returning', marker_color='#0d6efd', customdata=[],
+                    hovertemplate="Month=%{x}<br>Returning Companies=%{y}<br>"
+                                  "Kept from Previous Month=%{customdata}%<extra></extra>")],
+            title="New vs. Returning Companies per Month", plot_bgcolor='rgba(0,0,0,0)', barmode='stack',
+            xaxis_title='Month', yaxis_title='Active Companies'
+        ),
+    }
+
+
+# --- 3. LAYOUT ---
+def build_layout():
+    """
+    Page layout, built on first navigation to the page (see root_file/app.py).
+    """
+    figures = create_figures()
+    return dbc.Container([
+        # Normalized filter state shared by the KPI / chart / table stages
+        dcc.Store(id='ret-selection'),
+
+        # Header
+        dbc.Row([
+            dbc.Col(
+                html.H3("Retention & Loyalty Analytics", className="my-4", style={'fontWeight': '800',
+                                                                                 'color': '#2c3e50'}),
+                width=True),
+            dbc.Col(export_buttons('ret'), width='auto', className="my-4")
+        ], className="align-items-center"),
+
+        # Filters
+        dbc.Row([
+            dbc.Col([
+                html.Label("Date Range", className="fw-bold small text-muted"),
+                dcc.DatePickerRange(id='ret-date-picker', display_format='YYYY-MM-DD', clearable=True,
+                                    style={'width': '100%', 'borderRadius': '8px'})
+            ], width=12, md=4),
+            dbc.Col([
+                html.Label("Country", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='ret-country-dropdown', multi=True, placeholder="All Countries")
+            ], width=12, md=4),
+            dbc.Col([
+                html.Label("Job Category", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='ret-category-dropdown', multi=True, placeholder="All Categories")
+            ], width=12, md=4),
+        ], className="p-4 mb-4 bg-white shadow-sm", style={'borderRadius': '15px', 'borderLeft': '5px solid #198754'}),
+
+        # Progress (only visible while a background job is running)
+        html.Div(dbc.Progress(id='ret-progress', value=0, striped=True, animated=True, style={'height': '18px'}),
+                 id='ret-progress-wrapper', style={'display': 'none'}, className="mb-4"),
+
+        # --- KPI CARDS ---
+
+        # Row 1: Churn
+        dbc.Row([
+            dbc.Col(create_solid_card("ret-total", "Total Companies", "0", "Active Posters", "black"), width=12, sm=6,
+                    lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("ret-retained", "Retained Partners", "0", f"Active > {RETAINED_DAYS} Days",
+                                      "green"), width=12, sm=6, lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("ret-one-time", "One-Time Posters", "0", f"Active <= {RETAINED_DAYS} Days",
+                                      "red"), width=12, sm=12, lg=4, className="mb-4"),
+        ]),
+
+        # Row 2: Loyalty
+        dbc.Row([
+            dbc.Col(create_solid_card("ret-single", "Single-Job Companies", "0", "0% of Companies", "orange"),
+                    width=12, sm=6, lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("ret-avg-months", "Avg Active Months", "0", "Months with a Posting", "blue"),
+                    width=12, sm=6, lg=4, className="mb-4"),
+            dbc.Col(create_solid_card("ret-top-loyal", "Top 3 Loyal Partners", "-", "Most Active Months", "purple"),
+                    width=12, sm=12, lg=4, className="mb-4"),
+        ]),
+
+        # --- GRAPHS ---
+
+        # 1. Churn Split + 2. Loyalty Segments
+        dbc.Row([
+            dbc.Col(create_graph_card("1. Churn Analysis", "ret-graph-split", figures['ret-graph-split']),
+                    width=12, lg=6),
+            dbc.Col(create_graph_card("2. Loyalty Segmentation", "ret-graph-loyalty", figures['ret-graph-loyalty']),
+                    width=12, lg=6),
+        ]),
+
+        # 3. + 4. Why do they return?
+        dbc.Row([
+            dbc.Col(create_graph_card("3. Why Do They Return? (Applications)", "ret-graph-why-apps",
+                                      figures['ret-graph-why-apps']), width=12, lg=6),
+            dbc.Col(create_graph_card("4. Why Do They Return? (Views)", "ret-graph-why-views",
+                                      figures['ret-graph-why-views']), width=12, lg=6),
+        ]),
+
+        # 5. New vs Returning per Month
+        dbc.Row([
+            dbc.Col(create_graph_card("5. Monthly Returning Partners", "ret-graph-monthly",
+                                      figures['ret-graph-monthly']), width=12)
+        ]),
+
+        # --- TABLE ---
+        dbc.Row([
+            dbc.Col([
+                html.H5("Company Retention Matrix", className="mb-3 text-muted fw-bold"),
+                html.Div(server_table('ret-table', [{'name': c.replace('_', ' '), 'id': c} for c in TABLE_COLUMNS]),
+                         id='ret-table-container', style={'background': 'white', 'padding': '20px',
+                                                          'borderRadius': '12px',
+                                                          'boxShadow': '0 4px 12px rgba(0,0,0,0.05)'})
+            ], width=12)
+        ], className="mb-5")
+
+    ], fluid=True)
+
+
+# --- 4. CALLBACKS ---
+def register_callbacks(app):
+    # --- 1. Populate Dropdowns ---
+    @app.callback(
+        [Output('ret-country-dropdown', 'options'),
+         Output('ret-category-dropdown', 'options')],
+        Input('global-data-store', 'data')
+    )
+    def update_filters(data):
+        if not data: return [], []
+        return dimension_options('Country'), dimension_options('Job_Category')
+
+    # The calendar only offers the dataset's dates (first / last posting from the dimension catalog)
+    register_date_bounds(app, 'ret-date-picker')
+
+    # --- 2. Filtered Selection (shared by the KPI / chart / table stages) ---
+    @app.callback(
+        Output('ret-selection', 'data'),
+        [
+            Input('global-data-store', 'data'),
+            Input('ret-date-picker', 'start_date'),
+            Input('ret-date-picker', 'end_date'),
+            Input('ret-country-dropdown', 'value'),
+            Input('ret-category-dropdown', 'value')
+        ],
+        State('ret-selection', 'data')
+    )
+    def update_selection(data, start_date, end_date, selected_countries, selected_cats, current):
+        selection = make_selection(data, start_date=start_date, end_date=end_date, countries=selected_countries,
+                                   categories=selected_cats)
+        return no_update if selection == current else selection
+
+    # --- 3. KPI Stage (values only - card titles and styling stay static) ---
+    @app.callback(
+        [
+            # Row 1 (Churn)
+            Output('ret-total-value', 'children'), Output('ret-retained-value', 'children'),
+            Output('ret-retained-sub', 'children'), Output('ret-one-time-value', 'children'),
+            Output('ret-one-time-sub', 'children'),
+            # Row 2 (Loyalty)
+            Output('ret-single-value', 'children'), Output('ret-single-sub', 'children'),
+            Output('ret-avg-months-value', 'children'), Output('ret-avg-months-sub', 'children'),
+            Output('ret-top-loyal-value', 'children')
+        ],
+        Input('ret-selection', 'data')
+    )
+    @prefetch_next(PAGE)
+    def update_kpis(selection):
+        stats = run_stage(PAGE, 'kpis', selection) if selection else None
+        if stats is None:
+            return ("0", "0", f"Active > {RETAINED_DAYS} Days", "0", f"Active <= {RETAINED_DAYS} Days",
+                    "0", "0% of Companies", "0", "Months with a Posting", "-")
+
+        top3_loyal = ", ".join([f"{name} ({months})" for name, months in stats['top3_loyal']]) or "-"
+        return (
+            # Row 1
+            f"{stats['total_companies']:,}",
+            f"{stats['retained']:,}", f"{stats['retention_rate']}% Retention (Active > {RETAINED_DAYS} Days)",
+            f"{stats['one_time']:,}", f"{100 - stats['retention_rate']:.1f}% Churn (Active <= {RETAINED_DAYS} Days)",
+            # Row 2
+            f"{stats['single_job']:,}", f"{stats['single_job_share']}% of Companies",
+            f"{stats['avg_active_months']}", f"Retained Partners Stay {stats['avg_retained_days']} Days on Avg",
+            top3_loyal
+        )
+
+    # --- 4. Chart Stage (background job when enabled; data arrays only, see create_figures) ---
+    @background_callback(
+        app,
+        [Output(graph_id, 'figure') for graph_id in GRAPH_IDS],
+        Input('ret-selection', 'data'),
+        progress=[Output('ret-progress', 'value'), Output('ret-progress', 'label')],
+        running=[(Output('ret-progress-wrapper', 'style'), {'display': 'block'}, {'display': 'none'})]
+    )
+    @memoize_callback(PAGE, 'charts')
+    def update_charts(selection):
+        report_progress(10, "Loading company activity")
+        stats = run_stage(PAGE, 'kpis', selection) if selection else None
+        if stats is None:
+            return (
+                patch_empty(1, keys=('values',)),
+                patch_empty(1, keys=('y', 'text')),
+                patch_empty(1, keys=('x', 'y', 'text')),
+                patch_empty(1, keys=('x', 'y', 'text')),
+                patch_empty(2)
+            )
+
+        # 1. Retained vs One-Time
+        fig_split = patch_traces([{'values': [stats['retained'], stats['one_time']]}],
+                                 title="Retained Partners vs. One-Time Posters")
+
+        # 2. Loyalty Segments
+        report_progress(30, "Segmenting companies")
+        segments = run_stage(PAGE, 'loyalty', selection)
+        fig_loyalty = patch_traces([{
+            'y': segments['Companies'],
+            'text': [f"{rate}% retained" for rate in segments['Retention Rate']]
+        }], title="Loyalty Segments (Posting Frequency)")
+
+        # 3. + 4. Why do they return?
+        report_progress(55, "Correlating performance")
+        drivers = run_stage(PAGE, 'drivers', selection)
+        fig_apps = patch_traces([{
+            'x': drivers['apps']['Bucket'],
+            'y': drivers['apps']['Retention Rate'],
+            'text': drivers['apps']['Retention Rate']
+        }], title=f"Retention Rate by Applications per Job (correlation {drivers['apps_corr']:+.2f})")
+        fig_views = patch_traces([{
+            'x': drivers['views']['Bucket'],
+            'y': drivers['views']['Retention Rate'],
+            'text': drivers['views']['Retention Rate']
+        }], title=f"Retention Rate by Views per Job (correlation {drivers['views_corr']:+.2f})")
+
+        # 5. New vs Returning per Month
+        report_progress(80, "Building charts")
+        months = run_stage(PAGE, 'monthly', selection)
+        fig_monthly = patch_traces([
+            {'x': months['Month'], 'y': months['New']},
+            {'x': months['Month'], 'y': months['Returning'], 'customdata': months['Retention Rate']}
+        ], title="New vs. Returning Companies per Month")
+
+        return fig_split, fig_loyalty, fig_apps, fig_views, fig_monthly
+
+    # --- 5. Table Stage (server-side paging / sorting / filtering over the full table) ---
+    register_table(app, 'ret-table', 'ret-selection', PAGE, lambda selection: run_stage(PAGE, 'table', selection),
+                   columns=TABLE_COLUMNS)
+
+    # --- 6. Export Links (filtered rows, streamed as CSV / Parquet) ---
+    register_export_links(app, 'ret', 'ret-selection', PAGE)
@@ -1,9 +1,18 @@
-import pandas as pd
-import plotly.express as px
-from dash import html, dcc, Input, Output, dash_table
+from dash import html, dcc, Input, Output, State, no_update
 import dash_bootstrap_components as dbc
 import calendar
 
+from engine.cache import memoize_callback
+from engine.catalog import dimension_options, register_date_bounds
+from engine.export import export_buttons, register_export_links
+from engine.figures import NO_DATA_TITLE, time_series_skeleton, time_series_patch, patch_empty
+from engine.prefetch import prefetch_next
+from engine.search import register_search_dropdown
+from engine.selection import make_selection
+from engine.stages import run_stage
+from engine.tables import server_table, register_table
+from job_views_dashboard.compute.views_analytics import PAGE, TABLE_COLUMNS, table
+
 # --- 1. STYLING & HELPER FUNCTIONS ---
 
 glass_style = {
@@ -35,105 +44,121 @@ def create_detail_card(title, value, subtext, color, val_id=None):
     )
 
 
+# Daily area chart: static styling, the chart stage only patches in the (downsampled, typed) arrays
+def create_daily_figure():
+    return time_series_skeleton('Created_At', 'Views', '#17a2b8', margin=dict(l=20, r=20, t=20, b=20),
+                                plot_bgcolor='rgba(0,0,0,0)')
+
+
 # --- 2. LAYOUT DEFINITION ---
 
-layout = dbc.Container([
-
-    # Header
-    dbc.Row([
-        dbc.Col(html.H3("Job Views Analytics", className="my-4", style={'fontWeight': '800', 'color': '#2c3e50'}),
-                width=12)
-    ]),
-
-    # --- FILTERS ---
-    dbc.Row([
-        # 1. Date Range
-        dbc.Col([
-            html.Label("Job Posted Date Range", className="fw-bold small text-muted"),
-            dcc.DatePickerRange(
-                id='view-date-picker',
-                display_format='YYYY-MM-DD',
-                clearable=True,
-                style={'width': '100%', 'borderRadius': '8px'}
-            )
-        ], width=12, md=3),
-
-        # 2. Month Filter
-        dbc.Col([
-            html.Label("Filter by Month", className="fw-bold small text-muted"),
-            dcc.Dropdown(
-                id='view-month-dropdown',
-                options=[{'label': calendar.month_name[i], 'value': i} for i in range(1, 13)],
-                multi=True,
-                placeholder="Select Months..."
-            )
-        ], width=12, md=3),
-
-        # 3. Category
-        dbc.Col([
-            html.Label("Job Category", className="fw-bold small text-muted"),
-            dcc.Dropdown(id='view-category-dropdown', multi=True, placeholder="All Categories")
-        ], width=12, md=3),
-
-        # 4. Company
-        dbc.Col([
-            html.Label("Company", className="fw-bold small text-muted"),
-            dcc.Dropdown(id='view-company-dropdown', multi=True, placeholder="All Companies")
-        ], width=12, md=3),
-
-    ], className="p-4 mb-4 bg-white shadow-sm", style={'borderRadius': '15px', 'borderLeft': '5px solid #17a2b8'}),
-
-    # --- KPI GRID ---
-    dbc.Row([
-        # Row 1: General Stats
-        dbc.Col(create_detail_card("Total Views", "0", "Sum of all views", "dark", "view-card-total"), width=12,
-                sm=6, lg=4, xl=2, className="mb-3"),
-        dbc.Col(create_detail_card("Avg Views/Job", "0", "Views per Posting", "info", "view-card-avg-job"), width=12, sm=6,
-                lg=4, xl=2, className="mb-3"),
-        dbc.Col(create_detail_card("Median Views/Job", "0", "Median per Posting", "info", "view-card-median-job"),
-                width=12, sm=6, lg=4, xl=2, className="mb-3"),
-        dbc.Col(create_detail_card("Avg Views/Month", "0", "Monthly Volume", "primary", "view-card-avg-month"), width=12,
-                sm=6, lg=4, xl=2, className="mb-3"),
-        dbc.Col(create_detail_card("Avg Conversion", "0%", "Apps / Views", "danger", "view-card-conv"), width=12, sm=6,
-                lg=4, xl=2, className="mb-3"),
-
-        # Row 2: Highs & Lows
-        dbc.Col(create_detail_card("Best Day (Traffic)", "-", "Date: Total Views", "success", "view-card-high-day"),
-                width=12, sm=6, lg=4, className="mb-3"),
-        dbc.Col(create_detail_card("Lowest Day (Traffic)", "-", "Date: Total Views", "warning", "view-card-low-day"),
-                width=12, sm=6, lg=4, className="mb-3"),
-
-        # Row 3: Top Lists
-        dbc.Col(create_detail_card("Top 3 Categories", "-", "By View Volume", "secondary", "view-card-top3-cat"),
-                width=12, md=6, className="mb-3"),
-        dbc.Col(create_detail_card("Top 3 Companies", "-", "By View Volume", "secondary", "view-card-top3-comp"),
-                width=12, md=6, className="mb-3"),
-    ]),
-
-    # --- GRAPHS ---
-    dbc.Row([
-        # Graph 1: Daily Trend
-        dbc.Col(dbc.Card([
-            dbc.CardHeader("1. View Traffic vs Job Creation Date", className="bg-transparent fw-bold border-0"),
-            dbc.CardBody(dcc.Graph(id='view-daily-graph', style={'height': '350px'}, config={'displayModeBar': False}))
-        ], style=glass_style), width=12),
-
-        # Graph 2: Monthly Trend
-        dbc.Col(dbc.Card([
-            dbc.CardHeader("2. View Traffic (Monthly)", className="bg-transparent fw-bold border-0"),
-            dbc.CardBody(dcc.Graph(id='view-monthly-graph', style={'height': '350px'}, config={'displayModeBar': False}))
-        ], style=glass_style), width=12),
-    ]),
-
-    # --- DATA TABLE ---
-    dbc.Row([
-        dbc.Col([
-            html.H5("Most Viewed Jobs", className="mb-3 text-muted fw-bold"),
-            html.Div(id='view-table-container', className="styled-table-container")
-        ], width=12)
-    ], className="mb-5")
-
-], fluid=True)
+def build_layout():
+    """
+    Page layout, built on first navigation to the page (see root_file/app.py).
+    """
+    return dbc.Container([
+        # Normalized filter state shared by the KPI / chart / table stages
+        dcc.Store(id='view-selection'),
+
+        # Header
+        dbc.Row([
+            dbc.Col(html.H3("Job Views Analytics", className="my-4", style={'fontWeight': '800', 'color': '#2c3e50'}),
+                    width=True),
+            dbc.Col(export_buttons('view'), width='auto', className="my-4")
+        ], className="align-items-center"),
+
+        # --- FILTERS ---
+        dbc.Row([
+            # 1. Date Range
+            dbc.Col([
+                html.Label("Job Posted Date Range", className="fw-bold small text-muted"),
+                dcc.DatePickerRange(
+                    id='view-date-picker',
+                    display_format='YYYY-MM-DD',
+                    clearable=True,
+                    style={'width': '100%', 'borderRadius': '8px'}
+                )
+            ], width=12, md=3),
+
+            # 2. Month Filter
+            dbc.Col([
+                html.Label("Filter by Month", className="fw-bold small text-muted"),
+                dcc.Dropdown(
+                    id='view-month-dropdown',
+                    options=[{'label': calendar.month_name[i], 'value': i} for i in range(1, 13)],
+                    multi=True,
+                    placeholder="Select Months..."
+                )
+            ], width=12, md=3),
+
+            # 3. Category
+            dbc.Col([
+                html.Label("Job Category", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='view-category-dropdown', multi=True, placeholder="All Categories")
+            ], width=12, md=3),
+
+            # 4. Company
+            dbc.Col([
+                html.Label("Company", className="fw-bold small text-muted"),
+                dcc.Dropdown(id='view-company-dropdown', multi=True, placeholder="All Companies")
+            ], width=12, md=3),
+
+        ], className="p-4 mb-4 bg-white shadow-sm", style={'borderRadius': '15px', 'borderLeft': '5px solid #17a2b8'}),
+
+        # --- KPI GRID ---
+        dbc.Row([
+            # Row 1: General Stats
+            dbc.Col(create_detail_card("Total Views", "0", "Sum of all views", "dark", "view-card-total"), width=12,
+                    sm=6, lg=4, xl=2, className="mb-3"),
+            dbc.Col(create_detail_card("Avg Views/Job", "0", "Views per Posting", "info", "view-card-avg-job"),
+                    width=12, sm=6, lg=4, xl=2, className="mb-3"),
+            dbc.Col(create_detail_card("Median Views/Job", "0", "Median per Posting", "info", "view-card-median-job"),
+                    width=12, sm=6, lg=4, xl=2, className="mb-3"),
+            dbc.Col(create_detail_card("Avg Views/Month", "0", "Monthly Volume", "primary", "view-card-avg-month"),
+                    width=12, sm=6, lg=4, xl=2, className="mb-3"),
+            dbc.Col(create_detail_card("Avg Conversion", "0%", "Apps / Views", "danger", "view-card-conv"), width=12,
+                    sm=6, lg=4, xl=2, className="mb-3"),
+
+            # Row 2: Highs & Lows
+            dbc.Col(create_detail_card("Best Day (Traffic)", "-", "Date: Total Views", "success", "view-card-high-day"),
+                    width=12, sm=6, lg=4, className="mb-3"),
+            dbc.Col(create_detail_card("Lowest Day (Traffic)", "-", "Date: Total Views", "warning",
+                                       "view-card-low-day"), width=12, sm=6, lg=4, className="mb-3"),
+
+            # Row 3: Top Lists
+            dbc.Col(create_detail_card("Top 3 Categories", "-", "By View Volume", "secondary", "view-card-top3-cat"),
+                    width=12, md=6, className="mb-3"),
+            dbc.Col(create_detail_card("Top 3 Companies", "-", "By View Volume", "secondary", "view-card-top3-comp"),
+                    width=12, md=6, className="mb-3"),
+        ]),
+
+        # --- GRAPHS ---
+        dbc.Row([
+            # Graph 1: Daily Trend
+            dbc.Col(dbc.Card([
+                dbc.CardHeader("1. View Traffic vs Job Creation Date", className="bg-transparent fw-bold border-0"),
+                dbc.CardBody(dcc.Graph(id='view-daily-graph', figure=create_daily_figure(), style={'height': '350px'},
+                                       config={'displayModeBar': False}))
+            ], style=glass_style), width=12),
+
+            # Graph 2: Monthly Trend
+            dbc.Col(dbc.Card([
+                dbc.CardHeader("2. View Traffic (Monthly)", className="bg-transparent fw-bold border-0"),
+                dbc.CardBody(dcc.Graph(id='view-monthly-graph', style={'height': '350px'},
+                                       config={'displayModeBar': False}))
+            ], style=glass_style), width=12),
+        ]),
+
+        # --- DATA TABLE ---
+        dbc.Row([
+            dbc.Col([
+                html.H5("Most Viewed Jobs", className="mb-3 text-muted fw-bold"),
+                html.Div(server_table('view-table', [{'name': c.replace('_', ' '), 'id': c} for c in TABLE_COLUMNS]),
+                         id='view-table-container', className="styled-table-container")
+            ], width=12)
+        ], className="mb-5")
+
+    ], fluid=True)
 
 
 # --- 3. CALLBACKS ---
@@ -141,22 +166,38 @@ layout = dbc.Container([
 def register_callbacks(app):
     # 1. Populate Dropdowns
     @app.callback(
-        [Output('view-category-dropdown', 'options'),
-         Output('view-company-dropdown', 'options')],
+        Output('view-category-dropdown', 'options'),
         Input('global-data-store', 'data')
     )
     def update_filters(data):
-        if not data: return [], []
-        df = pd.DataFrame(data)
+        if not data: return []
+        return dimension_options('Job_Category')
+
+    # Company options are searched on the server as the user types (thousands of advertisers)
+    register_search_dropdown(app, 'view-company-dropdown', 'Company')
 
-        # Use mapped column names 'Job_Category' and 'Company'
-        cats = [{'label': c, 'value': c} for c in
-                sorted(df['Job_Category'].dropna().unique().astype(str))] if 'Job_Category' in df.columns else []
-        comps = [{'label': c, 'value': c} for c in
-                 sorted(df['Company'].dropna().unique().astype(str))] if 'Company' in df.columns else []
-        return cats, comps
+    # The calendar only offers the dataset's dates (first / last posting from the dimension catalog)
+    register_date_bounds(app, 'view-date-picker')
 
-    # 2. Update Dashboard
+    # 2. Filtered Selection (shared by the KPI / chart / table stages)
+    @app.callback(
+        Output('view-selection', 'data'),
+        [
+            Input('global-data-store', 'data'),
+            Input('view-date-picker', 'start_date'),
+            Input('view-date-picker', 'end_date'),
+            Input('view-month-dropdown', 'value'),
+            Input('view-category-dropdown', 'value'),
+            Input('view-company-dropdown', 'value')
+        ],
+        State('view-selection', 'data')
+    )
+    def update_selection(data, start_date, end_date, selected_months, cats, comps, current):
+        selection = make_selection(data, start_date=start_date, end_date=end_date, months=selected_months,
+                                   categories=cats, companies=comps)
+        return no_update if selection == current else selection
+
+    # 3. KPI Stage
     @app.callback(
         [
             Output('view-card-total', 'children'),
@@ -167,120 +208,62 @@ def register_callbacks(app):
             Output('view-card-high-day', 'children'),
             Output('view-card-low-day', 'children'),
             Output('view-card-top3-cat', 'children'),
-            Output('view-card-top3-comp', 'children'),
-            Output('view-daily-graph', 'figure'),
-            Output('view-monthly-graph', 'figure'),
-            Output('view-table-container', 'children')
+            Output('view-card-top3-comp', 'children')
         ],
-        [
-            Input('global-data-store', 'data'),
-            Input('view-date-picker', 'start_date'),
-            Input('view-date-picker', 'end_date'),
-            Input('view-month-dropdown', 'value'),
-            Input('view-category-dropdown', 'value'),
-            Input('view-company-dropdown', 'value')
-        ]
+        Input('view-selection', 'data')
     )
-    def update_analytics(data, start_date, end_date, selected_months, cats, comps):
-        empty_fig = px.line(title="No Data")
-        if not data:
-            return "0", "0", "0", "0", "0%", "-", "-", "-", "-", empty_fig, empty_fig, None
-
-        df = pd.DataFrame(data)
-
-        # --- PREPROCESSING ---
-        if 'Created_At' in df.columns:
-            df['Created_At'] = pd.to_datetime(df['Created_At'], errors='coerce')
-
-        # Ensure numeric columns for Views and Applications
-        for col in ['Total_Applications', 'Total_Views']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-        # --- FILTERING ---
-        if start_date and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.date >= pd.to_datetime(start_date).date()]
-        if end_date and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.date <= pd.to_datetime(end_date).date()]
-
-        if selected_months and 'Created_At' in df.columns:
-            df = df[df['Created_At'].dt.month.isin(selected_months)]
+    @prefetch_next(PAGE)
+    def update_kpis(selection):
+        stats = run_stage(PAGE, 'kpis', selection) if selection else None
+        if stats is None:
+            return "0", "0", "0", "0", "0%", "-", "-", "-", "-"
 
-        if cats and 'Job_Category' in df.columns:
-            df = df[df['Job_Category'].isin(cats)]
-        if comps and 'Company' in df.columns:
-            df = df[df['Company'].isin(comps)]
-
-        if df.empty:
-            return "0", "0", "0", "0", "0%", "-", "-", "-", "-", empty_fig, empty_fig, None
-
-        # --- KPI CALCULATIONS ---
-
-        # 1. Total Views
-        total_views = df['Total_Views'].sum()
-
-        # 2. Averages per Job
-        avg_views_per_job = round(df['Total_Views'].mean(), 1)
-        median_views_per_job = round(df['Total_Views'].median(), 1)
-
-        # 3. Daily Aggregations (Summing Views by Date)
-        if 'Created_At' in df.columns:
-            daily_view_sum = df.groupby(df['Created_At'].dt.date)['Total_Views'].sum()
-        else:
-            daily_view_sum = pd.Series()
-
-        # Highest Day
-        if not daily_view_sum.empty:
-            high_val = daily_view_sum.max()
-            high_date = daily_view_sum.idxmax().strftime('%b %d')
-            high_str = f"{high_val} ({high_date})"
-            low_val = daily_view_sum.min()
-            low_date = daily_view_sum.idxmin().strftime('%b %d')
-            low_str = f"{low_val} ({low_date})"
-        else:
-            high_str, low_str = "-", "-"
+        def day_str(day):
+            return f"{day[1]} ({day[0].strftime('%b %d')})" if day else "-"
 
-        # 4. Monthly Aggregations
-        if 'Created_At' in df.columns:
-            df['Month_Year'] = df['Created_At'].dt.to_period('M')
-            monthly_view_sum = df.groupby('Month_Year')['Total_Views'].sum()
-            avg_views_month = round(monthly_view_sum.mean(), 1)
-        else:
-            monthly_view_sum = pd.Series()
-            avg_views_month = 0
+        def top3_str(items):
+            return ", ".join([f"{k}: {v}" for k, v in items]) if items is not None else "-"
 
-        # 5. Top 3 Categories by Views
-        if 'Job_Category' in df.columns:
-            top3_cats = df.groupby('Job_Category')['Total_Views'].sum().nlargest(3)
-            top3_cat_str = ", ".join([f"{k}: {v}" for k, v in top3_cats.items()])
-        else:
-            top3_cat_str = "-"
+        return (
+            f"{stats['total_views']:,}",
+            f"{stats['avg_views_per_job']}",
+            f"{stats['median_views_per_job']}",
+            f"{stats['avg_views_month']}",
+            f"{stats['conversion_rate']:.2f}%",
+            day_str(stats['high_day']),
+            day_str(stats['low_day']),
+            top3_str(stats['top3_categories']),
+            top3_str(stats['top3_companies'])
+        )
 
-        # 6. Top 3 Companies by Views
-        if 'Company' in df.columns:
-            top3_comps = df.groupby('Company')['Total_Views'].sum().nlargest(3)
-            top3_comp_str = ", ".join([f"{k}: {v}" for k, v in top3_comps.items()])
-        else:
-            top3_comp_str = "-"
+    # 4. Chart Stage
+    @app.callback(
+        [
+            Output('view-daily-graph', 'figure'),
+            Output('view-monthly-graph', 'figure')
+        ],
+        Input('view-selection', 'data')
+    )
+    @memoize_callback(PAGE, 'charts')
+    def update_charts(selection):
+        import plotly.express as px  # ~140 ms: loaded on the first chart, not at app startup
 
-        # 7. Conversion (Total Apps / Total Views)
-        total_apps = df['Total_Applications'].sum()
-        conv_rate = (total_apps / total_views * 100) if total_views > 0 else 0
+        empty_fig = px.line(title=NO_DATA_TITLE)
+        if not selection:
+            return patch_empty(1), empty_fig
 
-        # --- GRAPHS ---
+        daily_sum = run_stage(PAGE, 'daily_totals', selection)
+        monthly_sum = run_stage(PAGE, 'monthly_totals', selection)
 
-        # Daily Graph (Area chart of Views)
-        if not daily_view_sum.empty:
-            daily_df = daily_view_sum.reset_index(name='Views')
-            fig_daily = px.area(daily_df, x='Created_At', y='Views', markers=True, template="plotly_white")
-            fig_daily.update_traces(line_color='#17a2b8', line_shape='spline', fill='tozeroy')  # Cyan/Info color
-            fig_daily.update_layout(margin=dict(l=20, r=20, t=20, b=20), plot_bgcolor='rgba(0,0,0,0)')
+        # Daily Graph (Area chart of Views, see create_daily_figure)
+        if not daily_sum.empty:
+            fig_daily = time_series_patch(daily_sum.index, daily_sum.to_numpy())
         else:
-            fig_daily = empty_fig
+            fig_daily = patch_empty(1)
 
         # Monthly Graph
-        if not monthly_view_sum.empty:
-            monthly_df = monthly_view_sum.reset_index(name='Views')
+        if not monthly_sum.empty:
+            monthly_df = monthly_sum.reset_index(name='Views')
             monthly_df['Month_Year'] = monthly_df['Month_Year'].astype(str)
             fig_monthly = px.bar(monthly_df, x='Month_Year', y='Views', template="plotly_white")
             fig_monthly.update_traces(marker_color='#6610f2')  # Purple
@@ -288,34 +271,10 @@ def register_callbacks(app):
         else:
             fig_monthly = empty_fig
 
-        # --- TABLE ---
-        # Sorting by Total_Views descending
-        display_cols = ['Job_Title', 'Company', 'Job_Category', 'Created_At', 'Total_Views', 'Total_Applications']
-        final_cols = [c for c in display_cols if c in df.columns]
-
-        table = dash_table.DataTable(
-            data=df[final_cols].sort_values('Total_Views', ascending=False).head(50).to_dict('records'),
-            columns=[{'name': i.replace('_', ' '), 'id': i} for i in final_cols],
-            page_size=10,
-            style_table={'overflowX': 'auto'},
-            style_header={'backgroundColor': '#2c3e50', 'color': 'white', 'fontWeight': 'bold'},
-            style_cell={'textAlign': 'left', 'padding': '10px', 'fontFamily': 'Segoe UI'},
-            style_data_conditional=[
-                {'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}
-            ]
-        )
+        return fig_daily, fig_monthly
 
-        return (
-            f"{total_views:,}",
-            f"{avg_views_per_job}",
-            f"{median_views_per_job}",
-            f"{avg_views_month}",
-            f"{conv_rate:.2f}%",
-            high_str,
-            low_str,
-            top3_cat_str,
-            top3_comp_str,
-            fig_daily,
-            fig_monthly,
-            table
-        )
\ No newline at end of file
+    # 5. Table Stage (server-side paging / sorting / filtering over the matching rows)
+    register_table(app, 'view-table', 'view-selection', PAGE, table, columns=TABLE_COLUMNS)
+
+    # 6. Export Links (filtered rows, streamed as CSV / Parquet)
+    register_export_links(app, 'view', 'view-selection', PAGE)
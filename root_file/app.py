@@ -1,38 +1,54 @@
 import sys
 import os
-import dash
-from dash import html, dcc, Input, Output
-import dash_bootstrap_components as dbc
+import importlib
 
 # 1. PATH CONFIGURATION
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
+from engine.startup import timed, startup_report
+
+with timed('import', 'dash + dash_bootstrap_components'):
+    import dash
+    from dash import html, dcc, Input, Output
+    import dash_bootstrap_components as dbc
+
 # 2. IMPORT DATA & PAGES
-from Data.get_localsqldata import load_data
-
-# --- Import Existing Pages ---
-from job_views_dashboard.overview_analytics import layout as page1_layout, \
-    register_callbacks as register_page1_callbacks
-from job_views_dashboard.jobs_posted_analytics import layout as page2_layout, \
-    register_callbacks as register_page2_callbacks
-from job_views_dashboard.application_analytics import layout as page3_layout, \
-    register_callbacks as register_page3_callbacks
-from job_views_dashboard.views_analytics import layout as page4_layout, register_callbacks as register_page4_callbacks
-from job_views_dashboard.country_jobs_posted import layout as page5_layout, \
-    register_callbacks as register_page5_callbacks
-from job_views_dashboard.application_country import layout as page6_layout, \
-    register_callbacks as register_page6_callbacks
-from job_views_dashboard.views_country import layout as page7_layout, register_callbacks as register_page7_callbacks
-
-# --- Import New Pages ---
-# from job_views_dashboard.retention_analytics import layout as page8_layout, \
-#     register_callbacks as register_page8_callbacks
-
-from job_views_dashboard.company_analytics import layout as page9_layout, register_callbacks as register_page9_callbacks
-from job_views_dashboard.country_category_analytics import layout as page10_layout, \
-    register_callbacks as register_page10_callbacks
+with timed('import', 'Data (pandas + SQL loader)'):
+    from Data.get_localsqldata import load_data
+    from Data.dataset import DATASET_CONFIG, publish_dataset, dataset_token, attach_shared
+
+# Route -> page module. Modules are imported up front (their callbacks must exist before the first request),
+# but each page builds its layout (figure skeletons, tables...) only on the first visit of its route.
+PAGES = {
+    '/dashboard': 'job_views_dashboard.overview_analytics',
+    '/jobs-analytics': 'job_views_dashboard.jobs_posted_analytics',
+    '/application-analytics': 'job_views_dashboard.application_analytics',
+    '/views-analytics': 'job_views_dashboard.views_analytics',
+    '/country-jobs-posted': 'job_views_dashboard.country_jobs_posted',
+    '/application-country': 'job_views_dashboard.application_country',
+    '/views-country': 'job_views_dashboard.views_country',
+    '/retention-analytics': 'job_views_dashboard.retention_analytics',
+    '/company-analytics': 'job_views_dashboard.company_analytics',
+    '/company-cohorts': 'job_views_dashboard.company_cohorts',
+    '/category-analytics': 'job_views_dashboard.country_category_analytics',
+}
+DEFAULT_PAGE = '/dashboard'
+
+page_modules = {}
+for route, module_name in PAGES.items():
+    with timed('import', module_name):
+        page_modules[route] = importlib.import_module(module_name)
+
+from engine.admission import register_busy_handler
+from engine.api import register_api
+from engine.export import register_export
+from engine.memory import start_tracking as start_memory_tracking
+from engine.metrics import instrument_callbacks, register_callback_owner, register_metrics
+from engine.offload import OFFLOAD_CONFIG, start_pool as start_offload_pool
+from engine.prefetch import PREFETCH_CONFIG, track_requests
+from engine.tracing import register_profiler, trace_callbacks
 
 # 3. APP SETUP
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.FONT_AWESOME],
@@ -40,10 +56,46 @@ app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.
 server = app.server
 app.title = "Job Portal Analytics"
 
+# Speculative prefetch of the next sidebar pages only runs while no request is in flight
+if PREFETCH_CONFIG['pages'] > 0:
+    track_requests(server)
+
+# Pages over their admission limit answer 503 "busy" instead of piling up work (see engine/admission.py)
+register_busy_handler(server)
+
+# Read-only JSON routes over the same compute stages + cache (API_ENABLED=0 to turn off)
+register_api(server)
+# Streaming CSV / Parquet downloads behind the pages' Export buttons
+register_export(server)
+# Per-callback timings, payload sizes, rows and cache hits as Prometheus text on /metrics
+instrument_callbacks(server)
+register_metrics(server)
+# Peak allocation per compute stage on /metrics (MEMORY_TRACKING=1); over-budget stages answer from a sample
+start_memory_tracking()
+# One-request sampling profiles (folded stacks) for requests carrying PROFILE_TOKEN
+register_profiler(server)
+
 # --- LOAD DATA ---
-print("🚀 Launching App... Fetching Data from XAMPP...")
-df = load_data()
-initial_data = df.to_dict('records') if df is not None else []
+# Under the multi-process server the master already loaded the table into a shared file (root_file/gunicorn.conf.py)
+shared_version = None
+if DATASET_CONFIG['shared_path']:
+    with timed('startup', 'attach shared dataset'):
+        shared_version = attach_shared()
+if shared_version is None:
+    print("🚀 Launching App... Fetching Data from XAMPP...")
+    with timed('startup', 'load data'):
+        df = load_data()
+    if df is not None:
+        with timed('startup', 'publish dataset'):
+            publish_dataset(df)
+
+# Optional process pool for the heavy compute stages (forked now, before the server starts its threads)
+if OFFLOAD_CONFIG['workers'] > 0:
+    with timed('startup', 'offload pool'):
+        start_offload_pool()
+
+# The store only carries the dataset version; pages read rows from the server-side registry
+initial_data = dataset_token()
 
 # 4. SIDEBAR
 SIDEBAR_STYLE = {
@@ -80,10 +132,12 @@ sidebar = html.Div([
 
         # Advanced Section
         html.Div("Advanced Metrics", className="small text-white-50 mt-3 mb-2 fw-bold text-uppercase"),
-        # dbc.NavLink([html.I(className="fas fa-sync-alt me-2"), "Retention Analytics"], href="/retention-analytics",
-        #             active="exact", className="text-white-50 mb-2"),
+        dbc.NavLink([html.I(className="fas fa-sync-alt me-2"), "Retention Analytics"], href="/retention-analytics",
+                    active="exact", className="text-white-50 mb-2"),
         dbc.NavLink([html.I(className="fas fa-building me-2"), "Company Analytics"], href="/company-analytics",
                     active="exact", className="text-white-50 mb-2"),
+        dbc.NavLink([html.I(className="fas fa-th me-2"), "Company Cohorts"], href="/company-cohorts",
+                    active="exact", className="text-white-50 mb-2"),
         dbc.NavLink([html.I(className="fas fa-layer-group me-2"), "Category Analytics"], href="/category-analytics",
                     active="exact", className="text-white-50 mb-2"),
 
@@ -99,43 +153,35 @@ app.layout = html.Div([
 ])
 
 # 6. REGISTER CALLBACKS
-register_page1_callbacks(app)
-register_page2_callbacks(app)
-register_page3_callbacks(app)
-register_page4_callbacks(app)
-register_page5_callbacks(app)
-register_page6_callbacks(app)
-register_page7_callbacks(app)
-# register_page8_callbacks(app)  # Retention
-register_page9_callbacks(app)  # Company
-register_page10_callbacks(app)  # Category
+for route, module in page_modules.items():
+    known_outputs = set(app.callback_map)
+    with timed('callbacks', module.__name__):
+        module.register_callbacks(app)
+    register_callback_owner(app, known_outputs, getattr(module, 'PAGE', route))
 
+# Spans around every page callback and its JSON serialization (see engine/tracing.py)
+trace_callbacks(app)
+
+startup_report()
 
 # 7. ROUTING
+_layouts = {}
+
+
+def page_layout(route):
+    """
+    Layout of a page, built on the first visit of its route and reused afterwards.
+    """
+    if route not in _layouts:
+        with timed('layout', route) as timing:
+            _layouts[route] = page_modules[route].build_layout()
+        print(f"📄 Page layout built: {route} ({timing['seconds'] * 1000:.0f} ms)")
+    return _layouts[route]
+
+
 @app.callback(Output('page-content', 'children'), Input('url', 'pathname'))
 def display_page(pathname):
-    if pathname == '/' or pathname == '/dashboard':
-        return page1_layout
-    elif pathname == '/jobs-analytics':
-        return page2_layout
-    elif pathname == '/application-analytics':
-        return page3_layout
-    elif pathname == '/views-analytics':
-        return page4_layout
-    elif pathname == '/country-jobs-posted':
-        return page5_layout
-    elif pathname == '/application-country':
-        return page6_layout
-    elif pathname == '/views-country':
-        return page7_layout
-    # elif pathname == '/retention-analytics':
-    #     return page8_layout
-    elif pathname == '/company-analytics':
-        return page9_layout
-    elif pathname == '/category-analytics':
-        return page10_layout
-    else:
-        return page1_layout
+    return page_layout(pathname if pathname in page_modules else DEFAULT_PAGE)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,45 @@
+import gc
+import os
+import sys
+import tempfile
+import multiprocessing
+
+# --- Production Serving (gunicorn, pre-fork) ---
+# Run from the project root:  gunicorn -c root_file/gunicorn.conf.py root_file.app:server
+# The master loads the table ONCE and writes it to a shared Arrow file before forking the workers.
+# Each worker memory-maps that file instead of calling load_data() (see Data/dataset.py), so memory
+# stays at about one copy of the data whatever the number of workers.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+bind = os.getenv('WEB_BIND', '0.0.0.0:8050')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.getenv('WEB_THREADS', 4))
+timeout = int(os.getenv('WEB_TIMEOUT', 120))
+
+os.environ.setdefault('DATASET_SHARED_PATH', os.path.join(tempfile.gettempdir(), 'job_portal_dataset.arrow'))
+
+
+def publish_shared_dataset(server):
+    """
+    Loads the table in the master and writes the shared file (on start and on HUP reload).
+    """
+    from Data.get_localsqldata import load_data
+    from Data.dataset import DATASET_CONFIG, publish_dataset, export_shared, release_dataset
+
+    df = load_data()
+    if df is None:
+        # No stale data: without the file every worker falls back to loading the table itself
+        if os.path.exists(DATASET_CONFIG['shared_path']):
+            os.remove(DATASET_CONFIG['shared_path'])
+        return
+    publish_dataset(df)
+    del df
+    export_shared()
+    # The workers map the file: the master's own copy would only sit in memory (and be duplicated on fork)
+    release_dataset()
+    gc.collect()
+
+
+on_starting = publish_shared_dataset
+on_reload = publish_shared_dataset
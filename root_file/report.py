@@ -0,0 +1,279 @@
+import os
+import sys
+import json
+import html
+import time
+import argparse
+import datetime
+import itertools
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# 1. PATH CONFIGURATION
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import pandas as pd
+
+from Data.dataset import DATASET_CONFIG, publish_dataset, attach_shared, dataset_version, dataset_token, get_dataset
+from engine.api import to_json
+from engine.catalog import dimension
+from engine.indexes import IndexedRows
+from engine.prefetch import project_selection
+from engine.selection import make_selection
+from engine.stages import STAGES, COMPUTE_MODULES, run_stage, load_all_stages
+
+# --- Offline Batch Report ---
+# Evaluates every page's compute stages (no Dash, no browser) for a grid of filters
+# (months x top countries x top categories) in a pool of processes, and writes JSON / HTML snapshots:
+#
+#   python root_file/report.py --months 2025-01 2025-02 --top-countries 5 --out reports/
+#
+# A "view" is one page evaluated for one filter combination (every stage + the first table rows).
+# A month is a calendar month of one year: pages filter it as a start / end date range, or with their month
+# filter when they have no date range. A page with neither (company_cohorts) gets whole-dataset snapshots.
+WHOLE_DATASET = 'whole dataset'
+
+
+# --- 2. DATA ---
+
+def load_dataset(path=None):
+    """
+    Publishes the table from a file (.csv / .parquet / .arrow), the shared Arrow file, or the local SQL database.
+    """
+    if path:
+        if path.endswith('.parquet'):
+            df = pd.read_parquet(path)
+        elif path.endswith(('.arrow', '.feather')):
+            df = pd.read_feather(path)
+        else:
+            df = pd.read_csv(path)
+        return publish_dataset(df)
+
+    if DATASET_CONFIG['shared_path'] and attach_shared() is not None:
+        return dataset_version()
+
+    from Data.get_localsqldata import load_data
+    df = load_data()
+    return publish_dataset(df) if df is not None else None
+
+
+# --- 3. GRID ---
+
+def _top(col, count):
+    entry = dimension(col) if count > 0 else None
+    if entry is None:
+        return []
+    order = entry['counts'].argsort(kind='stable')[::-1][:count]
+    return [str(v) for v in entry['values'][order]]
+
+
+def _periods(months=None):
+    """
+    Year-month periods of the data, limited to `months` ('YYYY-MM', or 1-12 for that month of every year).
+    """
+    df = get_dataset()
+    if df is None or 'Created_At' not in df.columns:
+        return []
+    created = df['Created_At'].dropna()
+    if getattr(created.dt, 'tz', None) is not None:
+        created = created.dt.tz_localize(None)  # Periods are calendar months of the stored dates
+    periods = sorted(created.dt.to_period('M').unique())
+    if months:
+        wanted = {str(m) for m in months}
+        periods = [p for p in periods if str(p) in wanted or str(p.month) in wanted]
+    return periods
+
+
+def build_grid(months=None, top_countries=5, top_categories=0):
+    """
+    [(month, country, category)] - month is a pd.Period; None on an axis means "no filter" for it.
+    """
+    periods = _periods(months)
+    countries = _top('Country', top_countries)
+    categories = _top('Job_Category', top_categories)
+    return list(itertools.product(periods or [None], countries or [None], categories or [None]))
+
+
+def _month_filters(period, filters):
+    """
+    Selection arguments of a month for a page: its date range, else its month filter, else None (no month axis).
+    """
+    if period is None:
+        return {}
+    if filters is None or ('start_date' in filters and 'end_date' in filters):
+        return {'start_date': period.start_time.strftime('%Y-%m-%d'), 'end_date': period.end_time.strftime('%Y-%m-%d')}
+    if 'months' in filters:
+        return {'months': [period.month]}
+    return None
+
+
+def build_views(grid, pages):
+    """
+    Unique (page, selection, month label) views: a cell is projected on each page's filters (the overview has no
+    Country filter, so every country of a month is the same overview view).
+    """
+    token = dataset_token()
+    views = {}
+    for module in [importlib.import_module(name) for name in COMPUTE_MODULES]:
+        if pages and module.PAGE not in pages:
+            continue
+        filters = getattr(module, 'FILTERS', None)
+        for period, country, category in grid:
+            month = _month_filters(period, filters)
+            if month is None:
+                label, month = WHOLE_DATASET, {}
+            else:
+                label = str(period) if period is not None else None
+            selection = make_selection(token, countries=[country] if country else None,
+                                       categories=[category] if category else None, **month)
+            selection = project_selection(selection, filters)
+            views.setdefault((module.PAGE, repr(sorted(selection.items()))), (module.PAGE, selection, label))
+        if grid and grid[0][0] is not None and _month_filters(grid[0][0], filters) is None:
+            print(f"⚠️ {module.PAGE} has no date filter: its snapshots cover the whole dataset, not one month")
+    return list(views.values())
+
+
+# --- 4. EVALUATION ---
+
+def evaluate_view(page, selection, month=None, table_rows=50):
+    """
+    Runs every stage of `page` for `selection` (+ the first rows of a detail table that isn't a stage).
+    month: label of the snapshot's month ('YYYY-MM', WHOLE_DATASET for a page without date filter, or None).
+    """
+    start = time.perf_counter()
+    stages = {name: to_json(run_stage(page, name, selection))
+              for (stage_page, name) in list(STAGES) if stage_page == page}
+
+    if 'table' not in stages and table_rows > 0:
+        module = next(m for m in map(importlib.import_module, COMPUTE_MODULES) if m.PAGE == page)
+        rows = module.table(selection) if hasattr(module, 'table') else None
+        if isinstance(rows, IndexedRows):
+            frame = rows.frame.iloc[rows.order(limit=table_rows)]
+            columns = getattr(module, 'TABLE_COLUMNS', list(frame.columns))
+            stages['table'] = to_json(frame[columns].reset_index(drop=True))
+
+    return {
+        'page': page,
+        'month': month,
+        'filters': {k: v for k, v in selection.items() if k != 'version' and v},
+        'stages': stages,
+        'seconds': round(time.perf_counter() - start, 4),
+    }
+
+
+def _evaluate_task(args):
+    return evaluate_view(*args)
+
+
+def run_views(views, workers, table_rows=50):
+    """
+    Evaluates the views in `workers` forked processes (they inherit the loaded dataset), or inline.
+    """
+    tasks = [(page, selection, month, table_rows) for page, selection, month in views]
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return [_evaluate_task(task) for task in tasks]
+
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as executor:
+        return list(executor.map(_evaluate_task, tasks, chunksize=chunksize))
+
+
+# --- 5. OUTPUT ---
+
+def _cell(value):
+    if isinstance(value, list):
+        return ", ".join(": ".join(map(str, v)) if isinstance(v, list) else str(v) for v in value)
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return "-" if value is None else str(value)
+
+
+def write_html(report, path):
+    """
+    One table per page: a row per filter combination, a column per KPI.
+    """
+    parts = [f"<html><head><meta charset='utf-8'><title>Job Portal Report {report['version']}</title>",
+             "<style>body{font-family:'Segoe UI',sans-serif;margin:24px}"
+             "table{border-collapse:collapse;margin-bottom:32px}"
+             "th{background:#2c3e50;color:#fff}td,th{padding:6px 10px;border:1px solid #ddd;text-align:left}"
+             "tr:nth-child(even){background:#f8f8f8}</style></head><body>",
+             f"<h2>Job Portal Report</h2><p>Dataset version {report['version']} - "
+             f"generated {report['generated_at']}</p>"]
+
+    for page in dict.fromkeys(view['page'] for view in report['views']):
+        views = [view for view in report['views'] if view['page'] == page]
+        kpi_keys = list(dict.fromkeys(k for view in views for k in (view['stages'].get('kpis') or {})))
+        filter_keys = list(dict.fromkeys(k for view in views for k in view['filters']))
+        parts.append(f"<h3>{html.escape(page)}</h3><table><tr><th>month</th>")
+        parts.extend(f"<th>{html.escape(k)}</th>" for k in filter_keys + kpi_keys)
+        parts.append("</tr>")
+        for view in views:
+            kpis = view['stages'].get('kpis') or {}
+            cells = [_cell(view.get('month'))] + [_cell(view['filters'].get(k)) for k in filter_keys] + \
+                [_cell(kpis.get(k)) for k in kpi_keys]
+            parts.append("<tr>" + "".join(f"<td>{html.escape(c)}</td>" for c in cells) + "</tr>")
+        parts.append("</table>")
+
+    parts.append("</body></html>")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("".join(parts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline KPI / table snapshots of every dashboard page.")
+    parser.add_argument('--input', help="Data file (.csv / .parquet / .arrow) instead of the local SQL database")
+    parser.add_argument('--months', nargs='*',
+                        help="Months of the grid: YYYY-MM, or 1-12 for that month of every year; default: every month")
+    parser.add_argument('--top-countries', type=int, default=5, help="Countries with the most jobs (0 = no filter)")
+    parser.add_argument('--top-categories', type=int, default=0, help="Categories with the most jobs (0 = no filter)")
+    parser.add_argument('--pages', nargs='*', help="Compute pages to evaluate; default: all")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Processes; default: CPU cores")
+    parser.add_argument('--table-rows', type=int, default=50, help="Rows kept from detail tables")
+    parser.add_argument('--format', nargs='+', choices=['json', 'html'], default=['json', 'html'])
+    parser.add_argument('--out', default='reports', help="Output directory")
+    args = parser.parse_args(argv)
+
+    if load_dataset(args.input) is None:
+        print("❌ No data loaded, nothing to report.")
+        return 1
+    load_all_stages()
+
+    grid = build_grid(args.months, args.top_countries, args.top_categories)
+    views = build_views(grid, args.pages)
+    print(f"🧮 Evaluating {len(views)} views ({len(grid)} filter combinations) on {args.workers} processes...")
+
+    start = time.perf_counter()
+    results = run_views(views, args.workers, args.table_rows)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'version': dataset_version(),
+        'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'grid': {'months': args.months, 'top_countries': args.top_countries, 'top_categories': args.top_categories},
+        'throughput': {'views': len(results), 'seconds': round(elapsed, 3),
+                       'views_per_second': round(len(results) / elapsed, 2) if elapsed else None,
+                       'workers': args.workers},
+        'views': results,
+    }
+
+    os.makedirs(args.out, exist_ok=True)
+    stem = os.path.join(args.out, f"report_{report['version']}")
+    if 'json' in args.format:
+        with open(f"{stem}.json", 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+        print(f"💾 {stem}.json")
+    if 'html' in args.format:
+        write_html(report, f"{stem}.html")
+        print(f"💾 {stem}.html")
+
+    print(f"✅ {len(results)} views in {elapsed:.2f}s ({report['throughput']['views_per_second']} views/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from engine.selection import sorted_positions
+from engine.tables import split_filter_part, parse_filter_query, _filter_mask
+
+
+def test_operator_is_read_after_the_column_only():
+    # Quoted values containing operator words ('ge', 'lt', 'ne') must not be parsed as the operator
+    assert split_filter_part('{Job_Title} scontains "Storage Manager"') == \
+        ('Job_Title', 'contains', 'Storage Manager', True)
+    assert split_filter_part('{Company} scontains "Salt Co"') == ('Company', 'contains', 'Salt Co', True)
+    assert split_filter_part('{Company} s= "Online Agency"') == ('Company', 'eq', 'Online Agency', True)
+    assert split_filter_part('{Job_Count} >= 5') == ('Job_Count', 'ge', 5.0, True)
+    assert split_filter_part('{Job_Count} lt 3') == ('Job_Count', 'lt', 3.0, True)
+    assert split_filter_part('no column here') == (None, None, None, None)
+
+
+def test_text_filters_with_missing_values():
+    frame = pd.DataFrame({'Company': ['Salt Co', None, 'Storage Manager Ltd', 'Pepper Inc'],
+                          'Job_Count': [1, 2, 3, 4]})
+    mask = _filter_mask(frame, parse_filter_query('{Company} icontains "salt co"'))
+    assert mask.tolist() == [True, False, False, False]
+    mask = _filter_mask(frame, parse_filter_query('{Company} > "Q" && {Job_Count} ge 2'))
+    assert mask.tolist() == [False, False, True, False]
+
+
+def test_case_prefix_of_text_filters():
+    frame = pd.DataFrame({'Company': ['Salt Co', 'salt co', None, 'Pepper Inc']})
+    assert _filter_mask(frame, parse_filter_query('{Company} scontains "Salt"')).tolist() == [True, False, False, False]
+    assert _filter_mask(frame, parse_filter_query('{Company} icontains "Salt"')).tolist() == [True, True, False, False]
+    assert _filter_mask(frame, parse_filter_query('{Company} ieq "SALT CO"')).tolist() == [True, True, False, False]
+    assert _filter_mask(frame, parse_filter_query('{Company} seq "salt co"')).tolist() == [False, True, False, False]
+
+
+def test_sort_keeps_ties_stable_and_missing_last():
+    frame = pd.DataFrame({'Company': ['b', None, 'a', 'b', np.nan, 'a']})
+    positions = np.arange(len(frame))
+    assert sorted_positions(frame, positions, 'Company', True).tolist() == [2, 5, 0, 3, 1, 4]
+    assert sorted_positions(frame, positions, 'Company', False).tolist() == [0, 3, 2, 5, 1, 4]